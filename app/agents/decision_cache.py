@@ -0,0 +1,98 @@
+"""Idempotent decision cache: identical applications against the same policy-index version reuse one agent result.
+
+Keys hash the canonicalized applicant, decision_type, query and index version (never the session_id), so client
+retries and duplicate submissions hit. Backends: in-process LRU+TTL, or Redis (or any Redis-compatible server such
+as Valkey or a local stand-in) so replicas share results.
+"""
+from __future__ import annotations
+import hashlib
+import json
+import logging
+import threading
+from typing import Any, Protocol
+from app.models.schemas import DecisionRequest, DecisionResponse
+from app.rag.cache import TTLCache
+from app.utils.config import settings
+
+logger = logging.getLogger(__name__)
+
+def decision_key(request: DecisionRequest, index_version: Any = None) -> str:
+    canonical = {"decision_type": request.decision_type.value,
+                 "applicant": request.applicant.model_dump(mode="json", exclude_none=True),
+                 "query": " ".join(request.query.split()),
+                 "index_version": index_version}
+    return hashlib.sha256(json.dumps(canonical, sort_keys=True, separators=(",", ":")).encode()).hexdigest()
+
+class CacheBackend(Protocol):
+    def get(self, key: str) -> str | None: ...
+    def set(self, key: str, value: str) -> None: ...
+
+class InProcessBackend:
+    def __init__(self, maxsize: int, ttl_seconds: float):
+        self.cache = TTLCache("decisions", maxsize, ttl_seconds)
+
+    def get(self, key: str) -> str | None:
+        return self.cache.get(key)
+
+    def set(self, key: str, value: str) -> None:
+        self.cache.set(key, value)
+
+class RedisBackend:
+    """Shared backend; `client` is anything with redis-py's get/set(ex=) (defaults to redis.Redis.from_url(url))."""
+
+    def __init__(self, url: str = "", ttl_seconds: float = 900.0, prefix: str = "decision:", client=None):
+        if client is None:
+            import redis
+            client = redis.Redis.from_url(url, socket_timeout=0.25, socket_connect_timeout=0.25)
+        self.client, self.ttl_seconds, self.prefix = client, ttl_seconds, prefix
+
+    def get(self, key: str) -> str | None:
+        value = self.client.get(self.prefix + key)
+        return value.decode() if isinstance(value, bytes) else value
+
+    def set(self, key: str, value: str) -> None:
+        self.client.set(self.prefix + key, value, ex=max(1, int(self.ttl_seconds)))
+
+class DecisionCache:
+    def __init__(self, backend: CacheBackend):
+        self.backend = backend
+        self.hits = self.misses = self.errors = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str, request: DecisionRequest) -> DecisionResponse | None:
+        try:
+            raw = self.backend.get(key)
+        except Exception as exc:  # a cache outage must never fail a decision
+            raw = None
+            self._count("errors")
+            logger.warning("Decision cache read failed: %s", exc)
+        self._count("hits" if raw is not None else "misses")
+        if raw is None:
+            return None
+        return DecisionResponse.model_validate_json(raw).model_copy(update={"session_id": request.session_id,
+                                                                            "cache_hit": True})
+
+    def set(self, key: str, response: DecisionResponse) -> None:
+        try:
+            self.backend.set(key, response.model_dump_json(exclude={"cache_hit"}))
+        except Exception as exc:
+            self._count("errors")
+            logger.warning("Decision cache write failed: %s", exc)
+
+    def _count(self, counter: str) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {"backend": type(self.backend).__name__, "hits": self.hits, "misses": self.misses,
+                    "errors": self.errors, "hit_rate": self.hits / total if total else 0.0}
+
+def build_decision_cache() -> DecisionCache | None:
+    if not settings.decision_cache_enabled:
+        return None
+    if settings.decision_cache_url:
+        return DecisionCache(RedisBackend(settings.decision_cache_url, settings.decision_cache_ttl_seconds,
+                                          settings.decision_cache_prefix))
+    return DecisionCache(InProcessBackend(settings.decision_cache_size, settings.decision_cache_ttl_seconds))
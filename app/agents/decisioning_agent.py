@@ -1,29 +1,49 @@
 """DecisioningAgent: LangChain tool-calling agent on AWS Bedrock."""
 from __future__ import annotations
-import json, logging
-from typing import Any
+import asyncio, json, logging, time
+from typing import Any, AsyncIterator, Callable, Sequence
 from langchain.agents import AgentExecutor, create_tool_calling_agent
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
-from app.agents.tools import build_tools
+from app.agents.decision_cache import DecisionCache, build_decision_cache, decision_key
+from app.agents.rules import evaluate_fast_path
+from app.agents.singleflight import SingleFlight
+from app.agents.tools import build_tools, format_policies, policy_titles
+from app.chains.clients import get_client
+from app.chains.limiter import bedrock_limiter
 from app.models.schemas import DecisionRequest, DecisionResponse
 from app.rag.retriever import build_retriever
+from app.utils import tracing
 from app.utils.config import settings
+from app.utils.metrics import DECISION_SECONDS, DECISIONS, metrics_callback
 
 logger = logging.getLogger(__name__)
 
 SYSTEM_PROMPT = """You are an expert financial decisioning agent.
 Evaluate loan/credit applications using company policies and risk guidelines.
-ALWAYS use policy_retriever before deciding. Use credit_scorer, dti_calculator, and fraud_check as needed.
+Relevant policies are retrieved for you and included with the application; base your decision on them.
+Use policy_retriever only when they do not cover the case, passing the decision type and, when the applicant gives
+them, the product (e.g. loan_purpose) and jurisdiction so only applicable policies come back. Use credit_scorer, dti_calculator, and fraud_check as needed.
 Respond ONLY with valid JSON:
-{"decision":"APPROVE"|"DECLINE"|"REFER","confidence":<0-1>,"reasoning":"...","risk_factors":["..."],"retrieved_policies":["..."]}"""
+{{"decision":"APPROVE"|"DECLINE"|"REFER","confidence":<0-1>,"reasoning":"...","risk_factors":["..."],"retrieved_policies":["..."]}}"""
+
+DECISION_LABELS = ("APPROVE", "DECLINE", "REFER")  # anything else the model returns is counted as OTHER
+
+Emit = Callable[[tuple[str, dict[str, Any]]], None]
 
 class DecisioningAgent:
-    def __init__(self):
-        from langchain_aws import ChatBedrock
-        self.llm = ChatBedrock(model_id=settings.bedrock_model_id, region_name=settings.aws_region,
-                               model_kwargs={"temperature": 0.1, "max_tokens": 2048})
-        self.retriever = build_retriever()
+    decision_cache: DecisionCache | None = None
+    single_flight: SingleFlight | None = None
+
+    def __init__(self, llm=None, retriever=None):
+        if llm is None:
+            from langchain_aws import ChatBedrock
+            llm = ChatBedrock(client=get_client("bedrock-runtime"), model_id=settings.bedrock_model_id,
+                              model_kwargs={"temperature": 0.1, "max_tokens": 2048})
+        self.llm = llm
+        self.retriever = retriever if retriever is not None else build_retriever()
         self.tools = build_tools(self.retriever)
+        self.decision_cache = build_decision_cache()
+        self.single_flight = SingleFlight() if settings.decision_coalescing_enabled else None
         prompt = ChatPromptTemplate.from_messages([
             ("system", SYSTEM_PROMPT),
             ("human", "{input}"),
@@ -31,17 +51,200 @@ class DecisioningAgent:
         ])
         agent = create_tool_calling_agent(self.llm, self.tools, prompt)
         self.executor = AgentExecutor(agent=agent, tools=self.tools, verbose=settings.agent_verbose,
-                                      max_iterations=5, handle_parsing_errors=True)
+                                      max_iterations=5, handle_parsing_errors=True, return_intermediate_steps=True)
         logger.info("DecisioningAgent ready | model=%s | tools=%s", settings.bedrock_model_id, [t.name for t in self.tools])
 
-    async def run(self, request: DecisionRequest) -> DecisionResponse:
-        agent_input = (f"Decision type: {request.decision_type.value}\n"
-                       f"Applicant: {json.dumps(request.applicant.model_dump(exclude_none=True), indent=2)}\n"
-                       f"Question: {request.query}")
-        result = await self.executor.ainvoke({"input": agent_input})
-        raw = result.get("output", "{}")
+    async def run(self, request: DecisionRequest, emit: Emit | None = None) -> DecisionResponse:
+        """Decide `request`: rules fast path, then the decision cache, then the agent (coalesced with identical
+        in-flight runs). `emit`, when given, receives the agent's intermediate (event, data) pairs; see stream()."""
+        started = time.perf_counter()
+        with tracing.start("decision", request.trace or settings.trace_enabled, session_id=request.session_id,
+                           decision_type=request.decision_type.value) as trace:
+            with tracing.span("rules"):
+                fast = evaluate_fast_path(request)
+            response = fast if fast is not None else await self._decide(request, emit)
+        _record_decision(response, started)
+        if trace is not None:
+            tree = trace.finish(decision=response.decision, decision_path=response.decision_path.value,
+                                cache_hit=response.cache_hit)
+            await asyncio.to_thread(tracing.record, {"session_id": request.session_id, "trace": tree})
+            if request.trace:
+                response = response.model_copy(update={"trace": tree})
+        return response
+
+    async def run_many(self, requests: Sequence[DecisionRequest],
+                       concurrency: int | None = None) -> AsyncIterator[tuple[int, DecisionResponse | Exception]]:
+        """Decide a batch, yielding (index, response-or-exception) as each item completes.
+
+        Each item goes through run(), so per-item `trace` is honoured. Rules fast-path items never wait; agent runs
+        share this instance's LLM client and retriever and are bounded by `concurrency` (default
+        settings.batch_max_concurrency).
+        """
+        limit = asyncio.Semaphore(concurrency or settings.batch_max_concurrency)
+
+        async def _one(index: int, request: DecisionRequest) -> tuple[int, DecisionResponse | Exception]:
+            try:
+                if evaluate_fast_path(request) is not None:  # pure and cheap; run() evaluates it again in its trace
+                    return index, await self.run(request)
+                async with limit:
+                    return index, await self.run(request)
+            except Exception as exc:
+                logger.warning("Batch item %d (session=%s) failed: %s", index, request.session_id, exc)
+                return index, exc
+
+        tasks = [asyncio.create_task(_one(i, r)) for i, r in enumerate(requests)]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def stream(self, request: DecisionRequest) -> AsyncIterator[tuple[str, dict[str, Any]]]:
+        """Decide `request` through run(), yielding (event, data) pairs as the agent works.
+
+        Events: "policies" (retrieved policy titles, prefetched or from a policy_retriever call), "tool_call",
+        "token" (model output text as it is generated) and finally "decision" (the DecisionResponse, with its trace
+        when requested). Rules fast-path and cache results, and requests coalesced onto an identical in-flight
+        decision, yield only "decision". The run is a separate task, so tracing state never spans a yield; it is
+        cancelled if the client goes away (a shared coalesced run carries on for its other callers).
+        """
+        events: asyncio.Queue[tuple[str, dict[str, Any]] | None] = asyncio.Queue()
+        task = asyncio.create_task(self.run(request, emit=events.put_nowait))
+        task.add_done_callback(lambda _: events.put_nowait(None))
+        try:
+            while (event := await events.get()) is not None:
+                yield event
+            response = task.result()
+        finally:
+            task.cancel()
+        yield "decision", response.model_dump(mode="json")
+
+    async def _decide(self, request: DecisionRequest, emit: Emit | None = None) -> DecisionResponse:
+        """Agent decision, served from the decision cache when an identical application was already decided,
+        and coalesced with any identical one still in flight."""
+        cache, flight = self.decision_cache, self.single_flight
+        if cache is None and flight is None:
+            return (await self._run_agent(request, emit))[0]
+        key = await asyncio.to_thread(lambda: decision_key(request, self._index_version()))
+        if cache is not None:
+            with tracing.span("cache_lookup") as span:
+                cached = await asyncio.to_thread(cache.get, key, request)
+                tracing.annotate(span, hit=cached is not None)
+            if cached is not None:
+                logger.info("Decision cache hit | session=%s", request.session_id)
+                return cached
+        if flight is None:
+            return await self._run_and_store(request, key, emit)
+        response = await flight.do(key, lambda: self._run_and_store(request, key, emit))
+        if response.session_id != request.session_id:
+            logger.info("Coalesced with in-flight decision | session=%s", request.session_id)
+            response = response.model_copy(update={"session_id": request.session_id})
+        return response
+
+    async def _run_and_store(self, request: DecisionRequest, key: str, emit: Emit | None = None) -> DecisionResponse:
+        response, parsed = await self._run_agent(request, emit)
+        await self._store(key, response, parsed)
+        return response
+
+    async def _store(self, key: str | None, response: DecisionResponse, parsed: bool) -> None:
+        # An unparseable model output is a fallback REFER, not a decision: caching it would replay it for the TTL.
+        if self.decision_cache is None or key is None:
+            return
+        if not parsed:
+            logger.warning("Not caching unparseable agent output | session=%s", response.session_id)
+            return
+        await asyncio.to_thread(self.decision_cache.set, key, response)
+
+    def _index_version(self):
+        store = getattr(self.retriever, "vectorstore", None)
+        return store.current_version() if hasattr(store, "current_version") else None
+
+    async def _run_agent(self, request: DecisionRequest, emit: Emit | None = None) -> tuple[DecisionResponse, bool]:
+        _admit()
+        # Retrieval starts first and runs while the input is formatted; it is awaited only when the input needs it.
+        prefetch = asyncio.create_task(self._prefetch_policies(request)) if settings.agent_prefetch_policies else None
+        agent_input = self._agent_input(request)
+        if prefetch is not None:
+            policies = await prefetch
+            agent_input += f"\n\nRelevant policies:\n{policies}"
+            if emit is not None:
+                emit(("policies", {"source": "prefetch", "titles": policy_titles(policies)}))
+        payload = {"input": agent_input}
+        config = {"callbacks": [metrics_callback, *tracing.callbacks()]}
+        with tracing.span("agent") as span:
+            if emit is None:
+                result = await self.executor.ainvoke(payload, config)
+                raw, tool_calls = result.get("output", "{}"), len(result.get("intermediate_steps", []))
+            else:
+                raw, tool_calls = await self._stream_agent(payload, config, emit)
+            tracing.annotate(span, tool_calls=tool_calls)
+        logger.info("Agent finished session=%s after %d tool call(s)", request.session_id, tool_calls)
+        with tracing.span("parse"):
+            return self._parse_output(request, raw)
+
+    async def _stream_agent(self, payload: dict[str, Any], config: dict[str, Any], emit: Emit) -> tuple[str, int]:
+        """Run the executor via astream_events, emitting tokens, tool calls and retrieved policies; returns the raw
+        final output and the number of tool calls."""
+        raw, tool_calls = "{}", 0
+        async for event in self.executor.astream_events(payload, config, version="v2"):
+            kind = event["event"]
+            if kind == "on_chat_model_stream":
+                text = _chunk_text(event["data"]["chunk"])
+                if text:
+                    emit(("token", {"text": text}))
+            elif kind == "on_tool_start":
+                tool_calls += 1
+                emit(("tool_call", {"tool": event["name"], "input": event["data"].get("input")}))
+            elif kind == "on_tool_end" and event["name"] == "policy_retriever":
+                emit(("policies", {"source": "policy_retriever", "titles": policy_titles(str(event["data"].get("output", "")))}))
+            elif kind == "on_chain_end" and not event["parent_ids"]:
+                raw = event["data"]["output"].get("output", "{}")
+        return raw, tool_calls
+
+    @staticmethod
+    def _agent_input(request: DecisionRequest) -> str:
+        return (f"Decision type: {request.decision_type.value}\n"
+                f"Applicant: {json.dumps(request.applicant.model_dump(exclude_none=True), indent=2)}\n"
+                f"Question: {request.query}")
+
+    @staticmethod
+    def _parse_output(request: DecisionRequest, raw: str) -> tuple[DecisionResponse, bool]:
+        """The response and whether the model's output parsed; unparseable output becomes a REFER carrying it."""
         try:
             parsed: dict[str, Any] = json.loads(raw)
+            ok = True
         except json.JSONDecodeError:
             parsed = {"decision": "REFER", "confidence": 0.5, "reasoning": raw, "risk_factors": [], "retrieved_policies": []}
-        return DecisionResponse(session_id=request.session_id, raw_agent_output=raw, **parsed)
+            ok = False
+        return DecisionResponse(session_id=request.session_id, raw_agent_output=raw, **parsed), ok
+
+    async def _prefetch_policies(self, request: DecisionRequest) -> str:
+        """Retrieve policies for the request up front, filtered like a policy_retriever call would be."""
+        applicant = request.applicant
+        query = " ".join(filter(None, [request.decision_type.value, applicant.loan_purpose, request.query]))
+        policy_filter = {"decision_type": request.decision_type.value,
+                         "product": applicant.metadata.get("product"),
+                         "jurisdiction": applicant.metadata.get("jurisdiction")}
+        with tracing.span("prefetch", "retriever", query=query) as span:
+            docs = await asyncio.to_thread(self.retriever.invoke, query, filter={k: v for k, v in policy_filter.items() if v})
+            tracing.annotate(span, hits=len(docs), titles=[d.metadata.get("title") for d in docs])
+        return format_policies(docs)
+
+def _admit() -> None:
+    """Shed the agent run (Overloaded -> 429) before it queues for Bedrock behind a full queue."""
+    if settings.bedrock_limiter_enabled:
+        bedrock_limiter.admit()
+
+def _record_decision(response: DecisionResponse, started: float) -> DecisionResponse:
+    path = "cache" if response.cache_hit else response.decision_path.value
+    DECISION_SECONDS.labels(path).observe(time.perf_counter() - started)
+    DECISIONS.labels(path, response.decision if response.decision in DECISION_LABELS else "OTHER").inc()
+    return response
+
+def _chunk_text(chunk) -> str:
+    """Text of a streamed message chunk; Bedrock/Anthropic chunks carry a list of content blocks."""
+    content = getattr(chunk, "content", "")
+    if isinstance(content, str):
+        return content
+    return "".join(block.get("text", "") for block in content if isinstance(block, dict) and block.get("type") == "text")
@@ -0,0 +1,55 @@
+"""Deterministic rules engine: shared scoring thresholds and the fast-path decision stage."""
+from __future__ import annotations
+import logging
+from app.agents import scoring
+from app.models.schemas import DecisionPath, DecisionRequest, DecisionResponse, DecisionType
+from app.utils.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Thresholds from the "Loan Approval Matrix — Consumer Lending" policy. Auto-approve is the LOW_RISK tier.
+# The matrix's DTI >55% auto-decline is not applied here: the DTI available to the rules is (existing debt + loan
+# principal) / annual income, not debt service, so high values escalate to the agent instead of declining outright.
+AUTO_APPROVE_MIN_SCORE = scoring.LOW_RISK_MIN_SCORE
+AUTO_APPROVE_MAX_DTI = scoring.LOW_RISK_MAX_DTI
+AUTO_DECLINE_MAX_SCORE = 580
+APPROVAL_MATRIX_POLICY = "Loan Approval Matrix — Consumer Lending"
+FAST_PATH_DECISION_TYPES = (DecisionType.CREDIT, DecisionType.LOAN)
+
+# Single-applicant views of the vectorized rules in app.agents.scoring.
+
+def debt_to_income(annual_income: float, loan_amount: float, existing_debt: float = 0.0) -> float:
+    """Debt-to-income ratio as used by credit_scorer; 1.0 when income is unknown or zero."""
+    return float(scoring.debt_to_income(annual_income, loan_amount, existing_debt))
+
+def credit_risk_tier(credit_score: int, dti: float) -> str:
+    return scoring.TIERS[int(scoring.risk_tiers(credit_score, dti))]
+
+def fraud_signals(loan_amount: float, annual_income: float) -> list[str]:
+    return scoring.fraud_messages(scoring.fraud_flags(loan_amount, annual_income))
+
+def evaluate_fast_path(request: DecisionRequest) -> DecisionResponse | None:
+    """Return a rules-based decision for clear-cut applications, or None to escalate to the agent."""
+    if not settings.rules_fast_path_enabled or request.decision_type not in FAST_PATH_DECISION_TYPES:
+        return None
+    a = request.applicant
+    if a.credit_score is None or a.annual_income is None or a.loan_amount is None or a.annual_income <= 0:
+        return None
+    dti = debt_to_income(a.annual_income, a.loan_amount, a.existing_debt or 0.0)
+    signals = fraud_signals(a.loan_amount, a.annual_income)
+
+    if a.credit_score < AUTO_DECLINE_MAX_SCORE:
+        reason = f"Credit score {a.credit_score} below auto-decline floor of {AUTO_DECLINE_MAX_SCORE}"
+        return _response(request, "DECLINE", 0.95, f"Auto-decline per loan approval matrix: {reason}.", [reason] + signals)
+
+    if a.credit_score >= AUTO_APPROVE_MIN_SCORE and dti < AUTO_APPROVE_MAX_DTI and not signals:
+        return _response(request, "APPROVE", 0.95,
+                         f"Auto-approve per loan approval matrix: credit score {a.credit_score} ≥{AUTO_APPROVE_MIN_SCORE}, "
+                         f"debt-to-income ratio {dti:.2%} <{AUTO_APPROVE_MAX_DTI:.0%}, no fraud signals.", [])
+    return None
+
+def _response(request: DecisionRequest, decision: str, confidence: float, reasoning: str, risk_factors: list[str]) -> DecisionResponse:
+    logger.info("Rules fast path | session=%s | decision=%s", request.session_id, decision)
+    return DecisionResponse(session_id=request.session_id, decision=decision, confidence=confidence, reasoning=reasoning,
+                            risk_factors=risk_factors, retrieved_policies=[APPROVAL_MATRIX_POLICY],
+                            decision_path=DecisionPath.RULES)
@@ -0,0 +1,78 @@
+"""Vectorized credit scoring rules: risk tiers, DTI ratios and fraud signals over columnar NumPy arrays.
+
+Every function accepts scalars or equal-length arrays and returns arrays, so the same rules back the single-applicant
+agent tools and bulk portfolio runs (millions of rows per call).
+"""
+from __future__ import annotations
+import numpy as np
+
+TIERS = ("LOW_RISK", "MEDIUM_RISK", "HIGH_RISK", "VERY_HIGH_RISK")
+LOW_RISK, MEDIUM_RISK, HIGH_RISK, VERY_HIGH_RISK = range(4)
+
+# Tier boundaries from the credit underwriting guidelines.
+LOW_RISK_MIN_SCORE, LOW_RISK_MAX_DTI = 750, 0.36
+MEDIUM_RISK_MIN_SCORE, MEDIUM_RISK_MAX_DTI = 680, 0.43
+HIGH_RISK_MIN_SCORE = 620
+
+# Fraud signals, as bit flags.
+FRAUD_HIGH_LOAN_TO_INCOME, FRAUD_LOW_INCOME, FRAUD_HIGH_VALUE = 1, 2, 4
+FRAUD_SIGNALS = {
+    FRAUD_HIGH_LOAN_TO_INCOME: "Loan amount >5x annual income — unusually high",
+    FRAUD_LOW_INCOME: "Annual income below poverty threshold",
+    FRAUD_HIGH_VALUE: "High-value loan — requires enhanced due diligence",
+}
+FRAUD_MAX_LOAN_TO_INCOME, FRAUD_MIN_INCOME, FRAUD_HIGH_VALUE_AMOUNT = 5, 15_000, 500_000
+
+# Front-end / back-end DTI limits used by dti_calculator.
+FRONT_END_MAX_DTI, BACK_END_MAX_DTI = 0.28, 0.43
+
+SCORE_DTYPE = np.dtype([("dti", "f8"), ("loan_to_income", "f8"), ("tier", "i1"), ("fraud_flags", "u1")])
+
+def _ratio(numerator, denominator) -> np.ndarray:
+    numerator, denominator = np.asarray(numerator, dtype=np.float64), np.asarray(denominator, dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(denominator > 0, numerator / np.where(denominator > 0, denominator, 1.0), 1.0)
+
+def debt_to_income(annual_income, loan_amount, existing_debt=0.0) -> np.ndarray:
+    """(existing debt + loan) / income; 1.0 where income is unknown or zero."""
+    return _ratio(np.add(existing_debt, loan_amount, dtype=np.float64), annual_income)
+
+def loan_to_income(loan_amount, annual_income) -> np.ndarray:
+    return _ratio(loan_amount, annual_income)
+
+def risk_tiers(credit_score, dti) -> np.ndarray:
+    """Tier codes (indexes into TIERS) as int8."""
+    credit_score, dti = np.asarray(credit_score), np.asarray(dti)
+    return np.select([(credit_score >= LOW_RISK_MIN_SCORE) & (dti < LOW_RISK_MAX_DTI),
+                      (credit_score >= MEDIUM_RISK_MIN_SCORE) & (dti < MEDIUM_RISK_MAX_DTI),
+                      credit_score >= HIGH_RISK_MIN_SCORE],
+                     [LOW_RISK, MEDIUM_RISK, HIGH_RISK], VERY_HIGH_RISK).astype(np.int8)
+
+def fraud_flags(loan_amount, annual_income) -> np.ndarray:
+    """Bitwise OR of the FRAUD_* flags raised by each row, as uint8."""
+    loan_amount, annual_income = np.asarray(loan_amount, dtype=np.float64), np.asarray(annual_income, dtype=np.float64)
+    return ((loan_amount > annual_income * FRAUD_MAX_LOAN_TO_INCOME) * FRAUD_HIGH_LOAN_TO_INCOME
+            | (annual_income < FRAUD_MIN_INCOME) * FRAUD_LOW_INCOME
+            | (loan_amount > FRAUD_HIGH_VALUE_AMOUNT) * FRAUD_HIGH_VALUE).astype(np.uint8)
+
+def dti_ratios(monthly_income, monthly_existing_debt, proposed_monthly_payment) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Front-end DTI, back-end DTI and whether both are within limits."""
+    front_end = _ratio(proposed_monthly_payment, monthly_income)
+    back_end = _ratio(np.add(monthly_existing_debt, proposed_monthly_payment, dtype=np.float64), monthly_income)
+    return front_end, back_end, (front_end < FRONT_END_MAX_DTI) & (back_end < BACK_END_MAX_DTI)
+
+def score_portfolio(credit_score, annual_income, loan_amount, existing_debt=0.0) -> np.ndarray:
+    """Score every row at once into a SCORE_DTYPE structured array."""
+    dti = debt_to_income(annual_income, loan_amount, existing_debt)
+    out = np.empty(dti.shape, dtype=SCORE_DTYPE)
+    out["dti"] = dti
+    out["loan_to_income"] = loan_to_income(loan_amount, annual_income)
+    out["tier"] = risk_tiers(credit_score, dti)
+    out["fraud_flags"] = fraud_flags(loan_amount, annual_income)
+    return out
+
+def tier_names(codes) -> np.ndarray:
+    return np.asarray(TIERS)[np.asarray(codes)]
+
+def fraud_messages(flags: int) -> list[str]:
+    return [message for flag, message in FRAUD_SIGNALS.items() if int(flags) & flag]
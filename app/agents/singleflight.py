@@ -0,0 +1,33 @@
+"""Single-flight coalescing: concurrent calls with the same key share one in-flight execution."""
+from __future__ import annotations
+import asyncio
+from typing import Any, Awaitable, Callable
+
+class SingleFlight:
+    def __init__(self):
+        self._inflight: dict[str, asyncio.Task] = {}
+        self.leaders = self.coalesced = 0
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Await `fn()` or, if a call with `key` is already running, its result (or exception).
+
+        The shared work runs in its own task, so one caller disconnecting does not cancel it for the others.
+        """
+        task = self._inflight.get(key)
+        if task is None:
+            self.leaders += 1
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._done(key, t))
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    def _done(self, key: str, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            task.exception()  # mark retrieved even if every waiter went away
+
+    def stats(self) -> dict[str, int]:
+        return {"in_flight": len(self._inflight), "leaders": self.leaders, "coalesced": self.coalesced}
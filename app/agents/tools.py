@@ -1,38 +1,44 @@
 """Agent Tools: policy_retriever, credit_scorer, dti_calculator, fraud_check."""
 from __future__ import annotations
 import logging
+import re
 from langchain.tools import tool
+from app.agents import scoring
 
 logger = logging.getLogger(__name__)
 
+POLICY_HEADER_RE = re.compile(r"^\[\d+\] (.+):$", re.MULTILINE)
+
+def format_policies(docs) -> str:
+    if not docs:
+        return "No relevant policy documents found."
+    results = []
+    for i, doc in enumerate(docs[:4], 1):
+        title = doc.metadata.get("title", f"Document {i}")
+        results.append(f"[{i}] {title}:\n{doc.page_content[:500]}")
+    return "\n\n".join(results)
+
+def policy_titles(formatted: str) -> list[str]:
+    """Titles of the policies in format_policies output (a prefetch or a policy_retriever result)."""
+    return POLICY_HEADER_RE.findall(formatted)
+
 def build_tools(retriever) -> list:
     @tool
-    def policy_retriever(query: str) -> str:
-        """Retrieve relevant financial policy documents. Use before any credit/fraud decision."""
-        docs = retriever.invoke(query)
-        if not docs:
-            return "No relevant policy documents found."
-        results = []
-        for i, doc in enumerate(docs[:4], 1):
-            title = doc.metadata.get("title", f"Document {i}")
-            results.append(f"[{i}] {title}:\n{doc.page_content[:500]}")
-        return "\n\n".join(results)
+    def policy_retriever(query: str, decision_type: str | None = None, product: str | None = None,
+                         jurisdiction: str | None = None, as_of: str | None = None) -> str:
+        """Retrieve relevant financial policy documents. Use before any credit/fraud decision.
+        Pass decision_type, product and jurisdiction (and as_of, YYYY-MM-DD) when known to search only matching policies."""
+        filter = {k: v for k, v in {"decision_type": decision_type, "product": product,
+                                    "jurisdiction": jurisdiction, "as_of": as_of}.items() if v}
+        return format_policies(retriever.invoke(query, filter=filter) if filter else retriever.invoke(query))
 
     @tool
     def credit_scorer(credit_score: int, annual_income: float, loan_amount: float, existing_debt: float = 0.0) -> str:
         """Evaluate credit risk based on score, income, loan amount, and existing debt. Returns risk tier and key metrics."""
-        dti = (existing_debt + loan_amount) / annual_income if annual_income > 0 else 1.0
-        ltv = loan_amount / annual_income if annual_income > 0 else 1.0
-        if credit_score >= 750 and dti < 0.36:
-            tier = "LOW_RISK"
-        elif credit_score >= 680 and dti < 0.43:
-            tier = "MEDIUM_RISK"
-        elif credit_score >= 620:
-            tier = "HIGH_RISK"
-        else:
-            tier = "VERY_HIGH_RISK"
+        row = scoring.score_portfolio(credit_score, annual_income, loan_amount, existing_debt)
+        tier = scoring.TIERS[row["tier"]]
         return (f"Risk Tier: {tier}\nCredit Score: {credit_score}\n"
-                f"Debt-to-Income Ratio: {dti:.2%}\nLoan-to-Income Ratio: {ltv:.2%}\n"
+                f"Debt-to-Income Ratio: {row['dti']:.2%}\nLoan-to-Income Ratio: {row['loan_to_income']:.2%}\n"
                 f"Recommendation: {'Proceed' if tier in ('LOW_RISK','MEDIUM_RISK') else 'Caution'}")
 
     @tool
@@ -40,24 +46,16 @@ def build_tools(retriever) -> list:
         """Calculate front-end and back-end debt-to-income ratios. Thresholds: front-end <28%, back-end <43%."""
         if monthly_income <= 0:
             return "Invalid monthly income."
-        front_end = proposed_monthly_payment / monthly_income
-        back_end = (monthly_existing_debt + proposed_monthly_payment) / monthly_income
-        front_ok = front_end < 0.28
-        back_ok = back_end < 0.43
+        front_end, back_end, passed = scoring.dti_ratios(monthly_income, monthly_existing_debt, proposed_monthly_payment)
+        front_ok, back_ok = front_end < scoring.FRONT_END_MAX_DTI, back_end < scoring.BACK_END_MAX_DTI
         return (f"Front-end DTI: {front_end:.2%} ({'OK' if front_ok else 'Exceeds 28% threshold'})\n"
                 f"Back-end DTI:  {back_end:.2%} ({'OK' if back_ok else 'Exceeds 43% threshold'})\n"
-                f"Overall DTI Assessment: {'PASS' if front_ok and back_ok else 'FAIL'}")
+                f"Overall DTI Assessment: {'PASS' if passed else 'FAIL'}")
 
     @tool
     def fraud_check(applicant_id: str, loan_amount: float, annual_income: float) -> str:
         """Run lightweight fraud signal checks on an application."""
-        signals = []
-        if loan_amount > annual_income * 5:
-            signals.append("Loan amount >5x annual income — unusually high")
-        if annual_income < 15_000:
-            signals.append("Annual income below poverty threshold")
-        if loan_amount > 500_000:
-            signals.append("High-value loan — requires enhanced due diligence")
+        signals = scoring.fraud_messages(scoring.fraud_flags(loan_amount, annual_income))
         logger.info("Fraud velocity check for applicant_id=%s", applicant_id)
         if not signals:
             return "No fraud signals detected. Application appears clean."
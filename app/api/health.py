@@ -1,25 +1,37 @@
 """Health and readiness endpoints."""
 
 from fastapi import APIRouter, Request
+from fastapi.responses import JSONResponse
 from app.schemas.decision import HealthStatus
-from app.chains.bedrock_llm import ping_bedrock
+from app.chains.bedrock_llm import BedrockHealth
 
 health_router = APIRouter()
 
 
+@health_router.get("", response_model=HealthStatus, include_in_schema=False)  # /health, hit by the liveness probe
 @health_router.get("/", response_model=HealthStatus)
 async def health(request: Request) -> HealthStatus:
     agent = getattr(request.app.state, "agent", None)
-    return HealthStatus(
-        status="ok",
-        bedrock_connected=ping_bedrock(),
+    monitor = getattr(request.app.state, "bedrock_monitor", None)
+    bedrock = monitor.status if monitor is not None else BedrockHealth()
+    failed = getattr(request.app.state, "degraded", False) and not getattr(request.app.state, "ready", True)
+    status = HealthStatus(
+        status="warmup_failed" if failed else "ok",
+        bedrock_connected=bedrock.connected,
+        bedrock_checked_at=bedrock.checked_at,
+        bedrock_latency_ms=bedrock.latency_ms,
         vector_store_ready=agent is not None and agent.retriever is not None,
     )
+    # Warm-up gave up and degraded serving is off: fail liveness so the pod is restarted rather than left unready
+    return JSONResponse(status_code=503, content=status.model_dump(mode="json")) if failed else status
 
 
 @health_router.get("/ready")
 async def readiness(request: Request):
-    agent = getattr(request.app.state, "agent", None)
-    if agent is None:
-        return {"ready": False}
+    state = request.app.state
+    if not getattr(state, "ready", False):
+        error = {"warmup_error": getattr(state, "warmup_error", None)} if getattr(state, "degraded", False) else {}
+        return JSONResponse(status_code=503, content={"ready": False, **error})
+    if getattr(state, "degraded", False):
+        return {"ready": True, "degraded": True, "warmup_error": getattr(state, "warmup_error", None)}
     return {"ready": True}
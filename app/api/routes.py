@@ -1,43 +1,179 @@
-"""API routes: /decide, /ingest, /agent/tools"""
+"""API routes: /decide, /decide/stream, /decide/batch, /ingest, /ingest/{job_id}, /stress-test, /agent/tools, /cache/stats"""
+import asyncio
+import json
 import logging
-from fastapi import APIRouter, HTTPException, BackgroundTasks
-from app.models.schemas import DecisionRequest, DecisionResponse, IngestRequest, IngestResponse
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
+from app.agents.stress import available_cpus, run_stress_test
+from app.chains.limiter import Overloaded, bedrock_limiter
+from app.models.schemas import (BatchDecisionItem, BatchDecisionRequest, DecisionRequest, DecisionResponse,
+                                IngestJobStatus, IngestRequest, IngestResponse, StressTestRequest, StressTestResponse)
+from app.rag.cache import cache_stats
+from app.rag.jobs import IngestJobQueue, QueueFullError
+from app.utils.config import settings
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 _agent = None
 _ingestor = None
+_ingest_queue = None
+_ingest_queue_lock = threading.Lock()
+_build_lock = threading.Lock()  # background warm-up and a first request must not build two agents/stores
+_stress_lock = threading.Lock()  # one stress run at a time: its worker processes share this pod's memory with /decide
 
 def get_agent():
     global _agent
     if _agent is None:
-        from app.agents.decisioning_agent import DecisioningAgent
-        _agent = DecisioningAgent()
+        with _build_lock:
+            if _agent is None:
+                from app.agents.decisioning_agent import DecisioningAgent
+                _agent = DecisioningAgent()
     return _agent
 
 def get_ingestor():
     global _ingestor
     if _ingestor is None:
-        from app.rag.ingestion import RagIngestionService
-        _ingestor = RagIngestionService()
+        with _build_lock:
+            if _ingestor is None:
+                from app.rag.ingestion import RagIngestionService
+                _ingestor = RagIngestionService()
     return _ingestor
 
+def get_ingest_queue() -> IngestJobQueue:
+    global _ingest_queue
+    with _ingest_queue_lock:
+        if _ingest_queue is None:
+            _ingest_queue = IngestJobQueue(
+                settings.ingest_jobs_db,
+                lambda docs, progress: get_ingestor().ingest(docs, progress, settings.ingest_job_embedding_workers),
+                workers=settings.ingest_workers, max_pending=settings.ingest_max_pending_jobs,
+                lease_seconds=settings.ingest_job_lease_seconds)
+            _ingest_queue.start()
+    return _ingest_queue
+
 @router.post("/decide", response_model=DecisionResponse)
 async def make_decision(request: DecisionRequest) -> DecisionResponse:
     """Run the LangChain decisioning agent on a financial application."""
     try:
         return await get_agent().run(request)
+    except Overloaded as exc:
+        raise _overloaded(exc)
     except Exception as exc:
         logger.exception("Agent execution failed: %s", exc)
         raise HTTPException(status_code=500, detail=str(exc))
 
+@router.post("/decide/stream")
+async def stream_decision(request: DecisionRequest) -> StreamingResponse:
+    """Run the agent, streaming policies, tool calls, model tokens and the final decision as server-sent events."""
+    agent = get_agent()
+    _admit()
+
+    async def _events():
+        try:
+            async for event, data in agent.stream(request):
+                yield _sse(event, data)
+        except Overloaded as exc:
+            yield _sse("error", {"detail": str(exc), "retry_after": exc.retry_after})
+        except Exception as exc:
+            logger.exception("Agent stream failed: %s", exc)
+            yield _sse("error", {"detail": str(exc)})
+
+    return StreamingResponse(_events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+def _admit() -> None:
+    """429 up front, before a streamed response commits to 200, when the Bedrock queue is already full."""
+    if settings.bedrock_limiter_enabled:
+        try:
+            bedrock_limiter.admit()
+        except Overloaded as exc:
+            raise _overloaded(exc)
+
+def _overloaded(exc: Overloaded) -> HTTPException:
+    return HTTPException(status_code=429, detail=str(exc), headers={"Retry-After": str(exc.retry_after)})
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+@router.post("/decide/batch")
+async def make_batch_decision(request: BatchDecisionRequest) -> StreamingResponse:
+    """Decide a batch of applications, streaming one NDJSON line per item as it completes."""
+    if len(request.requests) > settings.batch_max_size:
+        raise HTTPException(status_code=413, detail=f"Batch exceeds {settings.batch_max_size} requests.")
+    agent = get_agent()
+    _admit()
+
+    async def _lines():
+        async for index, result in agent.run_many(request.requests, request.concurrency):
+            item = BatchDecisionItem(index=index, session_id=request.requests[index].session_id)
+            if isinstance(result, Exception):
+                item.error = str(result) or type(result).__name__
+            else:
+                item.result = result
+            yield item.model_dump_json(exclude_none=True) + "\n"
+
+    return StreamingResponse(_lines(), media_type="application/x-ndjson")
+
 @router.post("/ingest", response_model=IngestResponse)
-async def ingest_documents(request: IngestRequest, background_tasks: BackgroundTasks) -> IngestResponse:
-    """Ingest policy documents into the vector store (background task)."""
-    background_tasks.add_task(get_ingestor().ingest, request.documents)
-    return IngestResponse(message=f"Ingestion queued for {len(request.documents)} document(s).", document_count=len(request.documents))
+async def ingest_documents(request: IngestRequest) -> IngestResponse:
+    """Queue policy documents for ingestion by the dedicated ingest workers; poll /ingest/{job_id} for progress."""
+    try:
+        # SQLite calls wait up to 30s for the write lock held by the ingest workers; keep them off the event loop
+        job_id = await asyncio.to_thread(lambda: get_ingest_queue().submit(request.documents))
+    except QueueFullError as exc:
+        raise HTTPException(status_code=429, detail=str(exc), headers={"Retry-After": "30"})
+    return IngestResponse(message=f"Ingestion queued for {len(request.documents)} document(s).",
+                          document_count=len(request.documents), job_id=job_id)
+
+@router.get("/ingest/{job_id}", response_model=IngestJobStatus)
+async def ingest_status(job_id: str) -> IngestJobStatus:
+    """Status, chunk progress and timing of an ingestion job."""
+    job = await asyncio.to_thread(lambda: get_ingest_queue().get(job_id))
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown ingestion job {job_id}")
+    return IngestJobStatus(job_id=job_id, **{k: _as_datetime(v) if k.endswith("_at") else v
+                                             for k, v in job.items() if k != "id"})
+
+def _as_datetime(ts: float | None) -> datetime | None:
+    return datetime.fromtimestamp(ts, tz=timezone.utc) if ts is not None else None
+
+@router.post("/stress-test", response_model=StressTestResponse)
+async def stress_test(request: StressTestRequest) -> StressTestResponse:
+    """Run the risk model guide's DTI stress scenarios over a stored portfolio; returns tier migration matrices."""
+    root = Path(settings.stress_portfolio_dir).resolve()
+    path = (root / request.path).resolve()
+    if not path.is_relative_to(root):
+        raise HTTPException(status_code=400, detail="Portfolio path must be inside the portfolio directory.")
+    if not path.is_file():
+        raise HTTPException(status_code=404, detail=f"Portfolio {request.path} not found")
+    if not _stress_lock.acquire(blocking=False):
+        raise HTTPException(status_code=429, detail="A stress test is already running", headers={"Retry-After": "30"})
+    try:
+        workers = min(request.workers or settings.stress_workers or available_cpus(), settings.stress_max_workers)
+        result = await asyncio.to_thread(run_stress_test, path, request.scenarios, None, max(1, workers))
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    finally:
+        _stress_lock.release()
+    return StressTestResponse(**result)
 
 @router.get("/agent/tools")
 async def list_tools():
     """List all tools registered with the decisioning agent."""
     return {"tools": [t.name for t in get_agent().tools]}
+
+@router.get("/cache/stats")
+async def retrieval_cache_stats():
+    """Hit/miss counters for the query-embedding, retrieval-result and decision caches, plus coalescing counts and
+    the Bedrock concurrency limiter's window."""
+    stats = cache_stats()
+    if _agent is not None and _agent.decision_cache is not None:
+        stats["decisions"] = _agent.decision_cache.stats()
+    if _agent is not None and _agent.single_flight is not None:
+        stats["coalescing"] = _agent.single_flight.stats()
+    if settings.bedrock_limiter_enabled:
+        stats["bedrock_limiter"] = bedrock_limiter.stats()
+    return stats
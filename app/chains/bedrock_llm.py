@@ -3,11 +3,14 @@ AWS Bedrock LLM client via LangChain.
 Uses Claude 3 Sonnet by default; configurable via env.
 """
 
+import asyncio
 import os
-import boto3
+import time
 import logging
+from dataclasses import dataclass
+from datetime import datetime, timezone
 from langchain_aws import ChatBedrock
-from langchain_core.messages import HumanMessage, SystemMessage
+from app.chains.clients import get_client
 
 logger = logging.getLogger(__name__)
 
@@ -17,11 +20,8 @@ BEDROCK_MODEL_ID = os.getenv("BEDROCK_MODEL_ID", "anthropic.claude-3-sonnet-2024
 
 def get_bedrock_client() -> ChatBedrock:
     """Return a LangChain ChatBedrock instance."""
-    session = boto3.Session(region_name=BEDROCK_REGION)
-    bedrock_runtime = session.client("bedrock-runtime")
-
     llm = ChatBedrock(
-        client=bedrock_runtime,
+        client=get_client("bedrock-runtime"),
         model_id=BEDROCK_MODEL_ID,
         model_kwargs={
             "temperature": 0.0,   # deterministic for credit decisions
@@ -32,12 +32,63 @@ def get_bedrock_client() -> ChatBedrock:
     return llm
 
 
+def probe_bedrock() -> None:
+    """Raise if Bedrock is unreachable. Uses the control-plane model metadata call, not an LLM invocation."""
+    get_client("bedrock").get_foundation_model(modelIdentifier=BEDROCK_MODEL_ID)
+
+
 def ping_bedrock() -> bool:
     """Return True if Bedrock is reachable."""
     try:
-        llm = get_bedrock_client()
-        llm.invoke([HumanMessage(content="ping")])
+        probe_bedrock()
         return True
     except Exception as exc:
         logger.warning("Bedrock ping failed: %s", exc)
         return False
+
+
+@dataclass(frozen=True)
+class BedrockHealth:
+    connected: bool = False
+    checked_at: datetime | None = None
+    latency_ms: float | None = None
+    error: str | None = None
+
+
+class BedrockHealthMonitor:
+    """Probe Bedrock on a fixed interval in the background and cache the last result for /health."""
+
+    def __init__(self, interval_seconds: float = 30.0, probe=probe_bedrock):
+        self.interval_seconds = interval_seconds
+        self._probe = probe
+        self._task: asyncio.Task | None = None
+        self.status = BedrockHealth()
+
+    async def check(self) -> BedrockHealth:
+        started = time.perf_counter()
+        try:
+            await asyncio.to_thread(self._probe)
+            connected, error = True, None
+        except Exception as exc:
+            logger.warning("Bedrock health probe failed: %s", exc)
+            connected, error = False, str(exc)
+        self.status = BedrockHealth(connected, datetime.now(timezone.utc), (time.perf_counter() - started) * 1000, error)
+        return self.status
+
+    async def _loop(self) -> None:
+        while True:
+            await self.check()
+            await asyncio.sleep(self.interval_seconds)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
@@ -0,0 +1,49 @@
+"""Process-wide boto3 clients: one per AWS service, shared by ChatBedrock, BedrockEmbeddings and the health probe.
+
+boto3 clients are thread-safe and each holds its own urllib3 connection pool, so building one per consumer
+splits the connections between them. With the botocore default of 10 pooled connections, calls beyond that
+open a fresh TLS connection and throw it away afterwards. The shared clients pool AWS_MAX_POOL_CONNECTIONS
+kept-alive connections, use AWS_RETRY_MODE retries (adaptive adds botocore's client-side rate limiting on top
+of the concurrency limiter in app.chains.limiter), and set explicit connect/read timeouts.
+"""
+from __future__ import annotations
+import logging
+import threading
+from typing import Any
+import boto3
+from botocore.config import Config
+from app.chains.limiter import limit_bedrock_client
+from app.utils.config import settings
+
+logger = logging.getLogger(__name__)
+
+_clients: dict[str, Any] = {}
+_lock = threading.Lock()  # boto3 sessions are not thread-safe; warm-up and the health probe build clients concurrently
+
+def client_config() -> Config:
+    return Config(region_name=settings.aws_region, max_pool_connections=settings.aws_max_pool_connections,
+                  tcp_keepalive=settings.aws_tcp_keepalive, connect_timeout=settings.aws_connect_timeout_seconds,
+                  read_timeout=settings.aws_read_timeout_seconds,
+                  retries={"mode": settings.aws_retry_mode, "total_max_attempts": settings.aws_max_attempts})
+
+def get_client(service: str = "bedrock-runtime"):
+    """Return the shared client for `service`, creating it on first use. bedrock-runtime clients honour
+    BEDROCK_ENDPOINT_URL and go through the shared Bedrock concurrency limiter."""
+    with _lock:
+        client = _clients.get(service)
+        if client is None:
+            endpoint_url = settings.bedrock_endpoint_url if service == "bedrock-runtime" else ""
+            client = boto3.session.Session().client(service, config=client_config(), endpoint_url=endpoint_url or None)
+            if service == "bedrock-runtime":
+                limit_bedrock_client(client)
+            _clients[service] = client
+            logger.info("AWS client ready | service=%s region=%s pool=%d retries=%s", service, settings.aws_region,
+                        settings.aws_max_pool_connections, settings.aws_retry_mode)
+        return client
+
+def reset_clients() -> None:
+    """Drop the shared clients so the next get_client() picks up changed settings."""
+    with _lock:
+        for client in _clients.values():
+            client.close()
+        _clients.clear()
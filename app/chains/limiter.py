@@ -0,0 +1,163 @@
+"""Adaptive (AIMD) concurrency limiter shared by every Bedrock runtime call — ChatBedrock turns and BedrockEmbeddings
+alike — attached to their boto3 clients through botocore's call events.
+
+The window grows by one slot per window's worth of successful calls (additive increase) and halves on
+ThrottlingException or when a model's smoothed latency rises past BEDROCK_LATENCY_TOLERANCE x its best smoothed
+latency (multiplicative decrease), at most once per window. Latency baselines are per model, since an embedding
+call and a chat turn differ by orders of magnitude, and age slowly so a lasting shift becomes the new normal.
+
+Calls beyond the window queue for up to BEDROCK_QUEUE_TIMEOUT_SECONDS; decisions are shed up front with Overloaded
+(HTTP 429 + Retry-After) once BEDROCK_MAX_QUEUE calls are already waiting, instead of piling onto a throttled model
+and timing out.
+"""
+from __future__ import annotations
+import logging
+import math
+import threading
+import time
+from typing import Any
+from app.utils.config import settings
+from app.utils.metrics import BEDROCK_CALLS_WAITING, BEDROCK_CONCURRENCY_LIMIT, BEDROCK_LOAD_SHED
+
+logger = logging.getLogger(__name__)
+
+THROTTLE_CODES = ("ThrottlingException", "TooManyRequestsException", "ServiceUnavailableException")
+CONTEXT_KEY = "adaptive_limiter"
+BASELINE_AGING = 1.01  # per successful call: the best-latency baseline doubles in ~70 calls without a new best
+
+class Overloaded(Exception):
+    """Bedrock capacity is exhausted; retry after `retry_after` seconds."""
+
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+class AdaptiveLimiter:
+    def __init__(self, initial: int = 8, min_limit: int = 1, max_limit: int = 64, queue_timeout: float = 10.0,
+                 max_queue: int = 128, latency_tolerance: float = 2.0, backoff: float = 0.5):
+        self.limit = float(initial)
+        self.min_limit, self.max_limit, self.backoff = min_limit, max_limit, backoff
+        self.queue_timeout, self.max_queue, self.latency_tolerance = queue_timeout, max_queue, latency_tolerance
+        self.in_flight = self.waiting = 0
+        self.latency: dict[str, tuple[float, float]] = {}  # model path -> (smoothed latency, best smoothed latency)
+        self.avg_latency = 1.0
+        self.throttles = self.shed = 0
+        self._last_decrease = 0.0
+        self._cond = threading.Condition()
+        BEDROCK_CONCURRENCY_LIMIT.set(self.limit)
+
+    def acquire(self, timeout: float | None = None) -> float:
+        """Block for a slot; returns the start time to pass to release(). Raises Overloaded on timeout."""
+        deadline = time.monotonic() + (self.queue_timeout if timeout is None else timeout)
+        with self._cond:
+            self.waiting += 1
+            BEDROCK_CALLS_WAITING.inc()
+            try:
+                while self.in_flight >= int(self.limit):
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self.shed += 1
+                        BEDROCK_LOAD_SHED.labels("queue_timeout").inc()
+                        raise Overloaded(f"Bedrock concurrency limit {int(self.limit)} reached; queued "
+                                         f"{self.queue_timeout:.0f}s without a slot", self._retry_after())
+                    self._cond.wait(remaining)
+            finally:
+                self.waiting -= 1
+                BEDROCK_CALLS_WAITING.dec()
+            self.in_flight += 1
+        return time.monotonic()
+
+    def release(self, started: float, throttled: bool = False, failed: bool = False, key: str = "") -> None:
+        latency = time.monotonic() - started
+        with self._cond:
+            saturated = self.in_flight >= int(self.limit)
+            self.in_flight -= 1
+            if throttled:
+                self.throttles += 1
+                self._decrease(started, "throttled")
+            elif not failed:
+                self.avg_latency = 0.9 * self.avg_latency + 0.1 * latency
+                smoothed, best = self.latency.get(key, (latency, latency))
+                smoothed = 0.8 * smoothed + 0.2 * latency
+                best = min(best * BASELINE_AGING, smoothed)
+                self.latency[key] = (smoothed, best)
+                if self.latency_tolerance and smoothed > best * self.latency_tolerance:
+                    self._decrease(started, f"latency {smoothed * 1000:.0f}ms on {key or 'bedrock'}")
+                elif saturated:
+                    self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+                    BEDROCK_CONCURRENCY_LIMIT.set(self.limit)
+            self._cond.notify_all()
+
+    def _decrease(self, started: float, reason: str) -> None:
+        # Calls started before the last decrease saw the old window; one signal per window is enough.
+        if started < self._last_decrease:
+            return
+        previous, self.limit = self.limit, max(self.min_limit, self.limit * self.backoff)
+        self._last_decrease = time.monotonic()
+        BEDROCK_CONCURRENCY_LIMIT.set(self.limit)
+        logger.warning("Bedrock concurrency limit %.1f -> %.1f (%s)", previous, self.limit, reason)
+
+    def admit(self) -> None:
+        """Shed a new decision up front when the queue for Bedrock is already full."""
+        with self._cond:
+            if self.waiting >= self.max_queue:
+                self.shed += 1
+                BEDROCK_LOAD_SHED.labels("admission").inc()
+                raise Overloaded(f"Bedrock queue full ({self.waiting} calls waiting)", self._retry_after())
+
+    def _retry_after(self) -> int:
+        # Time for the current queue to drain through the window at the observed call latency.
+        return max(1, math.ceil(self.avg_latency * (self.waiting + 1) / max(1.0, self.limit)))
+
+    def stats(self) -> dict[str, Any]:
+        with self._cond:
+            return {"limit": round(self.limit, 2), "in_flight": self.in_flight, "waiting": self.waiting,
+                    "throttles": self.throttles, "shed": self.shed, "avg_latency_ms": round(self.avg_latency * 1000, 1)}
+
+    # ─── botocore hooks ─────────────────────────────────────────────────────────
+
+    def attach(self, client) -> None:
+        """Gate every call made through a boto3 bedrock-runtime client."""
+        events = client.meta.events
+        events.register_first("before-call.bedrock-runtime.*", self._before_call)
+        events.register("needs-retry.bedrock-runtime.*", self._needs_retry)
+        events.register("after-call.bedrock-runtime.*", self._after_call)
+        events.register("after-call-error.bedrock-runtime.*", self._after_call_error)
+
+    def _before_call(self, context: dict[str, Any], params: dict[str, Any] | None = None, **kwargs: Any) -> None:
+        context[CONTEXT_KEY] = {"started": self.acquire(), "throttled": False, "key": (params or {}).get("url_path", "")}
+
+    def _needs_retry(self, response=None, request_dict: dict[str, Any] | None = None, **kwargs: Any) -> None:
+        # A throttled attempt that botocore will retry: shrink the window now rather than after the last retry.
+        state = ((request_dict or {}).get("context") or {}).get(CONTEXT_KEY)
+        if state is not None and response is not None and _error_code(response[1]) in THROTTLE_CODES:
+            state["throttled"] = True
+            with self._cond:
+                self.throttles += 1
+                self._decrease(state["started"], "throttled, retrying")
+
+    def _after_call(self, context: dict[str, Any], parsed: dict[str, Any] | None = None, http_response=None,
+                    **kwargs: Any) -> None:
+        state = context.pop(CONTEXT_KEY, None)
+        if state is not None:
+            code = _error_code(parsed)
+            failed = http_response is not None and http_response.status_code >= 300
+            self.release(state["started"], throttled=code in THROTTLE_CODES and not state["throttled"],
+                         failed=failed or state["throttled"], key=state["key"])
+
+    def _after_call_error(self, context: dict[str, Any], **kwargs: Any) -> None:
+        state = context.pop(CONTEXT_KEY, None)
+        if state is not None:
+            self.release(state["started"], failed=True, key=state["key"])
+
+def _error_code(parsed: dict[str, Any] | None) -> str | None:
+    return ((parsed or {}).get("Error") or {}).get("Code")
+
+bedrock_limiter = AdaptiveLimiter(settings.bedrock_concurrency_initial, settings.bedrock_concurrency_min,
+                                  settings.bedrock_concurrency_max, settings.bedrock_queue_timeout_seconds,
+                                  settings.bedrock_max_queue, settings.bedrock_latency_tolerance)
+
+def limit_bedrock_client(client) -> None:
+    """Attach the shared limiter to a bedrock-runtime client when BEDROCK_LIMITER_ENABLED."""
+    if settings.bedrock_limiter_enabled and client is not None:
+        bedrock_limiter.attach(client)
@@ -1,21 +1,105 @@
 """FastAPI application entry point."""
+import asyncio
 import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import asynccontextmanager
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from app.api.routes import router
+from app.api.health import health_router
+from app.api.routes import get_agent, get_ingest_queue, get_ingestor, router
+from app.chains.bedrock_llm import BedrockHealthMonitor
+from app.rag.cache import load_caches, save_caches
+from app.utils.config import settings
+from app.utils.metrics import HTTP_REQUEST_SECONDS, HTTP_REQUESTS_IN_FLIGHT, render_metrics
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s | %(levelname)-8s | %(name)s | %(message)s")
+logger = logging.getLogger(__name__)
+
+def _warm(state) -> None:
+    for phase, build in (("ingestor", get_ingestor), ("agent", get_agent)):
+        t0 = time.perf_counter()
+        setattr(state, phase, build())
+        logger.info("Warm-up | %s built in %.0f ms", phase, (time.perf_counter() - t0) * 1000)
+    t0 = time.perf_counter()
+    state.agent.retriever.invoke("credit policy warm-up")
+    logger.info("Warm-up | index probe retrieval in %.0f ms", (time.perf_counter() - t0) * 1000)
+
+def warm_up(state) -> None:
+    """Build the ingestor and agent (retriever, LLM client, tools) and fault in the index before serving.
+
+    Failures are retried with exponential backoff. If every attempt fails the pod is marked degraded and stays
+    unready, and /health fails so the liveness probe restarts it. With WARMUP_DEGRADED_READY it goes ready instead and
+    get_agent()/get_ingestor() build the components on first request.
+    """
+    state.ready, state.degraded = False, False
+    started = time.perf_counter()
+    attempts = max(1, settings.warmup_attempts)
+    for attempt in range(1, attempts + 1):
+        try:
+            _warm(state)
+            break
+        except Exception as exc:
+            state.warmup_error = str(exc)
+            if attempt == attempts:
+                state.degraded = True
+                logger.exception("Warm-up failed after %d attempts; %s: %s", attempts,
+                                 "serving degraded, components will be built on first request"
+                                 if settings.warmup_degraded_ready else "staying unready", exc)
+                break
+            delay = settings.warmup_retry_backoff_seconds * 2 ** (attempt - 1)
+            logger.warning("Warm-up attempt %d/%d failed (%s); retrying in %.1fs", attempt, attempts, exc, delay)
+            time.sleep(delay)
+    if not state.degraded:
+        logger.info("Warm-up complete in %.0f ms", (time.perf_counter() - started) * 1000)
+    state.ready = not state.degraded or settings.warmup_degraded_ready
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    logging.getLogger(__name__).info("Starting Fintech Decisioning Agent...")
+    logger.info("Starting Fintech Decisioning Agent...")
+    # LangChain runs ChatBedrock's and BedrockEmbeddings' blocking boto3 calls in the loop's default executor, whose
+    # stock size (min(32, CPUs + 4)) would cap concurrent Bedrock calls well below the pooled connections.
+    asyncio.get_running_loop().set_default_executor(
+        ThreadPoolExecutor(settings.default_executor_threads, thread_name_prefix="blocking-io"))
+    app.state.ready = False
+    load_caches()
+    if settings.warmup_on_startup:
+        if settings.warmup_in_background:
+            app.state.warmup_task = asyncio.create_task(asyncio.to_thread(warm_up, app.state))
+        else:
+            await asyncio.to_thread(warm_up, app.state)
+    else:
+        app.state.ready = True
+    app.state.bedrock_monitor = BedrockHealthMonitor(settings.bedrock_health_interval_seconds)
+    app.state.bedrock_monitor.start()
+    app.state.ingest_queue = get_ingest_queue()
     yield
+    app.state.ingest_queue.stop()
+    await app.state.bedrock_monitor.stop()
+    save_caches()
 
 app = FastAPI(title="Fintech Decisioning Agent", version="1.0.0", lifespan=lifespan)
 app.add_middleware(CORSMiddleware, allow_origins=["*"], allow_methods=["*"], allow_headers=["*"])
 app.include_router(router, prefix="/api/v1")
+app.include_router(health_router, prefix="/health")
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    """Per-route latency histogram (to response headers, i.e. time to first byte for streams) and in-flight gauge."""
+    started, status = time.perf_counter(), 500
+    in_flight = HTTP_REQUESTS_IN_FLIGHT.labels(request.method)
+    in_flight.inc()
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        in_flight.dec()
+        matched = request.scope.get("route")
+        route = matched.path if matched is not None else "unmatched"
+        HTTP_REQUEST_SECONDS.labels(request.method, route, str(status)).observe(time.perf_counter() - started)
 
-@app.get("/health")
-async def health():
-    return {"status": "ok", "service": "fintech-decisioning-agent"}
+@app.get("/metrics", include_in_schema=False)
+async def metrics() -> Response:
+    body, content_type = render_metrics()
+    return Response(body, media_type=content_type)
@@ -1,4 +1,5 @@
 from __future__ import annotations
+from datetime import datetime
 from enum import Enum
 from typing import Any
 from pydantic import BaseModel, Field
@@ -9,6 +10,10 @@ class DecisionType(str, Enum):
     KYC = "kyc"
     LOAN = "loan"
 
+class DecisionPath(str, Enum):
+    RULES = "rules"
+    AGENT = "agent"
+
 class ApplicantData(BaseModel):
     applicant_id: str
     credit_score: int | None = Field(None, ge=300, le=850)
@@ -24,6 +29,7 @@ class DecisionRequest(BaseModel):
     decision_type: DecisionType = DecisionType.CREDIT
     applicant: ApplicantData
     query: str
+    trace: bool = False  # return the decision's span tree in DecisionResponse.trace
 
 class DecisionResponse(BaseModel):
     session_id: str
@@ -33,6 +39,19 @@ class DecisionResponse(BaseModel):
     risk_factors: list[str] = Field(default_factory=list)
     retrieved_policies: list[str] = Field(default_factory=list)
     raw_agent_output: str | None = None
+    decision_path: DecisionPath = DecisionPath.AGENT
+    cache_hit: bool = False
+    trace: dict[str, Any] | None = None
+
+class BatchDecisionRequest(BaseModel):
+    requests: list[DecisionRequest] = Field(..., min_length=1)
+    concurrency: int | None = Field(None, ge=1, le=64)
+
+class BatchDecisionItem(BaseModel):
+    index: int
+    session_id: str
+    result: DecisionResponse | None = None
+    error: str | None = None
 
 class DocumentInput(BaseModel):
     doc_id: str
@@ -46,3 +65,34 @@ class IngestRequest(BaseModel):
 class IngestResponse(BaseModel):
     message: str
     document_count: int
+    job_id: str | None = None
+
+class StressTestRequest(BaseModel):
+    path: str = Field(..., description="CSV or Parquet portfolio, relative to the configured portfolio directory")
+    scenarios: dict[str, float] | None = Field(None, description="Scenario name -> relative DTI shock, e.g. 0.10")
+    workers: int | None = Field(None, ge=1, le=64)
+
+class StressScenarioResult(BaseModel):
+    dti_shock: float
+    distribution: list[int]
+    migration: list[list[int]]
+    downgraded: int
+
+class StressTestResponse(BaseModel):
+    rows: int
+    tiers: list[str]
+    base_distribution: list[int]
+    scenarios: dict[str, StressScenarioResult]
+    duration_seconds: float
+
+class IngestJobStatus(BaseModel):
+    job_id: str
+    status: str
+    document_count: int
+    chunks_total: int = 0
+    chunks_done: int = 0
+    created_at: datetime
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
+    duration_seconds: float | None = None
+    error: str | None = None
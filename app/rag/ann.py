@@ -0,0 +1,80 @@
+"""Approximate-nearest-neighbour indexes (IVF-Flat, HNSW, IVF-PQ) over a memory-mapped base generation.
+
+The ANN index is built at compaction time next to the base files as `base-<gen>.ann.faiss`, labelled by row
+position. It only proposes candidates: they are re-ranked with exact L2 distances read from the mapped vectors,
+so scores stay comparable with the exact search over the in-memory delta.
+"""
+from __future__ import annotations
+import logging
+import math
+import time
+from pathlib import Path
+import numpy as np
+from app.utils.config import settings
+
+logger = logging.getLogger(__name__)
+
+INDEX_TYPES = ("flat", "ivf_flat", "hnsw", "ivf_pq")
+
+def factory_string(index_type: str, count: int, dim: int) -> str:
+    nlist = settings.faiss_nlist or max(1, min(int(4 * math.sqrt(count)), count // 39))
+    if index_type == "ivf_flat":
+        return f"IVF{nlist},Flat"
+    if index_type == "ivf_pq":
+        m = settings.faiss_pq_m
+        if dim % m:
+            raise ValueError(f"faiss_pq_m={m} must divide the embedding dimension {dim}")
+        return f"IVF{nlist},PQ{m}x{settings.faiss_pq_nbits}"
+    if index_type == "hnsw":
+        return f"HNSW{settings.faiss_hnsw_m},Flat"
+    raise ValueError(f"Unknown faiss_index_type {index_type!r}; expected one of {INDEX_TYPES}")
+
+def configure(index, nprobe: int | None = None, ef_search: int | None = None) -> None:
+    """Apply query-time knobs: nprobe for IVF indexes, efSearch for HNSW."""
+    import faiss
+    index = faiss.downcast_index(index)
+    if hasattr(index, "hnsw"):
+        index.hnsw.efSearch = ef_search or settings.faiss_hnsw_ef_search
+    else:
+        faiss.extract_index_ivf(index).nprobe = nprobe or settings.faiss_nprobe
+
+def search_params(index, selector=None):
+    """Per-query parameters restricting the search to `selector`, keeping the index's nprobe/efSearch."""
+    import faiss
+    if selector is None:
+        return None
+    index = faiss.downcast_index(index)
+    if hasattr(index, "hnsw"):
+        return faiss.SearchParametersHNSW(sel=selector, efSearch=index.hnsw.efSearch)
+    return faiss.SearchParametersIVF(sel=selector, nprobe=faiss.extract_index_ivf(index).nprobe)
+
+def build(prefix: Path, vectors: np.ndarray, index_type: str | None = None) -> bool:
+    """Train and fill an ANN index for a base generation; returns False when the exact path should be used."""
+    import faiss
+    index_type = index_type or settings.faiss_index_type
+    count, dim = vectors.shape
+    if index_type == "flat" or count < settings.faiss_ann_min_vectors:
+        return False
+    started = time.perf_counter()
+    index = faiss.index_factory(dim, factory_string(index_type, count, dim))
+    if not index.is_trained:
+        sample = np.sort(np.random.default_rng(0).choice(count, min(count, settings.faiss_train_sample), replace=False))
+        index.train(np.ascontiguousarray(vectors[sample]))
+    if hasattr(faiss.downcast_index(index), "hnsw"):
+        faiss.downcast_index(index).hnsw.efConstruction = settings.faiss_hnsw_ef_construction
+    for start in range(0, count, 65_536):
+        index.add(np.ascontiguousarray(vectors[start:start + 65_536]))
+    tmp = f"{prefix}.ann.faiss.tmp"
+    faiss.write_index(index, tmp)
+    Path(tmp).replace(f"{prefix}.ann.faiss")
+    logger.info("Built %s index over %d vectors in %.1fs", index_type, count, time.perf_counter() - started)
+    return True
+
+def load(prefix: Path):
+    import faiss
+    path = Path(f"{prefix}.ann.faiss")
+    if not path.exists():
+        return None
+    index = faiss.read_index(str(path), faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY)
+    configure(index)
+    return index
@@ -0,0 +1,144 @@
+"""LRU+TTL caches for query embeddings and top-k retrieval results, with optional on-disk persistence."""
+from __future__ import annotations
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Hashable
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from app.utils.config import settings
+
+logger = logging.getLogger(__name__)
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries also expire after `ttl_seconds` (wall clock, so dumps survive restarts)."""
+
+    def __init__(self, name: str, maxsize: int, ttl_seconds: float):
+        self.name, self.maxsize, self.ttl_seconds = name, maxsize, ttl_seconds
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = 0
+
+    def get(self, key: Hashable) -> Any | None:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[0] < time.time():
+                if entry is not None:
+                    del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._data[key] = (time.time() + self.ttl_seconds, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {"size": len(self._data), "maxsize": self.maxsize, "hits": self.hits, "misses": self.misses,
+                    "hit_rate": self.hits / total if total else 0.0}
+
+    def dump(self, path: Path) -> None:
+        with self._lock:
+            now = time.time()
+            entries = [[list(k), exp, v] for k, (exp, v) in self._data.items() if exp >= now]
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(entries))
+        tmp.replace(path)
+
+    def load(self, path: Path) -> int:
+        if not path.exists():
+            return 0
+        now = time.time()
+        entries = [(tuple(k), exp, v) for k, exp, v in json.loads(path.read_text()) if exp >= now]
+        with self._lock:
+            for key, exp, value in entries[-self.maxsize:]:
+                self._data[key] = (exp, value)
+        return len(entries)
+
+def normalize_query(query: str) -> str:
+    return " ".join(query.lower().split())
+
+embedding_cache = TTLCache("embeddings", settings.embedding_cache_size, settings.embedding_cache_ttl_seconds)
+result_cache = TTLCache("results", settings.retrieval_cache_size, settings.retrieval_cache_ttl_seconds)
+
+class CachedEmbeddings(Embeddings):
+    """Embeddings wrapper that memoizes query embeddings; document embeddings pass straight through."""
+
+    def __init__(self, inner: Embeddings, cache: TTLCache = embedding_cache, model_id: str = ""):
+        self.inner, self.cache, self.model_id = inner, cache, model_id
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        return self.inner.embed_documents(texts)
+
+    def embed_query(self, text: str) -> list[float]:
+        key = (self.model_id, normalize_query(text))
+        vector = self.cache.get(key)
+        if vector is None:
+            vector = self.inner.embed_query(text)
+            self.cache.set(key, list(vector))
+        return vector
+
+class CachingRetriever:
+    """Retriever wrapper that memoizes top-k results per normalized query and index version.
+
+    Other attributes delegate to the inner retriever.
+    """
+
+    def __init__(self, retriever, cache: TTLCache = result_cache, metadata_filters: bool = True):
+        self.retriever, self.cache, self.metadata_filters = retriever, cache, metadata_filters
+
+    def invoke(self, query: str, **kwargs) -> list[Document]:
+        """`filter=` (metadata pre-filter) is merged into the search kwargs when the backing store supports it."""
+        filter = kwargs.pop("filter", None)
+        filter = filter if self.metadata_filters else None
+        retriever = self.retriever
+        if filter:
+            retriever = retriever.model_copy(update={"search_kwargs": {**retriever.search_kwargs, "filter": filter}})
+        store = getattr(retriever, "vectorstore", None)
+        version = store.current_version() if hasattr(store, "current_version") else None
+        key = (normalize_query(query), retriever.search_kwargs.get("k", 4), version,
+               json.dumps(filter, sort_keys=True, default=str), retriever.search_kwargs.get("mode", settings.retrieval_mode))
+        cached = self.cache.get(key)
+        if cached is not None:
+            return [Document(page_content=c, metadata=m) for c, m in cached]
+        docs = retriever.invoke(query, **kwargs)
+        self.cache.set(key, [(d.page_content, d.metadata) for d in docs])
+        return docs
+
+    def __getattr__(self, name: str):
+        return getattr(self.retriever, name)
+
+def invalidate_results() -> None:
+    """Drop cached retrieval results; call whenever the index contents change."""
+    result_cache.clear()
+    logger.info("Retrieval result cache invalidated")
+
+def cache_stats() -> dict[str, dict[str, Any]]:
+    return {"embeddings": embedding_cache.stats(), "results": result_cache.stats()}
+
+def load_caches() -> None:
+    if settings.retrieval_cache_dir:
+        base = Path(settings.retrieval_cache_dir)
+        counts = [c.load(base / f"{c.name}.json") for c in (embedding_cache, result_cache)]
+        logger.info("Loaded %d embeddings and %d retrieval results from %s", *counts, base)
+
+def save_caches() -> None:
+    if settings.retrieval_cache_dir:
+        base = Path(settings.retrieval_cache_dir)
+        for c in (embedding_cache, result_cache):
+            c.dump(base / f"{c.name}.json")
@@ -1,39 +1,115 @@
-"""RAG Ingestion Service: chunks documents and upserts into vector store."""
+"""RAG Ingestion Service: chunks documents, embeds them in parallel batches and appends them to the shared policy store."""
 from __future__ import annotations
 import logging
-from pathlib import Path
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+import numpy as np
 from langchain.text_splitter import RecursiveCharacterTextSplitter
+from langchain_core.embeddings import Embeddings
+from app.chains.limiter import Overloaded
 from app.models.schemas import DocumentInput
+from app.rag.cache import invalidate_results
+from app.rag.store import PolicyStore, content_hash, get_policy_store
 from app.utils.config import settings
+from app.utils.metrics import INGEST_CHUNKS, INGEST_SECONDS
 
 logger = logging.getLogger(__name__)
-FAISS_INDEX_PATH = Path("data/faiss_index")
+THROTTLE_MARKERS = ("Throttling", "TooManyRequests", "ServiceUnavailable", "Rate exceeded")
+
+def is_throttle_error(exc: Exception) -> bool:
+    """True for Bedrock throttling, whether raised as a botocore ClientError or wrapped by langchain_aws, and for
+    calls shed by the adaptive limiter (retried with the same backoff)."""
+    if isinstance(exc, Overloaded):
+        return True
+    response = getattr(exc, "response", None)
+    code = response.get("Error", {}).get("Code", "") if isinstance(response, dict) else ""
+    return any(m in code or m in str(exc) for m in THROTTLE_MARKERS)
+
+class EmbeddingPipeline:
+    """Embed chunks in fixed-size batches across a bounded thread pool, retrying throttled batches with backoff."""
+
+    def __init__(self, embeddings: Embeddings, batch_size: int | None = None, max_workers: int | None = None,
+                 max_retries: int | None = None, backoff_seconds: float | None = None):
+        self.embeddings = embeddings
+        self.batch_size = batch_size or settings.embedding_batch_size
+        self.max_workers = max_workers or settings.embedding_max_workers
+        self.max_retries = settings.embedding_max_retries if max_retries is None else max_retries
+        self.backoff_seconds = settings.embedding_backoff_seconds if backoff_seconds is None else backoff_seconds
+        self.last_throughput = 0.0
+
+    def embed(self, texts: list[str], progress: Callable[[int], None] | None = None,
+              max_workers: int | None = None) -> np.ndarray:
+        """Embed `texts` in order; `progress` receives the running count of embedded chunks after each batch.
+        `max_workers` lowers the pool size for this call (background jobs)."""
+        started = time.perf_counter()
+        batches = [texts[i:i + self.batch_size] for i in range(0, len(texts), self.batch_size)]
+        results, done = [], 0
+        with ThreadPoolExecutor(max_workers=min(max_workers or self.max_workers, self.max_workers, len(batches)) or 1,
+                                thread_name_prefix="embed") as pool:
+            for batch_vectors in pool.map(self._embed_batch, batches):
+                results.append(np.asarray(batch_vectors, dtype=np.float32))
+                done += len(batch_vectors)
+                if progress is not None:
+                    progress(done)
+        vectors = np.vstack(results)
+        elapsed = time.perf_counter() - started
+        self.last_throughput = len(texts) / elapsed if elapsed > 0 else float("inf")
+        logger.info("Embedded %d chunks in %d batch(es) in %.2fs (%.1f chunks/sec)",
+                    len(texts), len(batches), elapsed, self.last_throughput)
+        return vectors
+
+    def _embed_batch(self, batch: list[str]) -> list[list[float]]:
+        attempt = 0
+        while True:
+            try:
+                return self.embeddings.embed_documents(batch)
+            except Exception as exc:
+                if attempt >= self.max_retries or not is_throttle_error(exc):
+                    raise
+                delay = self.backoff_seconds * 2 ** attempt * (1 + random.random())
+                attempt += 1
+                logger.warning("Embedding batch throttled (attempt %d/%d), retrying in %.2fs",
+                               attempt, self.max_retries, delay)
+                time.sleep(delay)
 
 class RagIngestionService:
-    def __init__(self):
-        try:
-            from langchain_aws import BedrockEmbeddings
-            self.embeddings = BedrockEmbeddings(model_id=settings.bedrock_embedding_model_id, region_name=settings.aws_region)
-        except Exception:
-            from langchain_community.embeddings import FakeEmbeddings
-            self.embeddings = FakeEmbeddings(size=1536)
+    def __init__(self, store: PolicyStore | None = None):
+        self.store = store if store is not None else get_policy_store()
+        self.embeddings = self.store.embeddings
+        self.pipeline = EmbeddingPipeline(self.embeddings)
         self.splitter = RecursiveCharacterTextSplitter(chunk_size=800, chunk_overlap=100)
 
-    def ingest(self, documents: list[DocumentInput]) -> int:
-        texts, metadatas = [], []
+    def ingest(self, documents: list[DocumentInput], progress: Callable[[int, int], None] | None = None,
+               max_workers: int | None = None) -> int:
+        """Upsert documents by doc_id: only chunks whose content hash is not already stored get embedded.
+
+        `progress(done, total)` is called as chunks are resolved, for job status reporting; `max_workers` caps
+        embedding concurrency (queued jobs use INGEST_JOB_EMBEDDING_WORKERS so they leave Bedrock capacity to /decide).
+        """
+        started, batch, to_embed = time.perf_counter(), [], {}
         for doc in documents:
-            for chunk in self.splitter.split_text(doc.content):
-                texts.append(chunk)
-                metadatas.append({"doc_id": doc.doc_id, "title": doc.title, **doc.metadata})
-        if not texts:
-            return 0
-        from langchain_community.vectorstores import FAISS
-        if FAISS_INDEX_PATH.exists():
-            store = FAISS.load_local(str(FAISS_INDEX_PATH), self.embeddings, allow_dangerous_deserialization=True)
-            store.add_texts(texts, metadatas=metadatas)
-        else:
-            store = FAISS.from_texts(texts, self.embeddings, metadatas=metadatas)
-        FAISS_INDEX_PATH.mkdir(parents=True, exist_ok=True)
-        store.save_local(str(FAISS_INDEX_PATH))
-        logger.info("Ingested %d chunks from %d documents", len(texts), len(documents))
-        return len(texts)
+            chunks = {content_hash(c): c for c in self.splitter.split_text(doc.content)}
+            metadatas = [{"doc_id": doc.doc_id, "title": doc.title, **doc.metadata, "content_hash": h} for h in chunks]
+            batch.append((doc.doc_id, list(chunks.values()), metadatas))
+            to_embed.update(chunks)
+        unembedded = self.store.missing_hashes(to_embed)
+        missing = [h for h in to_embed if h in unembedded]
+        total = sum(len(texts) for _, texts, _ in batch)
+        report = (lambda embedded: progress(total - len(missing) + embedded, total)) if progress else None
+        if report:
+            report(0)
+        vectors = dict(zip(missing, self.pipeline.embed([to_embed[h] for h in missing], report, max_workers))) if missing else {}
+        stats = self.store.sync_documents(batch, vectors)
+        if settings.retrieval_mode != "vector":
+            self.store.lexical_index()  # built here so the first keyword query doesn't pay for it
+        if stats["added"] or stats["deleted"]:
+            invalidate_results()
+        INGEST_SECONDS.observe(time.perf_counter() - started)
+        INGEST_CHUNKS.labels("embedded").inc(len(missing))
+        for outcome in ("added", "kept", "deleted"):
+            INGEST_CHUNKS.labels(outcome).inc(stats[outcome])
+        logger.info("Ingested %d chunks from %d documents | embedded=%d added=%d kept=%d deleted=%d",
+                    total, len(documents), len(missing), stats["added"], stats["kept"], stats["deleted"])
+        return total
@@ -0,0 +1,156 @@
+"""Persistent SQLite-backed ingestion job queue with a dedicated worker pool.
+
+Several processes (uvicorn workers, restarts) may share one queue database. A running job carries its owner and a
+heartbeat that the owning process renews every lease/3 seconds; only jobs whose lease has expired (the owner died)
+are reclaimed, and a worker's updates are fenced on ownership so a reclaimed job cannot be overwritten by its
+previous owner. Finished jobs drop their document payload.
+"""
+from __future__ import annotations
+import json
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import closing
+from pathlib import Path
+from typing import Any, Callable
+from app.models.schemas import DocumentInput
+
+logger = logging.getLogger(__name__)
+
+ProgressFn = Callable[[int, int], None]
+IngestFn = Callable[[list[DocumentInput], ProgressFn], int]
+
+SCHEMA = """CREATE TABLE IF NOT EXISTS ingest_jobs (
+    id TEXT PRIMARY KEY, status TEXT NOT NULL, payload TEXT NOT NULL, document_count INTEGER NOT NULL,
+    chunks_total INTEGER NOT NULL DEFAULT 0, chunks_done INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL, started_at REAL, finished_at REAL, error TEXT, owner TEXT, heartbeat_at REAL)"""
+MIGRATIONS = {"owner": "ALTER TABLE ingest_jobs ADD COLUMN owner TEXT",
+              "heartbeat_at": "ALTER TABLE ingest_jobs ADD COLUMN heartbeat_at REAL"}
+
+class QueueFullError(Exception):
+    """Raised when the number of pending jobs has reached the configured limit."""
+
+class IngestJobQueue:
+    def __init__(self, db_path: str | Path, ingest: IngestFn, workers: int = 1, max_pending: int = 32,
+                 poll_seconds: float = 1.0, lease_seconds: float = 60.0):
+        self.db_path = Path(db_path)
+        self.ingest, self.workers, self.max_pending, self.poll_seconds = ingest, workers, max_pending, poll_seconds
+        self.lease_seconds = lease_seconds
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._threads: list[threading.Thread] = []
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        with closing(self._connect()) as db:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute(SCHEMA)
+            columns = {row["name"] for row in db.execute("PRAGMA table_info(ingest_jobs)")}
+            for column, ddl in MIGRATIONS.items():
+                if column not in columns:
+                    db.execute(ddl)
+
+    def _connect(self) -> sqlite3.Connection:
+        db = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        db.row_factory = sqlite3.Row
+        return db
+
+    def submit(self, documents: list[DocumentInput]) -> str:
+        job_id = uuid.uuid4().hex
+        payload = json.dumps([d.model_dump() for d in documents])
+        with closing(self._connect()) as db:
+            db.execute("BEGIN IMMEDIATE")
+            pending = db.execute("SELECT COUNT(*) FROM ingest_jobs WHERE status IN ('queued', 'running')").fetchone()[0]
+            if pending >= self.max_pending:
+                db.execute("ROLLBACK")
+                raise QueueFullError(f"{pending} ingestion jobs pending (limit {self.max_pending})")
+            db.execute("INSERT INTO ingest_jobs (id, status, payload, document_count, created_at) VALUES (?, 'queued', ?, ?, ?)",
+                       (job_id, payload, len(documents), time.time()))
+            db.execute("COMMIT")
+        self._wake.set()
+        return job_id
+
+    def get(self, job_id: str) -> dict[str, Any] | None:
+        with closing(self._connect()) as db:
+            row = db.execute("SELECT * FROM ingest_jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = {k: row[k] for k in row.keys() if k not in ("payload", "owner", "heartbeat_at")}
+        if job["started_at"]:
+            job["duration_seconds"] = (job["finished_at"] or time.time()) - job["started_at"]
+        return job
+
+    def start(self) -> None:
+        """Start the worker threads and the lease heartbeat. Jobs left running by a dead owner are reclaimed by
+        _claim once their lease expires."""
+        self._stop.clear()
+        if not self._threads:
+            t = threading.Thread(target=self._heartbeat, name="ingest-heartbeat", daemon=True)
+            t.start()
+            self._threads.append(t)
+        for n in range(self.workers + 1 - len(self._threads)):
+            t = threading.Thread(target=self._work, name=f"ingest-worker-{n}", daemon=True)
+            t.start()
+            self._threads.append(t)
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        self._wake.set()
+        for t in self._threads:
+            t.join(timeout)
+        self._threads.clear()
+
+    def _claim(self) -> tuple[str, list[DocumentInput]] | None:
+        now = time.time()
+        with closing(self._connect()) as db:
+            db.execute("BEGIN IMMEDIATE")
+            row = db.execute("SELECT id, payload, status, owner FROM ingest_jobs WHERE status = 'queued' OR "
+                             "(status = 'running' AND (heartbeat_at IS NULL OR heartbeat_at < ?)) ORDER BY created_at LIMIT 1",
+                             (now - self.lease_seconds,)).fetchone()
+            if row is None:
+                db.execute("ROLLBACK")
+                return None
+            db.execute("UPDATE ingest_jobs SET status = 'running', started_at = ?, owner = ?, heartbeat_at = ? WHERE id = ?",
+                       (now, self.owner, now, row["id"]))
+            db.execute("COMMIT")
+        if row["status"] == "running":
+            logger.warning("Reclaimed ingestion job %s from %s after its lease expired", row["id"], row["owner"])
+        return row["id"], [DocumentInput(**d) for d in json.loads(row["payload"])]
+
+    def _update(self, job_id: str, **fields: Any) -> bool:
+        """Update a job this process still owns; False if it was reclaimed by another owner."""
+        with closing(self._connect()) as db:
+            return db.execute(f"UPDATE ingest_jobs SET {', '.join(f'{k} = ?' for k in fields)} WHERE id = ? AND owner = ?",
+                              (*fields.values(), job_id, self.owner)).rowcount > 0
+
+    def _heartbeat(self) -> None:
+        while not self._stop.wait(self.lease_seconds / 3):
+            try:
+                with closing(self._connect()) as db:
+                    db.execute("UPDATE ingest_jobs SET heartbeat_at = ? WHERE status = 'running' AND owner = ?",
+                               (time.time(), self.owner))
+            except sqlite3.Error as exc:
+                logger.warning("Ingestion job heartbeat failed: %s", exc)
+
+    def _work(self) -> None:
+        while not self._stop.is_set():
+            claimed = self._claim()
+            if claimed is None:
+                self._wake.wait(self.poll_seconds)
+                self._wake.clear()
+                continue
+            job_id, documents = claimed
+            try:
+                chunks = self.ingest(documents, lambda done, total: self._update(job_id, chunks_done=done, chunks_total=total))
+                finished = self._update(job_id, status="succeeded", chunks_done=chunks, chunks_total=chunks,
+                                        finished_at=time.time(), payload="[]")
+                if finished:
+                    logger.info("Ingestion job %s succeeded: %d chunks", job_id, chunks)
+            except Exception as exc:
+                logger.exception("Ingestion job %s failed: %s", job_id, exc)
+                finished = self._update(job_id, status="failed", error=str(exc), finished_at=time.time(), payload="[]")
+            if not finished:
+                logger.warning("Ingestion job %s was reclaimed by another worker; dropping this run's result", job_id)
@@ -0,0 +1,69 @@
+"""In-process BM25 inverted index over policy chunks, used for lexical and hybrid retrieval.
+
+Tokens keep the exact forms policy text relies on (FICO, DTI, OFAC, "5×" == "5x", "720+", "$10,000"), so keyword
+queries match without an embedding round trip.
+"""
+from __future__ import annotations
+import heapq
+import math
+import re
+from collections import Counter
+from typing import Iterable
+
+TOKEN_RE = re.compile(r"[\w$]+(?:[.,/-]\w+)*[×%+]?")
+STOPWORDS = frozenset("a an and are as at be by for from in is it of on or that the to with what which".split())
+
+def tokenize(text: str) -> list[str]:
+    return [t.replace("×", "x") for t in TOKEN_RE.findall(text.lower()) if t not in STOPWORDS]
+
+class BM25Index:
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1, self.b = k1, b
+        self.postings: dict[str, dict[int, int]] = {}  # term -> chunk id -> term frequency
+        self.lengths: dict[int, int] = {}
+        self.total_length = 0
+
+    def __len__(self) -> int:
+        return len(self.lengths)
+
+    def add(self, chunk_id: int, text: str) -> None:
+        terms = Counter(tokenize(text))
+        for term, tf in terms.items():
+            self.postings.setdefault(term, {})[chunk_id] = tf
+        self.lengths[chunk_id] = sum(terms.values())
+        self.total_length += self.lengths[chunk_id]
+
+    def remove(self, chunk_id: int, text: str) -> None:
+        if chunk_id not in self.lengths:
+            return
+        self.total_length -= self.lengths.pop(chunk_id)
+        for term in set(tokenize(text)):
+            posting = self.postings.get(term, {})
+            posting.pop(chunk_id, None)
+            if not posting:
+                self.postings.pop(term, None)
+
+    def search(self, query: str, k: int, allowed: set[int] | None = None) -> list[tuple[int, float]]:
+        """Top-k (chunk id, BM25 score), optionally restricted to `allowed` ids."""
+        if not self.lengths:
+            return []
+        n, avg = len(self.lengths), self.total_length / len(self.lengths) or 1.0
+        scores: dict[int, float] = {}
+        for term in set(tokenize(query)):
+            posting = self.postings.get(term)
+            if not posting:
+                continue
+            idf = math.log(1 + (n - len(posting) + 0.5) / (len(posting) + 0.5))
+            for chunk_id, tf in posting.items():
+                if allowed is not None and chunk_id not in allowed:
+                    continue
+                norm = tf + self.k1 * (1 - self.b + self.b * self.lengths[chunk_id] / avg)
+                scores[chunk_id] = scores.get(chunk_id, 0.0) + idf * tf * (self.k1 + 1) / norm
+        return heapq.nlargest(k, scores.items(), key=lambda hit: hit[1])
+
+    @classmethod
+    def build(cls, chunks: Iterable[tuple[int, str]]) -> BM25Index:
+        index = cls()
+        for chunk_id, text in chunks:
+            index.add(chunk_id, text)
+        return index
@@ -0,0 +1,81 @@
+"""Inverted metadata index used to restrict policy search to matching chunks before any vector is scored.
+
+Filters are exact, case-insensitive matches on chunk metadata (decision_type, product, jurisdiction, or any other
+key) plus an `as_of` date checked against `effective_date`/`expiry_date`. A chunk that lacks a filtered key is a
+global policy and matches every value; list-valued metadata matches any of its items.
+"""
+from __future__ import annotations
+from typing import Any, Iterable
+
+FILTER_KEYS = ("decision_type", "product", "jurisdiction")
+DATE_KEYS = ("effective_date", "expiry_date")
+
+def _values(value: Any) -> list[str]:
+    items = value if isinstance(value, (list, tuple, set)) else [value]
+    return [str(v).strip().lower() for v in items if v is not None]
+
+def _date(value: Any) -> str | None:
+    return str(value)[:10] if value else None
+
+class MetadataIndex:
+    def __init__(self, keys: Iterable[str] = FILTER_KEYS):
+        self.keys = tuple(keys)
+        self.ids: set[int] = set()
+        self.postings: dict[str, dict[str, set[int]]] = {k: {} for k in self.keys}
+        self.keyed: dict[str, set[int]] = {k: set() for k in self.keys}
+        self.dates: dict[int, tuple[str | None, str | None]] = {}  # only chunks carrying a date
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def add(self, chunk_id: int, metadata: dict[str, Any]) -> None:
+        self.ids.add(chunk_id)
+        for key in self.keys:
+            values = _values(metadata.get(key))
+            if values:
+                self.keyed[key].add(chunk_id)
+                for value in values:
+                    self.postings[key].setdefault(value, set()).add(chunk_id)
+        effective, expiry = (_date(metadata.get(k)) for k in DATE_KEYS)
+        if effective or expiry:
+            self.dates[chunk_id] = (effective, expiry)
+
+    def remove(self, chunk_id: int, metadata: dict[str, Any]) -> None:
+        self.ids.discard(chunk_id)
+        for key in self.keys:
+            self.keyed[key].discard(chunk_id)
+            for value in _values(metadata.get(key)):
+                self.postings[key].get(value, set()).discard(chunk_id)
+        self.dates.pop(chunk_id, None)
+
+    def candidates(self, filter: dict[str, Any]) -> set[int]:
+        """Chunk ids matching every populated filter field; unknown keys are ignored."""
+        result: set[int] | None = None
+        for key, wanted in filter.items():
+            if wanted is None or key not in self.keys:
+                continue
+            matched = self.ids - self.keyed[key]
+            for value in _values(wanted):
+                matched |= self.postings[key].get(value, set())
+            result = matched if result is None else result & matched
+        result = set(self.ids) if result is None else result
+        as_of = _date(filter.get("as_of"))
+        if as_of:
+            result -= {i for i, (effective, expiry) in self.dates.items()
+                       if (effective and effective > as_of) or (expiry and expiry <= as_of)}
+        return result
+
+    def to_dict(self) -> dict[str, Any]:
+        return {"keys": list(self.keys),
+                "postings": {k: {v: sorted(ids) for v, ids in p.items() if ids} for k, p in self.postings.items()},
+                "keyed": {k: sorted(ids) for k, ids in self.keyed.items()},
+                "dates": [[i, e, x] for i, (e, x) in self.dates.items()]}
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any], ids: Iterable[int]) -> MetadataIndex:
+        index = cls(data["keys"])
+        index.ids = set(ids)
+        index.postings = {k: {v: set(i) for v, i in p.items()} for k, p in data["postings"].items()}
+        index.keyed = {k: set(i) for k, i in data["keyed"].items()}
+        index.dates = {i: (e, x) for i, e, x in data["dates"]}
+        return index
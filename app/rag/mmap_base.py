@@ -0,0 +1,199 @@
+"""Read-only, memory-mapped base snapshot of the policy index.
+
+A base generation is four files sharing a `base-<gen>` prefix:
+    .vectors.npy   float32 (n, d) embeddings, row-aligned with .ids.npy
+    .ids.npy       int64 (n,) chunk ids in ascending order
+    .docs.bin      concatenated UTF-8 JSON records {"text", "metadata"}
+    .docs.idx.npy  uint64 (n + 1,) byte offsets of each record in .docs.bin
+plus an optional .ann.faiss approximate index over the same rows (see app.rag.ann).
+
+Everything is opened with mmap, so every process reading the same generation shares the OS page cache,
+opening a generation costs O(1) regardless of corpus size, and nothing is unpickled.
+"""
+from __future__ import annotations
+import json
+import mmap
+import os
+from collections.abc import MutableMapping
+from pathlib import Path
+from typing import Iterable, Iterator
+import numpy as np
+from langchain_core.documents import Document
+from app.rag import ann
+from app.utils.config import settings
+
+SUFFIXES = (".vectors.npy", ".ids.npy", ".docs.bin", ".docs.idx.npy")
+SCAN_BLOCK_ROWS = 32_768  # rows scored per BLAS call in a filtered scan; bounds its scratch memory
+
+def _load(path: str) -> np.ndarray:
+    try:
+        return np.load(path, mmap_mode="r")
+    except ValueError:  # zero-length arrays cannot be mapped
+        return np.load(path)
+
+class MmapBase:
+    def __init__(self, prefix: Path):
+        self.prefix = prefix
+        self.vectors = _load(f"{prefix}.vectors.npy")
+        self.ids = _load(f"{prefix}.ids.npy")
+        self.offsets = _load(f"{prefix}.docs.idx.npy")
+        with open(f"{prefix}.docs.bin", "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            self._docs = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+        self.ann = ann.load(prefix)
+        self._norms: np.ndarray | None = None
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def dim(self) -> int:
+        return self.vectors.shape[1]
+
+    def position(self, chunk_id: int) -> int | None:
+        pos = int(np.searchsorted(self.ids, chunk_id))
+        return pos if pos < len(self.ids) and self.ids[pos] == chunk_id else None
+
+    def document(self, chunk_id: int) -> Document | None:
+        pos = self.position(chunk_id)
+        if pos is None:
+            return None
+        rec = json.loads(self._docs[int(self.offsets[pos]):int(self.offsets[pos + 1])])
+        return Document(id=str(chunk_id), page_content=rec["text"], metadata=rec["metadata"])
+
+    def vector(self, chunk_id: int) -> np.ndarray:
+        return np.array(self.vectors[self.position(chunk_id)])
+
+    def positions(self, chunk_ids: set[int]) -> np.ndarray:
+        """Sorted row positions of the given ids that exist in this base."""
+        ids = np.fromiter(chunk_ids, dtype=np.int64, count=len(chunk_ids))
+        pos = np.searchsorted(self.ids, ids)
+        found = pos < len(self.ids)
+        found[found] &= self.ids[pos[found]] == ids[found]
+        return np.sort(pos[found])
+
+    def search(self, query: np.ndarray, k: int, exclude: set[int], allowed: set[int] | None = None) -> list[tuple[int, float]]:
+        """L2 search over the mapped vectors, optionally restricted to the `allowed` ids.
+
+        Allowed sets up to FAISS_PREFILTER_EXACT_MAX are scored exactly row by row. Larger ones use ANN candidates
+        re-ranked exactly when an ANN index exists, else a masked scan of the whole base. Unfiltered searches use
+        ANN or faiss.knn.
+        """
+        import faiss
+        positions = None if allowed is None else self.positions(allowed)
+        k = min(k + len(exclude), len(self.ids) if positions is None else len(positions))
+        if k <= 0:
+            return []
+        if positions is not None and len(positions) <= settings.faiss_prefilter_exact_max:
+            candidates = positions
+        elif positions is not None and self.ann is None:
+            distances, found = self._scan(query[0], k, positions)
+            return self._hits(distances, found, exclude)
+        elif self.ann is None:
+            distances, found = faiss.knn(query, self.vectors, k)
+            return self._hits(distances[0], found[0], exclude)
+        else:
+            selector = None if positions is None else faiss.IDSelectorBatch(positions.astype(np.int64))
+            _, found = self.ann.search(query, min(k * settings.faiss_ann_refine, len(self.ids)),
+                                       params=ann.search_params(self.ann, selector))
+            candidates = np.unique(found[0][found[0] >= 0])
+        distances = ((self.vectors[candidates] - query[0]) ** 2).sum(axis=1)
+        order = np.argsort(distances)[:k]
+        return self._hits(distances[order], candidates[order], exclude)
+
+    @property
+    def norms(self) -> np.ndarray:
+        """Squared L2 norm of every row, computed once per (immutable) generation."""
+        if self._norms is None:
+            self._norms = np.concatenate([np.einsum("ij,ij->i", self.vectors[i:i + SCAN_BLOCK_ROWS],
+                                                    self.vectors[i:i + SCAN_BLOCK_ROWS])
+                                          for i in range(0, len(self.ids), SCAN_BLOCK_ROWS)] or [np.zeros(0, np.float32)])
+        return self._norms
+
+    def _scan(self, query: np.ndarray, k: int, positions: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Exact top-k over the rows at `positions` without gathering them: each contiguous mapped block is scored
+        with one matrix-vector product (||x||^2 - 2x.q + ||q||^2) and rows outside the allowed set are masked."""
+        allowed = np.zeros(len(self.ids), dtype=bool)
+        allowed[positions] = True
+        best_d, best_p = np.empty(0, np.float32), np.empty(0, np.int64)
+        for start in range(0, len(self.ids), SCAN_BLOCK_ROWS):
+            stop = min(start + SCAN_BLOCK_ROWS, len(self.ids))
+            d = self.norms[start:stop] - 2 * (self.vectors[start:stop] @ query)
+            d[~allowed[start:stop]] = np.inf
+            top = np.argpartition(d, k - 1)[:k] if len(d) > k else np.arange(len(d))
+            best_d, best_p = np.concatenate([best_d, d[top]]), np.concatenate([best_p, top + start])
+            if len(best_d) > k:
+                keep = np.argpartition(best_d, k - 1)[:k]
+                best_d, best_p = best_d[keep], best_p[keep]
+        order = np.argsort(best_d)
+        best_d, best_p = best_d[order], best_p[order]
+        finite = np.isfinite(best_d)
+        return np.maximum(best_d[finite] + float(query @ query), 0.0), best_p[finite]
+
+    def _hits(self, distances: np.ndarray, positions: np.ndarray, exclude: set[int]) -> list[tuple[int, float]]:
+        hits = ((int(self.ids[p]), float(d)) for d, p in zip(distances, positions) if p >= 0)
+        return [(i, d) for i, d in hits if i not in exclude]
+
+    @staticmethod
+    def write(prefix: Path, dim: int, rows: Iterable[tuple[int, np.ndarray, Document]], count: int) -> None:
+        """Stream `count` (id, vector, document) rows, in ascending id order, into a new base generation."""
+        tmp = {s: Path(f"{prefix}{s}.tmp") for s in SUFFIXES}
+        ids = np.empty(count, dtype=np.int64)
+        offsets = np.zeros(count + 1, dtype=np.uint64)
+        vectors = (np.lib.format.open_memmap(tmp[".vectors.npy"], mode="w+", dtype=np.float32, shape=(count, dim))
+                   if count else np.zeros((0, dim), dtype=np.float32))
+        with open(tmp[".docs.bin"], "wb") as docs:
+            for n, (chunk_id, vector, doc) in enumerate(rows):
+                ids[n] = chunk_id
+                vectors[n] = vector
+                offsets[n + 1] = offsets[n] + docs.write(json.dumps({"text": doc.page_content, "metadata": doc.metadata}).encode())
+        if count:
+            vectors.flush()
+            del vectors
+        else:
+            np.save(tmp[".vectors.npy"], vectors)
+        for suffix, arr in ((".ids.npy", ids), (".docs.idx.npy", offsets)):
+            with open(tmp[suffix], "wb") as f:
+                np.save(f, arr)
+        for suffix, path in tmp.items():
+            path.replace(f"{prefix}{suffix}")
+
+class DocTable(MutableMapping):
+    """id -> Document view over an optional mapped base plus in-memory additions and base deletions."""
+
+    def __init__(self, base: MmapBase | None = None):
+        self.base = base
+        self.added: dict[int, Document] = {}
+        self.deleted: set[int] = set()
+
+    def __getitem__(self, chunk_id: int) -> Document:
+        if chunk_id in self.added:
+            return self.added[chunk_id]
+        if self.base is not None and chunk_id not in self.deleted:
+            doc = self.base.document(chunk_id)
+            if doc is not None:
+                return doc
+        raise KeyError(chunk_id)
+
+    def __contains__(self, chunk_id: object) -> bool:
+        return chunk_id in self.added or (self.base is not None and chunk_id not in self.deleted
+                                          and isinstance(chunk_id, int) and self.base.position(chunk_id) is not None)
+
+    def __setitem__(self, chunk_id: int, doc: Document) -> None:
+        self.added[chunk_id] = doc
+
+    def __delitem__(self, chunk_id: int) -> None:
+        if chunk_id in self.added:
+            del self.added[chunk_id]
+        elif chunk_id in self:
+            self.deleted.add(chunk_id)
+        else:
+            raise KeyError(chunk_id)
+
+    def __iter__(self) -> Iterator[int]:
+        if self.base is not None:
+            yield from (i for i in map(int, self.base.ids) if i not in self.deleted)
+        yield from list(self.added)
+
+    def __len__(self) -> int:
+        return (len(self.base) if self.base is not None else 0) - len(self.deleted) + len(self.added)
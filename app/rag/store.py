@@ -0,0 +1,526 @@
+"""PolicyStore: FAISS-backed policy index with a memory-mapped base, append-only delta segments, periodic
+compaction and a writer lock, plus the process-wide StoreRegistry that loads each index once and shares it.
+
+On-disk layout under the index directory:
+    manifest.json             current base generation and the delta segments applied on top of it
+    base-<gen>.*              compacted, memory-mapped snapshot (see app.rag.mmap_base), its optional ANN index
+                              and its metadata postings (see app.rag.metadata_index)
+    segments/<seq>.npy/.jsonl append-only deltas written by each ingest (added chunks plus deletion tombstones)
+    .writer.lock              flock serializing writers across processes (e.g. uvicorn workers)
+
+Chunks added since the last compaction live in an in-memory faiss IndexIDMap2; base rows are searched in place.
+"""
+from __future__ import annotations
+import fcntl
+import hashlib
+import json
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Iterable
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.vectorstores import VectorStore
+from app.chains.clients import get_client
+from app.rag.cache import CachedEmbeddings
+from app.rag import ann
+from app.rag.lexical import BM25Index
+from app.rag.metadata_index import MetadataIndex
+from app.rag.mmap_base import SUFFIXES, DocTable, MmapBase
+from app.utils.config import settings
+from app.utils.metrics import RETRIEVAL_SECONDS
+
+logger = logging.getLogger(__name__)
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode()).hexdigest()[:32]
+
+def build_embeddings() -> Embeddings:
+    try:
+        from langchain_aws import BedrockEmbeddings
+        embeddings = BedrockEmbeddings(client=get_client("bedrock-runtime"), model_id=settings.bedrock_embedding_model_id)
+    except Exception:
+        from langchain_community.embeddings import FakeEmbeddings
+        logger.warning("BedrockEmbeddings unavailable, using FakeEmbeddings for local dev")
+        embeddings = FakeEmbeddings(size=1536)
+    return CachedEmbeddings(embeddings, model_id=settings.bedrock_embedding_model_id)
+
+class PolicyStore(VectorStore):
+    def __init__(self, path: str | Path, embeddings: Embeddings):
+        self.path = Path(path)
+        self._embeddings = embeddings
+        self._base: MmapBase | None = None
+        self._delta = None                                # faiss IndexIDMap2 of chunks added since compaction
+        self.docs = DocTable()
+        self._hash_ids: dict[str, set[int]] = {}          # content hash -> chunk ids holding that embedding
+        self._doc_chunks: dict[str, dict[str, int]] = {}  # doc_id -> content hash -> chunk id
+        self._maps_ready = False                          # built lazily: only writers need them
+        self._meta: MetadataIndex | None = None           # built on the first filtered search
+        self._lexical: BM25Index | None = None            # built on ingest or the first lexical/hybrid search
+        self._next_id = 0
+        self._generation = 0
+        self._seq = 0
+        self._segments: list[str] = []
+        self.write_lock = threading.RLock()  # serializes ingests, segment writes and compaction
+        self._lock = threading.RLock()       # guards the in-memory index and docstore
+        self._writer_depth = 0
+        self._writer_file = None
+        self._refresh_checked = 0.0
+        self.load()
+
+    @property
+    def embeddings(self) -> Embeddings:
+        return self._embeddings
+
+    @property
+    def version(self) -> int:
+        """Monotonic index version (the manifest sequence number), identical across processes sharing the index."""
+        return self._seq
+
+    def __len__(self) -> int:
+        return len(self.docs)
+
+    # ─── loading ──────────────────────────────────────────────────────────────
+
+    def load(self) -> None:
+        manifest = self.path / "manifest.json"
+        if manifest.exists():
+            m = json.loads(manifest.read_text())
+            self._generation, self._seq, self._segments = m["generation"], m["seq"], m["segments"]
+            if self._generation:
+                self._load_base()
+            for name in self._segments:
+                self._apply_segment(name)
+            logger.info("Loaded policy index from %s: %d chunks, %d delta segment(s)", self.path, len(self), len(self._segments))
+        elif (self.path / "index.faiss").exists():
+            self._migrate_legacy()
+
+    def refresh(self) -> bool:
+        """Catch up with writes made by other processes; returns True if the in-memory view changed."""
+        manifest = self.path / "manifest.json"
+        if not manifest.exists():
+            return False
+        m = json.loads(manifest.read_text())
+        if m["seq"] == self._seq:
+            return False
+        if m["generation"] == self._generation and m["segments"][:len(self._segments)] == self._segments:
+            for name in m["segments"][len(self._segments):]:
+                self._apply_segment(name)
+            self._seq, self._segments = m["seq"], m["segments"]
+        else:
+            fresh = PolicyStore(self.path, self._embeddings)
+            with self._lock:
+                for attr in ("_base", "_delta", "docs", "_hash_ids", "_doc_chunks", "_maps_ready", "_meta", "_lexical", "_next_id",
+                             "_generation", "_seq", "_segments"):
+                    setattr(self, attr, getattr(fresh, attr))
+        logger.info("Refreshed policy index %s to version %d (%d chunks)", self.path, self._seq, len(self))
+        return True
+
+    def current_version(self) -> int:
+        self._maybe_refresh()
+        return self._seq
+
+    def _maybe_refresh(self) -> None:
+        # Read path: never wait on write_lock, which a local ingest or compaction (ANN training included) holds for
+        # its whole run. That writer syncs with the manifest itself, so skipping here only defers the check.
+        now = time.monotonic()
+        if now - self._refresh_checked >= settings.faiss_refresh_interval_seconds:
+            if not self.write_lock.acquire(blocking=False):
+                return
+            try:
+                self._refresh_checked = now
+                self.refresh()
+            finally:
+                self.write_lock.release()
+
+    @contextmanager
+    def _writer(self):
+        """Thread lock plus a re-entrant cross-process flock; syncs with other writers before any change."""
+        with self.write_lock:
+            if self._writer_depth == 0:
+                self.path.mkdir(parents=True, exist_ok=True)
+                self._writer_file = open(self.path / ".writer.lock", "w")
+                fcntl.flock(self._writer_file, fcntl.LOCK_EX)
+                self.refresh()
+            self._writer_depth += 1
+            try:
+                yield
+            finally:
+                self._writer_depth -= 1
+                if self._writer_depth == 0:
+                    fcntl.flock(self._writer_file, fcntl.LOCK_UN)
+                    self._writer_file.close()
+
+    def _load_base(self) -> None:
+        prefix = self.path / f"base-{self._generation}"
+        if Path(f"{prefix}.vectors.npy").exists():
+            self._base = MmapBase(prefix)
+            self.docs = DocTable(self._base)
+            self._next_id = int(self._base.ids[-1]) + 1 if len(self._base) else 0
+            return
+        # Generations written before the memory-mapped format: a faiss index plus JSON lines, loaded into the
+        # in-memory delta; the next compaction rewrites them in the mapped format.
+        import faiss
+        index = faiss.read_index(f"{prefix}.faiss")
+        with open(f"{prefix}.jsonl") as f:
+            recs = [json.loads(line) for line in f]
+        ids = np.array([r["id"] for r in recs], dtype=np.int64)
+        self._insert(ids, [r["text"] for r in recs], np.vstack([index.reconstruct(int(i)) for i in ids]) if len(ids) else
+                     np.zeros((0, index.d), np.float32), [r["metadata"] for r in recs])
+
+    def _apply_segment(self, name: str) -> None:
+        vectors = np.load(self.path / "segments" / f"{name}.npy")
+        with open(self.path / "segments" / f"{name}.jsonl") as f:
+            recs = [json.loads(line) for line in f]
+        self._remove([r["id"] for r in recs if r.get("deleted")])
+        adds = [r for r in recs if not r.get("deleted")]
+        self._insert(np.array([r["id"] for r in adds], dtype=np.int64), [r["text"] for r in adds], vectors,
+                     [r["metadata"] for r in adds])
+
+    def _migrate_legacy(self) -> None:
+        """One-time import of a langchain FAISS.save_local index (index.faiss + pickled index.pkl) into this format."""
+        from langchain_community.vectorstores import FAISS
+        legacy = FAISS.load_local(str(self.path), self._embeddings, allow_dangerous_deserialization=True)
+        positions = sorted(legacy.index_to_docstore_id)
+        docs = [legacy.docstore.search(legacy.index_to_docstore_id[p]) for p in positions]
+        vectors = legacy.index.reconstruct_n(0, legacy.index.ntotal)[positions]
+        self.add_embeddings([d.page_content for d in docs], vectors, [d.metadata for d in docs])
+        self.compact()
+        logger.info("Migrated legacy FAISS index at %s: %d chunks", self.path, len(docs))
+
+    # ─── writes ───────────────────────────────────────────────────────────────
+
+    def add_texts(self, texts: Iterable[str], metadatas: list[dict] | None = None, **kwargs: Any) -> list[str]:
+        texts = list(texts)
+        if not texts:
+            return []
+        return self.add_embeddings(texts, self._embeddings.embed_documents(texts), metadatas)
+
+    def add_embeddings(self, texts: list[str], vectors, metadatas: list[dict] | None = None) -> list[str]:
+        """Append pre-computed embeddings: updates the live index, then persists a delta segment."""
+        return self._commit(texts, vectors, metadatas or [{} for _ in texts], [])
+
+    def delete(self, ids: list[str] | None = None, **kwargs: Any) -> bool:
+        if not ids:
+            return False
+        with self._writer():
+            live = [int(i) for i in ids if int(i) in self.docs]
+            if live:
+                self._commit([], [], [], live)
+        return bool(live)
+
+    def missing_hashes(self, hashes: Iterable[str]) -> set[str]:
+        """Content hashes with no stored embedding anywhere in the index."""
+        self._ensure_maps()
+        with self._lock:
+            return {h for h in hashes if not self._hash_ids.get(h)}
+
+    def sync_documents(self, documents: list[tuple[str, list[str], list[dict]]],
+                       vectors: dict[str, np.ndarray] | None = None) -> dict[str, int]:
+        """Make each doc_id's chunks exactly the given ones, keyed by content hash, in a single delta segment.
+
+        Unchanged chunks are kept as-is, removed chunks are deleted, and new or re-labelled chunks are added
+        reusing any stored embedding with the same content hash; only hashes found nowhere are embedded here.
+        """
+        vectors = dict(vectors or {})
+        with self._writer():
+            self._ensure_maps()
+            add_texts, add_metas, delete_ids, kept = [], [], [], 0
+            for doc_id, texts, metadatas in documents:
+                existing = dict(self._doc_chunks.get(doc_id, {}))
+                for text, meta in zip(texts, metadatas):
+                    h = meta["content_hash"]
+                    chunk_id = existing.pop(h, None)
+                    if chunk_id is not None and self.docs[chunk_id].metadata == meta:
+                        kept += 1
+                        continue
+                    if chunk_id is not None:
+                        delete_ids.append(chunk_id)
+                    add_texts.append(text)
+                    add_metas.append(meta)
+                delete_ids.extend(existing.values())
+            for text, meta in zip(add_texts, add_metas):
+                h = meta["content_hash"]
+                if h not in vectors:
+                    with self._lock:
+                        reuse = next(iter(self._hash_ids.get(h, ())), None)
+                        vectors[h] = self._vector(reuse) if reuse is not None else None
+                if vectors[h] is None:
+                    vectors[h] = np.asarray(self._embeddings.embed_documents([text])[0], dtype=np.float32)
+            if add_texts or delete_ids:
+                self._commit(add_texts, [vectors[m["content_hash"]] for m in add_metas], add_metas, delete_ids)
+        return {"added": len(add_texts), "kept": kept, "deleted": len(delete_ids)}
+
+    def _commit(self, texts: list[str], vectors, metadatas: list[dict], delete_ids: list[int]) -> list[str]:
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(len(texts), -1) if texts else np.zeros((0, 0), np.float32)
+        with self._writer():
+            ids = np.arange(self._next_id, self._next_id + len(texts), dtype=np.int64)
+            self._remove(delete_ids)
+            self._insert(ids, texts, vectors, metadatas)
+            self._write_segment(ids, texts, vectors, metadatas, delete_ids)
+            if len(self._segments) >= settings.faiss_compact_after_segments:
+                self.compact()
+        return [str(i) for i in ids]
+
+    def _vector(self, chunk_id: int) -> np.ndarray:
+        if chunk_id in self.docs.added:
+            return self._delta.reconstruct(chunk_id)
+        return self._base.vector(chunk_id)
+
+    def _insert(self, ids: np.ndarray, texts: list[str], vectors: np.ndarray, metadatas: list[dict]) -> None:
+        import faiss
+        if not len(ids):
+            return
+        with self._lock:
+            if self._delta is None:
+                self._delta = faiss.IndexIDMap2(faiss.IndexFlatL2(vectors.shape[1]))
+            self._delta.add_with_ids(vectors, ids)
+            for i, text, meta in zip(ids.tolist(), texts, metadatas):
+                doc = Document(id=str(i), page_content=text, metadata=meta)
+                self.docs[i] = doc
+                if self._maps_ready:
+                    self._index_doc(i, doc)
+                if self._meta is not None:
+                    self._meta.add(i, meta)
+                if self._lexical is not None:
+                    self._lexical.add(i, text)
+            self._next_id = max(self._next_id, int(ids.max()) + 1)
+
+    def _ensure_maps(self) -> None:
+        with self._lock:
+            if not self._maps_ready:
+                for i, doc in self.docs.items():
+                    self._index_doc(i, doc)
+                self._maps_ready = True
+
+    def _ensure_meta(self) -> MetadataIndex:
+        """Metadata index for the live chunks: the base's persisted postings, patched with the delta."""
+        with self._lock:
+            if self._meta is None:
+                path = Path(f"{self._base.prefix}.meta.json") if self._base is not None else None
+                if path is not None and path.exists():
+                    meta = MetadataIndex.from_dict(json.loads(path.read_text()), map(int, self._base.ids))
+                    for i in self.docs.deleted:
+                        meta.remove(i, self._base.document(i).metadata)
+                    for i, doc in self.docs.added.items():
+                        meta.add(i, doc.metadata)
+                else:
+                    meta = MetadataIndex()
+                    for i, doc in self.docs.items():
+                        meta.add(i, doc.metadata)
+                self._meta = meta
+            return self._meta
+
+    def lexical_index(self) -> BM25Index:
+        with self._lock:
+            if self._lexical is None:
+                self._lexical = BM25Index.build((i, doc.page_content) for i, doc in self.docs.items())
+            return self._lexical
+
+    def _index_doc(self, i: int, doc: Document) -> None:
+        h = doc.metadata.get("content_hash") or content_hash(doc.page_content)
+        self._hash_ids.setdefault(h, set()).add(i)
+        if "doc_id" in doc.metadata:
+            self._doc_chunks.setdefault(doc.metadata["doc_id"], {})[h] = i
+
+    def _remove(self, ids: list[int]) -> None:
+        if not ids:
+            return
+        with self._lock:
+            delta_ids = [i for i in ids if i in self.docs.added]
+            if delta_ids:
+                self._delta.remove_ids(np.asarray(delta_ids, dtype=np.int64))
+            for i in ids:
+                doc = self.docs.pop(i)
+                if self._meta is not None:
+                    self._meta.remove(i, doc.metadata)
+                if self._lexical is not None:
+                    self._lexical.remove(i, doc.page_content)
+                if not self._maps_ready:
+                    continue
+                h = doc.metadata.get("content_hash") or content_hash(doc.page_content)
+                self._hash_ids.get(h, set()).discard(i)
+                chunks = self._doc_chunks.get(doc.metadata.get("doc_id"), {})
+                if chunks.get(h) == i:
+                    del chunks[h]
+
+    def _write_segment(self, ids: np.ndarray, texts: list[str], vectors: np.ndarray, metadatas: list[dict],
+                       delete_ids: list[int]) -> None:
+        seg_dir = self.path / "segments"
+        seg_dir.mkdir(parents=True, exist_ok=True)
+        name = f"{self._seq + 1:06d}"
+        np.save(seg_dir / f"{name}.npy", vectors)
+        with open(seg_dir / f"{name}.jsonl", "w") as f:
+            for i in delete_ids:
+                f.write(json.dumps({"id": i, "deleted": True}) + "\n")
+            for i, text, meta in zip(ids.tolist(), texts, metadatas):
+                f.write(json.dumps({"id": i, "text": text, "metadata": meta}) + "\n")
+        self._seq += 1
+        self._segments.append(name)
+        self._write_manifest()
+
+    def compact(self) -> None:
+        """Fold the base and all delta segments into a new memory-mapped base generation, then drop the old files."""
+        with self._writer():
+            with self._lock:
+                base, delta = self._base, self._delta
+                if base is None and delta is None:
+                    return
+                dim = base.dim if base is not None else delta.d
+                live_ids = list(self.docs)
+                added = dict(self.docs.added)
+                delta_vectors = {i: delta.reconstruct(i) for i in added}
+            generation = self._generation + 1
+            prefix = self.path / f"base-{generation}"
+            rows = ((i, delta_vectors[i] if i in added else base.vector(i), added.get(i) or base.document(i))
+                    for i in live_ids)
+            MmapBase.write(prefix, dim, rows, len(live_ids))
+            ann.build(prefix, MmapBase(prefix).vectors)
+            Path(f"{prefix}.meta.json").write_text(json.dumps(self._ensure_meta().to_dict()))
+            old_generation, old_segments = self._generation, self._segments
+            with self._lock:
+                self._base = MmapBase(prefix)
+                self._delta = None
+                self.docs = DocTable(self._base)
+                self._generation, self._segments = generation, []
+            self._write_manifest()
+            for suffix in (*SUFFIXES, ".ann.faiss", ".meta.json", ".faiss", ".jsonl"):
+                Path(f"{self.path / f'base-{old_generation}'}{suffix}").unlink(missing_ok=True)
+            for name in old_segments:
+                for suffix in (".npy", ".jsonl"):
+                    (self.path / "segments" / f"{name}{suffix}").unlink(missing_ok=True)
+        logger.info("Compacted policy index to generation %d (%d chunks)", generation, len(live_ids))
+
+    def _write_manifest(self) -> None:
+        self.path.mkdir(parents=True, exist_ok=True)
+        tmp = self.path / "manifest.json.tmp"
+        tmp.write_text(json.dumps({"generation": self._generation, "seq": self._seq, "segments": self._segments}))
+        tmp.replace(self.path / "manifest.json")
+
+    # ─── search ───────────────────────────────────────────────────────────────
+
+    def similarity_search(self, query: str, k: int = 4, filter: dict[str, Any] | None = None, mode: str | None = None,
+                          **kwargs: Any) -> list[Document]:
+        """`mode` is vector, lexical (BM25, no embedding call) or hybrid; defaults to settings.retrieval_mode."""
+        mode = mode or settings.retrieval_mode
+        embedding = None
+        if mode != "lexical":
+            try:
+                with RETRIEVAL_SECONDS.labels("embed").time():
+                    embedding = self._embeddings.embed_query(query)
+            except Exception as exc:
+                if not settings.retrieval_lexical_fallback:
+                    raise
+                logger.warning("Query embedding failed, falling back to lexical retrieval: %s", exc)
+                mode = "lexical"
+        if mode == "vector":
+            return [doc for doc, _ in self.similarity_search_with_score_by_vector(embedding, k, filter)]
+        candidates = k if mode == "lexical" else k * settings.hybrid_candidates
+        lexical = self.lexical_search_with_score(query, candidates, filter)
+        if mode == "lexical":
+            return [doc for doc, _ in lexical]
+        vector = self.similarity_search_with_score_by_vector(embedding, candidates, filter)
+        return [doc for doc, _ in self._fuse(vector, lexical, k)]
+
+    def lexical_search_with_score(self, query: str, k: int = 4,
+                                  filter: dict[str, Any] | None = None) -> list[tuple[Document, float]]:
+        self._maybe_refresh()
+        with self._lock, RETRIEVAL_SECONDS.labels("lexical_search").time():
+            hits = self.lexical_index().search(query, k, self._allowed(filter))
+            return [(self.docs[i], score) for i, score in hits]
+
+    @staticmethod
+    def _fuse(vector: list[tuple[Document, float]], lexical: list[tuple[Document, float]],
+              k: int) -> list[tuple[Document, float]]:
+        """Weighted sum of min-max normalized vector similarity and max-normalized BM25 score."""
+        alpha, scores, docs = settings.hybrid_alpha, {}, {}
+        if vector:
+            low, high = vector[0][1], vector[-1][1]
+            for doc, distance in vector:
+                docs[doc.id] = doc
+                scores[doc.id] = alpha * (1 - (distance - low) / (high - low) if high > low else 1.0)
+        if lexical:
+            top = lexical[0][1] or 1.0
+            for doc, score in lexical:
+                docs.setdefault(doc.id, doc)
+                scores[doc.id] = scores.get(doc.id, 0.0) + (1 - alpha) * score / top
+        ranked = sorted(scores, key=scores.get, reverse=True)[:k]
+        return [(docs[i], scores[i]) for i in ranked]
+
+    def similarity_search_with_score(self, query: str, k: int = 4, filter: dict[str, Any] | None = None,
+                                     **kwargs: Any) -> list[tuple[Document, float]]:
+        return self.similarity_search_with_score_by_vector(self._embeddings.embed_query(query), k, filter)
+
+    def similarity_search_by_vector(self, embedding: list[float], k: int = 4, filter: dict[str, Any] | None = None,
+                                    **kwargs: Any) -> list[Document]:
+        return [doc for doc, _ in self.similarity_search_with_score_by_vector(embedding, k, filter)]
+
+    def similarity_search_with_score_by_vector(self, embedding: list[float], k: int = 4,
+                                               filter: dict[str, Any] | None = None) -> list[tuple[Document, float]]:
+        """Top-k chunks by L2 distance; `filter` (see app.rag.metadata_index) restricts the candidates up front."""
+        import faiss
+        self._maybe_refresh()
+        query = np.asarray([embedding], dtype=np.float32)
+        with self._lock, RETRIEVAL_SECONDS.labels("vector_search").time():
+            allowed = self._allowed(filter)
+            hits: list[tuple[int, float]] = []
+            if self._delta is not None and self._delta.ntotal:
+                params = None
+                if allowed is not None:
+                    selector = faiss.IDSelectorBatch(np.fromiter((i for i in allowed if i in self.docs.added), dtype=np.int64))
+                    params = faiss.SearchParameters(sel=selector)
+                distances, labels = self._delta.search(query, min(k, self._delta.ntotal), params=params)
+                hits += [(int(i), float(d)) for d, i in zip(distances[0], labels[0]) if i >= 0]
+            if self._base is not None:
+                hits += self._base.search(query, k, self.docs.deleted, allowed)
+            hits.sort(key=lambda hit: hit[1])
+            return [(self.docs[i], d) for i, d in hits[:k]]
+
+    def _allowed(self, filter: dict[str, Any] | None) -> set[int] | None:
+        if not filter or all(v is None for v in filter.values()):
+            return None
+        return self._ensure_meta().candidates(filter)
+
+    def _select_relevance_score_fn(self):
+        return self._euclidean_relevance_score_fn
+
+    @classmethod
+    def from_texts(cls, texts: list[str], embedding: Embeddings, metadatas: list[dict] | None = None,
+                   *, path: str | Path = "", **kwargs: Any) -> PolicyStore:
+        store = cls(path or settings.faiss_index_path, embedding)
+        store.add_texts(texts, metadatas)
+        return store
+
+class StoreRegistry:
+    """Loads each on-disk index once per process and hands out retrievers that share it and one embeddings client."""
+
+    def __init__(self, embeddings_factory=build_embeddings):
+        self._embeddings_factory = embeddings_factory
+        self._embeddings: Embeddings | None = None
+        self._stores: dict[Path, PolicyStore] = {}
+        self._lock = threading.Lock()
+
+    def get(self, path: str | Path | None = None) -> PolicyStore:
+        key = Path(path or settings.faiss_index_path).resolve()
+        with self._lock:
+            if key not in self._stores:
+                if self._embeddings is None:
+                    self._embeddings = self._embeddings_factory()
+                self._stores[key] = PolicyStore(key, self._embeddings)
+            return self._stores[key]
+
+    def retriever(self, k: int = 4, path: str | Path | None = None):
+        return self.get(path).as_retriever(search_kwargs={"k": k})
+
+    def clear(self) -> None:
+        with self._lock:
+            self._stores.clear()
+
+registry = StoreRegistry()
+
+def get_policy_store(path: str | Path | None = None) -> PolicyStore:
+    """Process-wide policy store shared by the agent's retriever, the ingestion service and app.retrieval."""
+    return registry.get(path)
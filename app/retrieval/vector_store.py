@@ -1,64 +1,38 @@
 """
-RAG retrieval layer — loads credit policy documents into FAISS
-and exposes a retriever for use by the agent.
+RAG retrieval layer — loads credit policy documents into the shared FAISS policy store.
+The agent's retriever (app.rag.retriever.build_retriever) seeds through build_vector_store().
 """
 
-import os
 import logging
 from pathlib import Path
 
-from langchain_community.vectorstores import FAISS
-from langchain_aws import BedrockEmbeddings
-from langchain_community.document_loaders import DirectoryLoader, TextLoader
-from langchain.text_splitter import RecursiveCharacterTextSplitter
-import boto3
+from app.models.schemas import DocumentInput
+from app.rag.ingestion import RagIngestionService
+from app.rag.store import PolicyStore, get_policy_store
 
 logger = logging.getLogger(__name__)
 
 DOCS_DIR = Path(__file__).parent.parent.parent / "data" / "policy_docs"
-INDEX_DIR = Path(__file__).parent.parent.parent / "data" / "faiss_index"
-AWS_REGION = os.getenv("AWS_REGION", "us-east-1")
 
 
-def _get_embeddings() -> BedrockEmbeddings:
-    session = boto3.Session(region_name=AWS_REGION)
-    return BedrockEmbeddings(
-        client=session.client("bedrock-runtime"),
-        model_id="amazon.titan-embed-text-v1",
-    )
+def build_vector_store(force_rebuild: bool = False) -> PolicyStore:
+    """Return the shared policy store, ingesting the policy_docs corpus when it is empty or a rebuild is forced."""
+    store = get_policy_store()
+    if len(store) and not force_rebuild:
+        logger.info("Using shared policy index: version %d, %d chunks", store.version, len(store))
+        return store
 
-
-def build_vector_store(force_rebuild: bool = False) -> FAISS:
-    """Build (or load cached) FAISS index from policy documents."""
-    embeddings = _get_embeddings()
-
-    if INDEX_DIR.exists() and not force_rebuild:
-        logger.info("Loading cached FAISS index from %s", INDEX_DIR)
-        return FAISS.load_local(str(INDEX_DIR), embeddings, allow_dangerous_deserialization=True)
-
-    logger.info("Building FAISS index from %s", DOCS_DIR)
+    logger.info("Ingesting policy documents from %s", DOCS_DIR)
     DOCS_DIR.mkdir(parents=True, exist_ok=True)
     _seed_sample_docs()
-
-    loader = DirectoryLoader(str(DOCS_DIR), glob="**/*.txt", loader_cls=TextLoader)
-    docs = loader.load()
-
-    splitter = RecursiveCharacterTextSplitter(chunk_size=800, chunk_overlap=100)
-    splits = splitter.split_documents(docs)
-
-    store = FAISS.from_documents(splits, embeddings)
-    INDEX_DIR.mkdir(parents=True, exist_ok=True)
-    store.save_local(str(INDEX_DIR))
-    logger.info("FAISS index built: %d chunks", len(splits))
+    docs = [DocumentInput(doc_id=p.name, title=p.stem.replace("_", " ").title(), content=p.read_text(),
+                          metadata={"source": str(p)})
+            for p in sorted(DOCS_DIR.glob("**/*.txt"))]
+    chunks = RagIngestionService(store).ingest(docs)
+    logger.info("Policy index ready: %d chunks from %d documents", chunks, len(docs))
     return store
 
 
-def get_retriever(k: int = 4):
-    """Return a retriever backed by the FAISS vector store."""
-    store = build_vector_store()
-    return store.as_retriever(search_kwargs={"k": k})
-
-
 def _seed_sample_docs():
     """Write sample policy documents so the repo works out of the box."""
     policies = {
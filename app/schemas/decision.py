@@ -36,5 +36,7 @@ class DecisionResult(BaseModel):
 class HealthStatus(BaseModel):
     status: str
     bedrock_connected: bool
+    bedrock_checked_at: datetime | None = None
+    bedrock_latency_ms: float | None = None
     vector_store_ready: bool
     version: str = "1.0.0"
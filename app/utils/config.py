@@ -1,3 +1,4 @@
+from typing import Literal
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 class Settings(BaseSettings):
@@ -7,12 +8,84 @@ class Settings(BaseSettings):
     aws_secret_access_key: str = ""
     bedrock_model_id: str = "anthropic.claude-3-sonnet-20240229-v1:0"
     bedrock_embedding_model_id: str = "amazon.titan-embed-text-v1"
+    bedrock_limiter_enabled: bool = True
+    bedrock_concurrency_initial: int = 8
+    bedrock_concurrency_min: int = 1
+    bedrock_concurrency_max: int = 64
+    bedrock_queue_timeout_seconds: float = 10.0
+    bedrock_max_queue: int = 128
+    bedrock_latency_tolerance: float = 2.0
+    bedrock_endpoint_url: str = ""
+    aws_max_pool_connections: int = 64  # >= bedrock_concurrency_max, so the pool never caps the limiter's window
+    aws_tcp_keepalive: bool = True
+    aws_connect_timeout_seconds: float = 5.0
+    aws_read_timeout_seconds: float = 120.0
+    aws_retry_mode: Literal["legacy", "standard", "adaptive"] = "adaptive"
+    aws_max_attempts: int = 4
+    default_executor_threads: int = 64
     vector_store: str = "faiss"
+    faiss_index_path: str = "data/faiss_index"
+    faiss_compact_after_segments: int = 16
+    faiss_refresh_interval_seconds: float = 5.0
+    faiss_index_type: Literal["flat", "ivf_flat", "hnsw", "ivf_pq"] = "flat"
+    faiss_ann_min_vectors: int = 10_000
+    faiss_ann_refine: int = 4
+    faiss_train_sample: int = 100_000
+    faiss_nlist: int = 0
+    faiss_nprobe: int = 16
+    faiss_pq_m: int = 64
+    faiss_pq_nbits: int = 8
+    faiss_hnsw_m: int = 32
+    faiss_hnsw_ef_construction: int = 200
+    faiss_hnsw_ef_search: int = 64
+    faiss_prefilter_exact_max: int = 50_000
+    retrieval_mode: Literal["vector", "hybrid", "lexical"] = "vector"
+    hybrid_alpha: float = 0.5
+    hybrid_candidates: int = 4
+    retrieval_lexical_fallback: bool = True
+    embedding_batch_size: int = 16
+    embedding_max_workers: int = 8
+    embedding_max_retries: int = 5
+    embedding_backoff_seconds: float = 0.5
+    ingest_jobs_db: str = "data/ingest_jobs.sqlite3"
+    ingest_workers: int = 1
+    ingest_max_pending_jobs: int = 32
+    ingest_job_lease_seconds: float = 60.0
+    ingest_job_embedding_workers: int = 2
     opensearch_url: str = "https://localhost:9200"
     opensearch_index: str = "fintech-policies"
     opensearch_user: str = "admin"
     opensearch_password: str = "admin"
     agent_verbose: bool = False
+    agent_prefetch_policies: bool = True
+    decision_cache_enabled: bool = True
+    decision_cache_size: int = 10_000
+    decision_cache_ttl_seconds: float = 900.0
+    decision_cache_url: str = ""
+    decision_cache_prefix: str = "decision:"
+    decision_coalescing_enabled: bool = True
+    trace_enabled: bool = False
+    trace_log_path: str = "data/profile/decisions.jsonl"
+    trace_log_max_bytes: int = 50_000_000
+    trace_log_backup_count: int = 5
+    rules_fast_path_enabled: bool = True
+    batch_max_concurrency: int = 8
+    batch_max_size: int = 50_000
+    stress_portfolio_dir: str = "data/portfolios"
+    stress_chunk_rows: int = 250_000
+    stress_workers: int = 0
+    stress_max_workers: int = 2  # /stress-test only: each spawn worker costs ~160 MiB inside the API process
+    warmup_on_startup: bool = True
+    warmup_in_background: bool = True
+    warmup_attempts: int = 3
+    warmup_retry_backoff_seconds: float = 2.0
+    warmup_degraded_ready: bool = False
+    bedrock_health_interval_seconds: float = 30.0
+    embedding_cache_size: int = 10_000
+    embedding_cache_ttl_seconds: float = 86_400.0
+    retrieval_cache_size: int = 2_048
+    retrieval_cache_ttl_seconds: float = 3_600.0
+    retrieval_cache_dir: str = ""
     log_level: str = "INFO"
 
 settings = Settings()
@@ -0,0 +1,112 @@
+"""Prometheus metrics: per-stage latency histograms and counters for HTTP requests, decisions, agent tools,
+retrieval (query embedding vs index search), Bedrock LLM calls and ingestion, served at GET /metrics.
+
+Under several uvicorn workers set PROMETHEUS_MULTIPROC_DIR to a shared empty directory so /metrics aggregates
+every worker process.
+"""
+from __future__ import annotations
+import os
+import time
+from typing import Any
+from uuid import UUID
+from langchain_core.callbacks import BaseCallbackHandler
+from prometheus_client import (CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram,
+                               generate_latest)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+HTTP_REQUESTS_IN_FLIGHT = Gauge("http_requests_in_flight", "HTTP requests currently being served", ["method"],
+                                multiprocess_mode="livesum")
+HTTP_REQUEST_SECONDS = Histogram("http_request_duration_seconds", "HTTP request latency", ["method", "route", "status"],
+                                 buckets=LATENCY_BUCKETS)
+DECISION_SECONDS = Histogram("decision_duration_seconds", "DecisioningAgent.run latency by decision path", ["path"],
+                             buckets=LATENCY_BUCKETS)
+DECISIONS = Counter("decisions_total", "Decisions made", ["path", "decision"])
+TOOL_SECONDS = Histogram("agent_tool_duration_seconds", "Agent tool call latency", ["tool", "status"],
+                         buckets=LATENCY_BUCKETS)
+RETRIEVAL_SECONDS = Histogram("retrieval_stage_duration_seconds", "Policy retrieval latency by stage "
+                              "(embed = query embedding, vector_search / lexical_search = index lookup)", ["stage"],
+                              buckets=LATENCY_BUCKETS)
+LLM_SECONDS = Histogram("bedrock_llm_call_duration_seconds", "Bedrock chat model call latency", ["model", "status"],
+                        buckets=LATENCY_BUCKETS)
+LLM_TOKENS = Counter("bedrock_llm_tokens_total", "Bedrock chat model tokens", ["model", "direction"])
+LLM_THROTTLES = Counter("bedrock_llm_throttles_total", "Bedrock chat model calls rejected by throttling", ["model"])
+BEDROCK_CONCURRENCY_LIMIT = Gauge("bedrock_concurrency_limit", "Adaptive Bedrock concurrency window",
+                                  multiprocess_mode="livesum")
+BEDROCK_CALLS_WAITING = Gauge("bedrock_calls_waiting", "Bedrock calls queued for a concurrency slot",
+                              multiprocess_mode="livesum")
+BEDROCK_LOAD_SHED = Counter("bedrock_load_shed_total", "Work shed because Bedrock capacity was exhausted", ["stage"])
+INGEST_SECONDS = Histogram("ingest_duration_seconds", "Ingestion job latency", buckets=LATENCY_BUCKETS)
+INGEST_CHUNKS = Counter("ingest_chunks_total", "Ingested chunks by outcome", ["outcome"])
+
+class MetricsCallbackHandler(BaseCallbackHandler):
+    """LangChain callbacks timing every chat model call (with token usage and throttles) and tool call.
+
+    Pass it in the run config (`config={"callbacks": [...]}`) so it is inherited by the agent's nested runs.
+    """
+
+    run_inline = True  # plain counter updates; no need for the executor hop LangChain uses for sync handlers
+
+    def __init__(self):
+        self._started: dict[UUID, tuple[float, str]] = {}
+
+    def on_chat_model_start(self, serialized: dict[str, Any], messages: list, *, run_id: UUID,
+                            metadata: dict[str, Any] | None = None, **kwargs: Any) -> None:
+        model = (metadata or {}).get("ls_model_name") or kwargs.get("invocation_params", {}).get("model_id") or "unknown"
+        self._started[run_id] = (time.perf_counter(), str(model))
+
+    def on_llm_end(self, response, *, run_id: UUID, **kwargs: Any) -> None:
+        started, model = self._started.pop(run_id, (None, "unknown"))
+        if started is not None:
+            LLM_SECONDS.labels(model, "ok").observe(time.perf_counter() - started)
+        usage = _usage(response)
+        for direction in ("input", "output"):
+            if usage.get(direction):
+                LLM_TOKENS.labels(model, direction).inc(usage[direction])
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        from app.rag.ingestion import is_throttle_error
+        started, model = self._started.pop(run_id, (None, "unknown"))
+        throttled = isinstance(error, Exception) and is_throttle_error(error)
+        if started is not None:
+            LLM_SECONDS.labels(model, "throttled" if throttled else "error").observe(time.perf_counter() - started)
+        if throttled:
+            LLM_THROTTLES.labels(model).inc()
+
+    def on_tool_start(self, serialized: dict[str, Any], input_str: str, *, run_id: UUID, **kwargs: Any) -> None:
+        self._started[run_id] = (time.perf_counter(), str((serialized or {}).get("name") or kwargs.get("name") or "unknown"))
+
+    def on_tool_end(self, output: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        self._tool_done(run_id, "ok")
+
+    def on_tool_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self._tool_done(run_id, "error")
+
+    def _tool_done(self, run_id: UUID, status: str) -> None:
+        started, tool = self._started.pop(run_id, (None, "unknown"))
+        if started is not None:
+            TOOL_SECONDS.labels(tool, status).observe(time.perf_counter() - started)
+
+def _usage(response) -> dict[str, int]:
+    """Input/output token counts from a chat LLMResult (usage_metadata, or Bedrock's llm_output usage)."""
+    usage = {"input": 0, "output": 0}
+    for generations in response.generations:
+        for generation in generations:
+            metadata = getattr(getattr(generation, "message", None), "usage_metadata", None) or {}
+            usage["input"] += metadata.get("input_tokens", 0)
+            usage["output"] += metadata.get("output_tokens", 0)
+    if not any(usage.values()):
+        raw = (response.llm_output or {}).get("usage") or {}
+        usage = {"input": raw.get("prompt_tokens", 0), "output": raw.get("completion_tokens", 0)}
+    return usage
+
+metrics_callback = MetricsCallbackHandler()
+
+def render_metrics() -> tuple[bytes, str]:
+    """Exposition-format body and content type for GET /metrics."""
+    registry = REGISTRY
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    return generate_latest(registry), CONTENT_TYPE_LATEST
@@ -0,0 +1,234 @@
+"""Opt-in per-decision tracing: a span tree of the stages behind one decision (rules, cache lookup, policy prefetch,
+each agent LLM turn with token counts, each tool call with its args, retrieval hits, output parsing).
+
+Traces are returned in DecisionResponse.trace when the request sets `trace`, and every trace (including those
+recorded because TRACE_ENABLED is on) is appended to a rotating JSONL profile log. Aggregate the log offline:
+
+    python -m app.utils.tracing data/profile/decisions.jsonl*
+"""
+from __future__ import annotations
+import argparse
+import glob
+import json
+import logging
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+from typing import Any, Iterator
+from uuid import UUID
+import numpy as np
+from langchain_core.callbacks import BaseCallbackHandler
+from app.utils.config import settings
+
+logger = logging.getLogger(__name__)
+
+_current: ContextVar[Trace | None] = ContextVar("decision_trace", default=None)
+_profile_logger: logging.Logger | None = None
+_profile_lock = threading.Lock()
+
+class Trace:
+    """Span tree for one decision. Spans are dicts: name, kind, start_ms (from trace start), duration_ms,
+    attributes, children."""
+
+    def __init__(self, name: str, **attributes: Any):
+        self.started = time.perf_counter()
+        self.root = self._new_span(name, "decision", attributes)
+        self._stack = [self.root]  # open manual spans; callback spans nest under the innermost
+        self._runs: dict[UUID, dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def _new_span(self, name: str, kind: str, attributes: dict[str, Any]) -> dict[str, Any]:
+        return {"name": name, "kind": kind, "start_ms": round((time.perf_counter() - self.started) * 1000, 3),
+                "duration_ms": None, "attributes": attributes, "children": []}
+
+    def _close(self, span: dict[str, Any]) -> None:
+        span["duration_ms"] = round((time.perf_counter() - self.started) * 1000 - span["start_ms"], 3)
+
+    @contextmanager
+    def span(self, name: str, kind: str = "stage", **attributes: Any) -> Iterator[dict[str, Any]]:
+        with self._lock:
+            span = self._new_span(name, kind, attributes)
+            self._stack[-1]["children"].append(span)
+            self._stack.append(span)
+        try:
+            yield span
+        except BaseException as exc:
+            span["attributes"]["error"] = str(exc) or type(exc).__name__
+            raise
+        finally:
+            with self._lock:
+                self._stack.remove(span)
+                self._close(span)
+
+    def start_run(self, run_id: UUID, parent_run_id: UUID | None, name: str, kind: str, **attributes: Any) -> None:
+        with self._lock:
+            span = self._new_span(name, kind, attributes)
+            parent = self._runs.get(parent_run_id) if parent_run_id is not None else None
+            (parent or self._stack[-1])["children"].append(span)
+            self._runs[run_id] = span
+
+    def end_run(self, run_id: UUID, **attributes: Any) -> None:
+        with self._lock:
+            span = self._runs.get(run_id)
+            if span is not None:
+                span["attributes"].update(attributes)
+                self._close(span)
+
+    def callback(self) -> TraceCallbackHandler:
+        return TraceCallbackHandler(self)
+
+    def finish(self, **attributes: Any) -> dict[str, Any]:
+        self.root["attributes"].update(attributes)
+        self._close(self.root)
+        return self.root
+
+class TraceCallbackHandler(BaseCallbackHandler):
+    """Records LLM turns, tool calls and retrievals from an agent run into a Trace.
+
+    Intermediate chains are not spans; their children attach to the nearest recorded ancestor.
+    """
+
+    run_inline = True
+
+    def __init__(self, trace: Trace):
+        self.trace = trace
+        self.turns = 0
+        self._parents: dict[UUID, UUID | None] = {}
+
+    def _parent(self, parent_run_id: UUID | None) -> UUID | None:
+        while parent_run_id is not None and parent_run_id not in self.trace._runs:
+            parent_run_id = self._parents.get(parent_run_id)
+        return parent_run_id
+
+    def on_chain_start(self, serialized: dict[str, Any], inputs: Any, *, run_id: UUID,
+                       parent_run_id: UUID | None = None, **kwargs: Any) -> None:
+        self._parents[run_id] = parent_run_id
+
+    def on_chat_model_start(self, serialized: dict[str, Any], messages: list, *, run_id: UUID,
+                            parent_run_id: UUID | None = None, metadata: dict[str, Any] | None = None,
+                            **kwargs: Any) -> None:
+        self.turns += 1
+        self.trace.start_run(run_id, self._parent(parent_run_id), "llm", "llm", iteration=self.turns,
+                             model=(metadata or {}).get("ls_model_name"))
+
+    def on_llm_end(self, response, *, run_id: UUID, **kwargs: Any) -> None:
+        from app.utils.metrics import _usage
+        usage = _usage(response)
+        message = getattr(response.generations[0][0], "message", None) if response.generations else None
+        self.trace.end_run(run_id, input_tokens=usage["input"], output_tokens=usage["output"],
+                           tool_calls=[c["name"] for c in getattr(message, "tool_calls", None) or []])
+
+    def on_tool_start(self, serialized: dict[str, Any], input_str: str, *, run_id: UUID,
+                      parent_run_id: UUID | None = None, inputs: dict[str, Any] | None = None, **kwargs: Any) -> None:
+        name = (serialized or {}).get("name") or kwargs.get("name") or "tool"
+        self.trace.start_run(run_id, self._parent(parent_run_id), f"tool:{name}", "tool",
+                             args=inputs if inputs is not None else input_str)
+
+    def on_tool_end(self, output: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        self.trace.end_run(run_id, output_chars=len(str(output)))
+
+    def on_retriever_start(self, serialized: dict[str, Any], query: str, *, run_id: UUID,
+                           parent_run_id: UUID | None = None, **kwargs: Any) -> None:
+        self.trace.start_run(run_id, self._parent(parent_run_id), "retrieval", "retriever", query=query)
+
+    def on_retriever_end(self, documents, *, run_id: UUID, **kwargs: Any) -> None:
+        self.trace.end_run(run_id, hits=len(documents), titles=[d.metadata.get("title") for d in documents])
+
+    def _error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self.trace.end_run(run_id, error=str(error) or type(error).__name__)
+
+    on_llm_error = on_tool_error = on_retriever_error = _error
+
+@contextmanager
+def start(name: str, enabled: bool = True, **attributes: Any) -> Iterator[Trace | None]:
+    """Make a new Trace current for the enclosed block (and tasks/threads started from it); None when disabled."""
+    trace = Trace(name, **attributes) if enabled else None
+    token = _current.set(trace)
+    try:
+        yield trace
+    finally:
+        _current.reset(token)
+
+def current() -> Trace | None:
+    return _current.get()
+
+@contextmanager
+def span(name: str, kind: str = "stage", **attributes: Any) -> Iterator[dict[str, Any] | None]:
+    """Span in the current trace; a no-op yielding None when tracing is off."""
+    trace = _current.get()
+    if trace is None:
+        yield None
+        return
+    with trace.span(name, kind, **attributes) as s:
+        yield s
+
+def annotate(span: dict[str, Any] | None, **attributes: Any) -> None:
+    if span is not None:
+        span["attributes"].update(attributes)
+
+def callbacks() -> list[BaseCallbackHandler]:
+    trace = _current.get()
+    return [trace.callback()] if trace is not None else []
+
+def record(entry: dict[str, Any]) -> None:
+    """Append one JSON line to the rotating profile log (settings.trace_log_path); blank path disables it."""
+    global _profile_logger
+    if not settings.trace_log_path:
+        return
+    with _profile_lock:
+        try:
+            if _profile_logger is None:
+                path = Path(settings.trace_log_path)
+                path.parent.mkdir(parents=True, exist_ok=True)
+                handler = RotatingFileHandler(path, maxBytes=settings.trace_log_max_bytes,
+                                              backupCount=settings.trace_log_backup_count, encoding="utf-8")
+                handler.setFormatter(logging.Formatter("%(message)s"))
+                _profile_logger = logging.Logger("app.profile")  # unregistered: never propagates to the app's log
+                _profile_logger.addHandler(handler)
+        except OSError as exc:  # an unwritable profile log must never fail a decision
+            logger.warning("Profile log unavailable: %s", exc)
+            return
+    _profile_logger.info(json.dumps({"ts": datetime.now(timezone.utc).isoformat(), **entry}, default=str))
+
+def _spans(span: dict[str, Any]) -> Iterator[dict[str, Any]]:
+    yield span
+    for child in span["children"]:
+        yield from _spans(child)
+
+def report(paths: list[str]) -> dict[str, dict[str, float]]:
+    """Per-stage (span name) count and p50/p95/p99/mean duration in ms across profile log files."""
+    durations: dict[str, list[float]] = defaultdict(list)
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                for span in _spans(json.loads(line)["trace"]):
+                    if span["duration_ms"] is not None:
+                        durations[span["name"]].append(span["duration_ms"])
+    stages = {}
+    for name, values in durations.items():
+        p50, p95, p99 = np.percentile(values, [50, 95, 99])
+        stages[name] = {"count": len(values), "p50_ms": p50, "p95_ms": p95, "p99_ms": p99, "mean_ms": float(np.mean(values))}
+    return dict(sorted(stages.items(), key=lambda item: -item[1]["p95_ms"]))
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("logs", nargs="*", help="profile log files (default: TRACE_LOG_PATH and its rotations)")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args()
+
+    paths = args.logs or sorted(glob.glob(glob.escape(settings.trace_log_path) + "*"))
+    stages = report(paths)
+    if args.json:
+        print(json.dumps(stages, indent=2))
+        return
+    print(f"{'stage':<28} {'count':>8} {'p50 ms':>10} {'p95 ms':>10} {'p99 ms':>10} {'mean ms':>10}")
+    for name, s in stages.items():
+        print(f"{name:<28} {s['count']:>8,} {s['p50_ms']:>10.1f} {s['p95_ms']:>10.1f} {s['p99_ms']:>10.1f} {s['mean_ms']:>10.1f}")
+
+if __name__ == "__main__":
+    main()
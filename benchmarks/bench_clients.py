@@ -0,0 +1,140 @@
+"""Benchmark: concurrent Bedrock runtime throughput through per-consumer default boto3 clients vs the shared pooled
+client from app.chains.clients.
+
+A local HTTP stand-in plays bedrock-runtime. It answers every invoke_model after --latency-ms and charges
+--connect-latency-ms to each new connection, which stands in for the TLS handshake with a regional endpoint.
+Calls are issued the way LangChain issues them: async callers run the blocking boto3 call in the event loop's
+default executor, half on the chat model and half on the embedding model.
+
+  - "per-consumer": the previous setup. ChatBedrock and BedrockEmbeddings each had their own default client
+    (10 pooled connections, legacy retries) and ran in the stock default executor (min(32, CPUs + 4) threads).
+  - "per-consumer, big executor": the same clients with DEFAULT_EXECUTOR_THREADS threads. This isolates the
+    pool: calls beyond 10 per client open a connection and then discard it.
+  - "shared": one get_client() client with AWS_MAX_POOL_CONNECTIONS keep-alive connections, and
+    DEFAULT_EXECUTOR_THREADS threads.
+
+    python -m benchmarks.bench_clients --concurrency 64 --calls 1000 --latency-ms 200 --connect-latency-ms 30
+"""
+from __future__ import annotations
+import argparse
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable
+import boto3
+from app.chains import clients
+from app.utils.config import settings
+from benchmarks.bench_load import percentiles
+
+MODELS = ("anthropic.claude-3-sonnet-20240229-v1:0", "amazon.titan-embed-text-v1")
+
+class StandIn(ThreadingHTTPServer):
+    """Minimal bedrock-runtime: fixed-latency invoke_model responses over keep-alive HTTP/1.1 connections."""
+
+    daemon_threads = True
+    request_queue_size = 1024  # the default backlog of 5 drops SYNs under a burst of new connections
+
+    def __init__(self, latency: float, connect_latency: float):
+        self.latency, self.connect_latency, self.connections = latency, connect_latency, 0
+        self._count_lock = threading.Lock()
+        super().__init__(("127.0.0.1", 0), _Handler)
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def setup(self) -> None:
+        super().setup()
+        with self.server._count_lock:
+            self.server.connections += 1
+        time.sleep(self.server.connect_latency)
+
+    def do_POST(self) -> None:
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        time.sleep(self.server.latency)
+        body = b'{"completion": "ok"}'
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args: Any) -> None:
+        pass
+
+async def drive(client_for: Callable[[str], Any], concurrency: int, calls: int,
+                executor: ThreadPoolExecutor | None) -> tuple[list[float], float]:
+    """`calls` invoke_model calls from `concurrency` async callers; returns per-call latency seconds and wall time."""
+    loop = asyncio.get_running_loop()
+    if executor is not None:
+        loop.set_default_executor(executor)
+    latencies: list[float] = []
+
+    def call(i: int) -> None:
+        model = MODELS[i % 2]
+        client_for(model).invoke_model(modelId=model, body=b'{"inputText": "credit policy"}')["body"].read()
+
+    async def caller(worker: int) -> None:
+        for i in range(worker, calls, concurrency):
+            started = time.perf_counter()
+            await loop.run_in_executor(None, call, i)
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(caller(w) for w in range(concurrency)))
+    return latencies, time.perf_counter() - started
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=64, help="concurrent callers")
+    parser.add_argument("--calls", type=int, default=1000)
+    parser.add_argument("--latency-ms", type=float, default=200.0, help="stand-in latency per invoke_model")
+    parser.add_argument("--connect-latency-ms", type=float, default=30.0, help="stand-in cost of each new connection")
+    parser.add_argument("--limiter", action="store_true", help="keep the adaptive concurrency limiter on the shared client")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args()
+    logging.getLogger().setLevel(logging.WARNING)
+    logging.getLogger("urllib3.connectionpool").setLevel(logging.ERROR)  # one "pool is full" warning per churned call
+    for key in ("AWS_ACCESS_KEY_ID", "AWS_SECRET_ACCESS_KEY"):
+        os.environ.setdefault(key, "bench")  # requests are signed; the stand-in ignores the signature
+
+    server = StandIn(args.latency_ms / 1000, args.connect_latency_ms / 1000)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    endpoint_url = f"http://127.0.0.1:{server.server_address[1]}"
+    settings.bedrock_endpoint_url, settings.bedrock_limiter_enabled = endpoint_url, args.limiter
+    clients.reset_clients()
+
+    session = boto3.session.Session()
+    per_consumer = {m: session.client("bedrock-runtime", region_name=settings.aws_region, endpoint_url=endpoint_url)
+                    for m in MODELS}
+    shared = clients.get_client("bedrock-runtime")
+    setups = (("per-consumer", per_consumer.__getitem__, None),
+              ("per-consumer, big executor", per_consumer.__getitem__, ThreadPoolExecutor(settings.default_executor_threads)),
+              ("shared", lambda model: shared, ThreadPoolExecutor(settings.default_executor_threads)))
+    report: dict[str, Any] = {"concurrency": args.concurrency, "calls": args.calls, "latency_ms": args.latency_ms,
+                              "connect_latency_ms": args.connect_latency_ms}
+    for label, client_for, executor in setups:
+        connections = server.connections
+        latencies, wall = asyncio.run(drive(client_for, args.concurrency, args.calls, executor))
+        report[label] = {"calls_per_second": len(latencies) / wall, "latency_ms": percentiles(latencies),
+                         "connections_opened": server.connections - connections}
+    server.shutdown()
+    clients.reset_clients()
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    print(f"concurrency={args.concurrency} calls={args.calls} latency={args.latency_ms:.0f}ms "
+          f"connect_latency={args.connect_latency_ms:.0f}ms")
+    for label, _, _ in setups:
+        r, p = report[label], report[label]["latency_ms"]
+        print(f"{label:26}: {r['calls_per_second']:7.1f} calls/s  p50 {p['p50']:7.1f}  p95 {p['p95']:7.1f}  "
+              f"p99 {p['p99']:7.1f} ms  {r['connections_opened']:5} connections opened")
+    print(f"{'speedup':26}: {report['shared']['calls_per_second'] / report['per-consumer']['calls_per_second']:.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+"""Load test: drive /api/v1/decide, /decide/batch or /ingest on a local uvicorn server at a target request rate.
+
+Bedrock is replaced by the scripted tool-calling chat model and latency fake embeddings from benchmarks.fakes, so
+this runs without AWS credentials. Arrivals are open-loop (sent on schedule whether or not earlier requests have
+finished), so queueing shows up as latency. Reports throughput, latency percentiles, status codes, server
+event-loop lag and memory; --json prints the same as JSON for comparison across builds.
+
+    python -m benchmarks.bench_load --endpoint decide --rps 20 --duration 30 --llm-latency-ms 800
+    python -m benchmarks.bench_load --endpoint batch --rps 2 --batch-size 25
+    python -m benchmarks.bench_load --endpoint ingest --rps 5 --embedding-latency-ms 20
+"""
+from __future__ import annotations
+import argparse
+import asyncio
+import json
+import logging
+import resource
+import tempfile
+import threading
+import time
+from functools import partial
+from typing import Any, Callable
+from unittest.mock import patch
+import httpx
+import numpy as np
+import uvicorn
+from app import main as app_main
+from app.agents.decisioning_agent import DecisioningAgent
+from app.api import routes
+from app.chains.bedrock_llm import BedrockHealthMonitor
+from app.rag.cache import CachedEmbeddings, CachingRetriever
+from app.rag.ingestion import RagIngestionService
+from app.rag.store import PolicyStore
+from app.utils.config import settings
+from benchmarks.fakes import POLICY_DOCUMENTS, LatencyFakeEmbeddings, ScriptedChatModel
+
+ENDPOINTS = ("decide", "batch", "ingest")
+
+def _applicant(i: int) -> dict[str, Any]:
+    # Unique applicants in the rules engine's gray zone, so every decision reaches the agent and misses the cache.
+    return {"applicant_id": f"LOAD{i}", "credit_score": 690 + i % 40, "annual_income": 85000.0 + i,
+            "loan_amount": 25000.0, "loan_purpose": "debt consolidation"}
+
+def payload(endpoint: str, i: int, batch_size: int) -> tuple[str, dict[str, Any]]:
+    if endpoint == "decide":
+        return "/api/v1/decide", {"session_id": f"load-{i}", "decision_type": "loan", "applicant": _applicant(i),
+                                  "query": "Should we approve this loan?"}
+    if endpoint == "batch":
+        return "/api/v1/decide/batch", {"requests": [
+            {"session_id": f"load-{i}-{j}", "decision_type": "loan", "applicant": _applicant(i * batch_size + j),
+             "query": "Should we approve this loan?"} for j in range(batch_size)]}
+    return "/api/v1/ingest", {"documents": [
+        {"doc_id": f"LOAD-DOC-{i}", "title": f"Load policy {i}",
+         "content": " ".join(f"Clause {i}.{k}: applicants in band {k % 7} require DTI below {30 + k % 20}%."
+                             for k in range(60))}]}
+
+class LoopLagMonitor:
+    """Samples how late a periodic sleep on the server's event loop wakes up; lag means blocked request handling."""
+
+    def __init__(self, interval: float = 0.01):
+        self.interval, self.samples = interval, []
+        self._stopped = False
+
+    async def run(self) -> None:
+        while not self._stopped:
+            started = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self.samples.append(max(0.0, time.perf_counter() - started - self.interval))
+
+    def stop(self) -> None:
+        self._stopped = True
+
+def rss_mib() -> float:
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * resource.getpagesize() / 2 ** 20
+
+async def drive(base_url: str, make: Callable[[int], tuple[str, dict]], rps: float, duration: float,
+                timeout: float) -> tuple[list[tuple[float, int]], float, list[str]]:
+    """Send rps x duration requests on schedule; returns (latency seconds, status) per request, wall time, job ids."""
+    job_ids: list[str] = []
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+    async with httpx.AsyncClient(base_url=base_url, timeout=timeout, limits=limits) as client:
+        async def one(i: int) -> tuple[float, int]:
+            path, body = make(i)
+            started = time.perf_counter()
+            try:
+                response = await client.post(path, json=body)
+                await response.aread()
+            except httpx.HTTPError:
+                return time.perf_counter() - started, 0
+            if response.status_code == 200 and "job_id" in response.text:
+                job_ids.append(response.json()["job_id"])
+            return time.perf_counter() - started, response.status_code
+
+        started, tasks = time.perf_counter(), []
+        for i in range(max(1, int(rps * duration))):
+            delay = started + i / rps - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            tasks.append(asyncio.create_task(one(i)))
+        results = await asyncio.gather(*tasks)
+        return results, time.perf_counter() - started, job_ids
+
+async def drain_ingest(base_url: str, job_ids: list[str], timeout: float) -> tuple[int, float]:
+    """Wait for queued ingestion jobs; returns (jobs completed, seconds waited)."""
+    started, done = time.perf_counter(), 0
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        while time.perf_counter() - started < timeout:
+            statuses = [(await client.get(f"/api/v1/ingest/{job_id}")).json()["status"] for job_id in job_ids]
+            done = sum(s in ("succeeded", "failed") for s in statuses)
+            if done == len(job_ids):
+                break
+            await asyncio.sleep(0.25)
+    return done, time.perf_counter() - started
+
+def percentiles(values: list[float]) -> dict[str, float]:
+    if not values:
+        return {"p50": 0.0, "p95": 0.0, "p99": 0.0, "max": 0.0}
+    p50, p95, p99 = np.percentile(values, [50, 95, 99])
+    return {"p50": p50 * 1000, "p95": p95 * 1000, "p99": p99 * 1000, "max": max(values) * 1000}
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--endpoint", choices=ENDPOINTS, default="decide")
+    parser.add_argument("--rps", type=float, default=10.0, help="target request rate")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds of load")
+    parser.add_argument("--batch-size", type=int, default=10, help="applications per /decide/batch request")
+    parser.add_argument("--llm-latency-ms", type=float, default=500.0, help="per-turn latency of the fake chat model")
+    parser.add_argument("--embedding-latency-ms", type=float, default=20.0, help="per-text latency of the fake embeddings")
+    parser.add_argument("--timeout", type=float, default=120.0, help="client timeout per request, seconds")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args()
+    logging.getLogger().setLevel(logging.WARNING)  # per-request INFO lines would dominate the measured CPU
+
+    with tempfile.TemporaryDirectory() as tmp:
+        settings.faiss_index_path, settings.ingest_jobs_db = f"{tmp}/index", f"{tmp}/jobs.sqlite3"
+        settings.retrieval_cache_dir, settings.trace_log_path = "", ""
+        embeddings = CachedEmbeddings(LatencyFakeEmbeddings(latency_seconds=args.embedding_latency_ms / 1000))
+        store = PolicyStore(settings.faiss_index_path, embeddings)
+        store.add_texts([d["content"] for d in POLICY_DOCUMENTS], [{"title": d["title"]} for d in POLICY_DOCUMENTS])
+        llm = ScriptedChatModel(latency_seconds=args.llm_latency_ms / 1000)
+        routes._ingestor = RagIngestionService(store)
+        routes._agent = DecisioningAgent(llm=llm, retriever=CachingRetriever(store.as_retriever(search_kwargs={"k": 4})))
+
+        config = uvicorn.Config(app_main.app, host="127.0.0.1", port=0, log_level="warning", lifespan="on")
+        server, loop = uvicorn.Server(config), asyncio.new_event_loop()
+        with patch.object(app_main, "BedrockHealthMonitor", partial(BedrockHealthMonitor, probe=lambda: None)):
+            thread = threading.Thread(target=loop.run_until_complete, args=(server.serve(),), daemon=True)
+            thread.start()
+            while not server.started:
+                time.sleep(0.01)
+        base_url = f"http://127.0.0.1:{server.servers[0].sockets[0].getsockname()[1]}"
+        monitor = LoopLagMonitor()
+        asyncio.run_coroutine_threadsafe(monitor.run(), loop)
+
+        rss_start = rss_mib()
+        make = partial(payload, args.endpoint, batch_size=args.batch_size)
+        results, wall, job_ids = asyncio.run(drive(base_url, make, args.rps, args.duration, args.timeout))
+        drained = asyncio.run(drain_ingest(base_url, job_ids, args.timeout)) if job_ids else None
+        monitor.stop()
+        rss_end = rss_mib()
+        server.should_exit = True
+        thread.join(timeout=10)
+
+    latencies = [latency for latency, status in results if status == 200]
+    statuses: dict[str, int] = {}
+    for _, status in results:
+        statuses[str(status)] = statuses.get(str(status), 0) + 1
+    items = args.batch_size if args.endpoint == "batch" else 1
+    report = {"endpoint": args.endpoint, "target_rps": args.rps, "duration_seconds": wall, "requests": len(results),
+              "statuses": statuses, "throughput_rps": len(latencies) / wall,
+              "decisions_per_second": len(latencies) * items / wall if args.endpoint != "ingest" else None,
+              "llm_turns": llm.calls, "latency_ms": percentiles(latencies),
+              "event_loop_lag_ms": percentiles(monitor.samples),
+              "rss_mib": {"start": rss_start, "end": rss_end,
+                          "peak": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024}}
+    if drained is not None:
+        report["ingest_jobs"] = {"submitted": len(job_ids), "completed": drained[0], "drain_seconds": drained[1]}
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    print(f"endpoint={args.endpoint} target={args.rps:g} rps duration={args.duration:g}s "
+          f"llm_latency={args.llm_latency_ms:.0f}ms embedding_latency={args.embedding_latency_ms:.0f}ms")
+    print(f"requests: {len(results)}  statuses: {statuses}  throughput: {report['throughput_rps']:.1f} req/s"
+          + (f"  ({report['decisions_per_second']:.1f} decisions/s, {llm.calls} LLM turns)"
+             if report["decisions_per_second"] is not None else ""))
+    for label, key in (("latency", "latency_ms"), ("event-loop lag", "event_loop_lag_ms")):
+        p = report[key]
+        print(f"{label + ' ms':18}: p50 {p['p50']:8.1f}  p95 {p['p95']:8.1f}  p99 {p['p99']:8.1f}  max {p['max']:8.1f}")
+    rss = report["rss_mib"]
+    print(f"{'rss MiB':18}: start {rss['start']:8.1f}  end {rss['end']:8.1f}  peak {rss['peak']:8.1f}")
+    if drained is not None:
+        jobs = report["ingest_jobs"]
+        print(f"ingest jobs       : {jobs['completed']}/{jobs['submitted']} completed, drained in {jobs['drain_seconds']:.1f}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""Benchmark: agent iterations and latency per decision with and without policy prefetch.
+
+Uses a scripted tool-calling chat model with a fixed per-turn latency in place of Bedrock, so the numbers show
+the turn saved by prefetching, not model quality.
+
+    python -m benchmarks.bench_prefetch --decisions 20 --llm-latency-ms 500
+"""
+from __future__ import annotations
+import argparse
+import asyncio
+import tempfile
+import time
+from unittest.mock import patch
+from app.agents.decisioning_agent import DecisioningAgent
+from app.models.schemas import DecisionRequest
+from app.rag.store import PolicyStore
+from benchmarks.fakes import POLICY_DOCUMENTS, LatencyFakeEmbeddings, ScriptedChatModel
+
+def requests(count: int) -> list[DecisionRequest]:
+    return [DecisionRequest(session_id=f"s{i}", decision_type="loan", query="Should we approve this loan?",
+                            applicant={"applicant_id": f"A{i}", "credit_score": 690 + i % 40, "annual_income": 85000.0,
+                                       "loan_amount": 25000.0, "loan_purpose": "debt consolidation"})
+            for i in range(count)]
+
+async def run(agent: DecisioningAgent, llm: ScriptedChatModel, batch: list[DecisionRequest]) -> tuple[float, float]:
+    llm.calls = 0
+    started = time.perf_counter()
+    for request in batch:
+        await agent.run(request)
+    return llm.calls / len(batch), (time.perf_counter() - started) / len(batch) * 1000
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--decisions", type=int, default=20)
+    parser.add_argument("--llm-latency-ms", type=float, default=500.0)
+    parser.add_argument("--embedding-latency-ms", type=float, default=20.0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = PolicyStore(tmp, LatencyFakeEmbeddings(latency_seconds=args.embedding_latency_ms / 1000))
+        store.add_texts([d["content"] for d in POLICY_DOCUMENTS], [{"title": d["title"]} for d in POLICY_DOCUMENTS])
+        llm = ScriptedChatModel(latency_seconds=args.llm_latency_ms / 1000)
+        agent = DecisioningAgent(llm=llm, retriever=store.as_retriever(search_kwargs={"k": 4}))
+        batch = requests(args.decisions)
+        print(f"decisions={args.decisions} llm_latency={args.llm_latency_ms:.0f}ms "
+              f"embedding_latency={args.embedding_latency_ms:.0f}ms")
+        for label, prefetch in (("tool-call retrieval", False), ("prefetched policies", True)):
+            with patch("app.agents.decisioning_agent.settings.agent_prefetch_policies", prefetch):
+                iterations, ms = asyncio.run(run(agent, llm, batch))
+            print(f"{label:20}: {iterations:.2f} LLM turns/decision  {ms:8.1f} ms/decision")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""Benchmark: stress-test throughput and peak memory on a synthetic CSV portfolio, one worker vs a process pool.
+
+    python -m benchmarks.bench_stress --rows 10000000 --workers 8
+"""
+from __future__ import annotations
+import argparse
+import os
+import resource
+import tempfile
+import time
+from pathlib import Path
+import numpy as np
+from app.agents.stress import run_stress_test
+
+def write_portfolio(path: Path, rows: int, chunk: int = 1_000_000) -> None:
+    rng = np.random.default_rng(0)
+    with open(path, "w") as f:
+        f.write("applicant_id,credit_score,annual_income,loan_amount,existing_debt\n")
+        for start in range(0, rows, chunk):
+            n = min(chunk, rows - start)
+            block = np.column_stack([np.arange(start, start + n), rng.integers(300, 851, n), rng.lognormal(11, 0.6, n),
+                                     rng.lognormal(10, 1.0, n), rng.uniform(0, 40_000, n)])
+            np.savetxt(f, block, fmt=["%d", "%d", "%.2f", "%.2f", "%.2f"], delimiter=",")
+
+def peak_rss_mb() -> tuple[float, float]:
+    return (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+            resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--chunk-rows", type=int, default=250_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "portfolio.csv"
+        started = time.perf_counter()
+        write_portfolio(path, args.rows)
+        print(f"wrote {args.rows:,} rows ({path.stat().st_size / 2**20:,.0f} MiB) in {time.perf_counter() - started:.1f}s")
+        for workers in (1, args.workers):
+            result = run_stress_test(path, chunk_rows=args.chunk_rows, workers=workers)
+            parent, child = peak_rss_mb()
+            print(f"workers={workers:<3} {result['duration_seconds']:7.2f}s  "
+                  f"{result['rows'] / result['duration_seconds']:12,.0f} rows/sec  "
+                  f"peak RSS parent {parent:,.0f} MiB, largest worker {child:,.0f} MiB")
+        print("severe downgrades:", f"{result['scenarios']['severe']['downgraded']:,}")
+
+if __name__ == "__main__":
+    main()
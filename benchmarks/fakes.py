@@ -0,0 +1,82 @@
+"""Local stand-ins for AWS Bedrock used by the benchmark scripts — no AWS credentials required."""
+from __future__ import annotations
+import hashlib
+import time
+from typing import Any
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+FINAL_ANSWER = ('{"decision":"REFER","confidence":0.7,"reasoning":"Within policy limits but needs review.",'
+                '"risk_factors":["moderate DTI"],"retrieved_policies":["Loan Approval Matrix"]}')
+
+# A small policy corpus for benchmark stores; the app itself seeds from data/policy_docs.
+POLICY_DOCUMENTS = [
+    {"title": "Credit Policy — Standard Underwriting Guidelines",
+     "content": "Applicants with FICO 720+ and DTI below 36% qualify for Tier-1 rates. Scores 680-719 with DTI below 43% qualify for Tier-2. Scores below 620 require manual review."},
+    {"title": "Fraud Prevention Policy v2.3",
+     "content": "Applications requesting loan amounts exceeding 5× annual income must be flagged. Velocity checks must be performed for multiple applications within 30 days."},
+    {"title": "KYC / AML Compliance Requirements",
+     "content": "All applicants must pass CIP checks. PEP screening and OFAC watchlist verification are mandatory. EDD is triggered for high-risk jurisdictions or transactions above $10,000."},
+    {"title": "Loan Approval Matrix — Consumer Lending",
+     "content": "Auto-approve: credit score ≥750, DTI <36%, verified income, no adverse history. Auto-decline: credit score <580, DTI >55%, recent bankruptcy. Otherwise REFER for review."},
+]
+
+class LatencyFakeEmbeddings(Embeddings):
+    """Deterministic hash-seeded vectors with a per-text sleep, mimicking Titan's one-call-per-text latency."""
+
+    def __init__(self, size: int = 1536, latency_seconds: float = 0.02):
+        self.size, self.latency_seconds = size, latency_seconds
+        self.calls = 0
+
+    def _vector(self, text: str) -> list[float]:
+        self.calls += 1
+        if self.latency_seconds:
+            time.sleep(self.latency_seconds)
+        seed = int.from_bytes(hashlib.sha256(text.encode()).digest()[:8], "little")
+        return np.random.default_rng(seed).standard_normal(self.size).astype(np.float32).tolist()
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        return [self._vector(t) for t in texts]
+
+    def embed_query(self, text: str) -> list[float]:
+        return self._vector(text)
+
+class ScriptedChatModel(BaseChatModel):
+    """Tool-calling chat model stand-in with a fixed per-turn latency.
+
+    Like the real agent, it calls policy_retriever first unless policies are already in its context, then answers.
+    `calls` counts LLM turns (agent iterations). Async agent runs execute the blocking call in the default thread
+    pool, exactly as LangChain runs ChatBedrock's synchronous boto3 client.
+    """
+
+    latency_seconds: float = 0.5
+    calls: int = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return "scripted-fake"
+
+    def bind_tools(self, tools: Any, **kwargs: Any) -> ScriptedChatModel:
+        return self
+
+    def _generate(self, messages: list[BaseMessage], stop: list[str] | None = None, run_manager: Any = None,
+                  **kwargs: Any) -> ChatResult:
+        self.calls += 1
+        if self.latency_seconds:
+            time.sleep(self.latency_seconds)
+        has_policies = any(isinstance(m, ToolMessage) or "Relevant policies:" in str(m.content) for m in messages)
+        # Token counts approximated at 4 characters per token, reported like ChatBedrock's usage_metadata.
+        input_tokens = sum(len(str(m.content)) for m in messages) // 4
+        if has_policies:
+            message = AIMessage(content=FINAL_ANSWER, usage_metadata={
+                "input_tokens": input_tokens, "output_tokens": len(FINAL_ANSWER) // 4,
+                "total_tokens": input_tokens + len(FINAL_ANSWER) // 4})
+        else:
+            message = AIMessage(content="", tool_calls=[{"name": "policy_retriever", "id": f"call_{self.calls}",
+                                                         "args": {"query": "loan approval DTI credit score"}}],
+                                usage_metadata={"input_tokens": input_tokens, "output_tokens": 20,
+                                                "total_tokens": input_tokens + 20})
+        return ChatResult(generations=[ChatGeneration(message=message)])
@@ -1,4 +1,7 @@
 """FastAPI route tests — agent and ingestor are mocked, no AWS calls."""
+import asyncio
+import json
+import time
 import pytest
 from unittest.mock import AsyncMock, MagicMock, patch
 from fastapi.testclient import TestClient
@@ -18,6 +21,104 @@ class TestHealth:
     def test_ok(self, client):
         assert client.get("/health").json()["status"] == "ok"
 
+    def test_bare_path_served_from_cached_monitor_status(self, client):
+        app.state.bedrock_monitor = MagicMock(status=MagicMock(connected=True, checked_at=None, latency_ms=12.0))
+        r = client.get("/health", follow_redirects=False)
+        assert r.status_code == 200 and r.json()["bedrock_connected"] is True and r.json()["bedrock_latency_ms"] == 12.0
+
+    def test_not_ready_until_warm(self, client):
+        app.state.ready = False
+        assert client.get("/health/ready").status_code == 503
+        app.state.ready = True
+        assert client.get("/health/ready").json() == {"ready": True}
+
+    def test_serves_cached_bedrock_status(self, client):
+        from app.chains.bedrock_llm import BedrockHealthMonitor
+        probe = MagicMock()
+        app.state.bedrock_monitor = BedrockHealthMonitor(probe=probe)
+        assert client.get("/health/").json()["bedrock_connected"] is False
+        asyncio.run(app.state.bedrock_monitor.check())
+        for _ in range(3):
+            data = client.get("/health/").json()
+        assert data["bedrock_connected"] is True and data["bedrock_latency_ms"] is not None
+        probe.assert_called_once()
+
+    def test_monitor_records_probe_failure(self):
+        from app.chains.bedrock_llm import BedrockHealthMonitor
+        status = asyncio.run(BedrockHealthMonitor(probe=MagicMock(side_effect=RuntimeError("denied"))).check())
+        assert status.connected is False and status.error == "denied" and status.checked_at is not None
+
+class TestWarmUp:
+    def test_builds_components_and_probes_index(self):
+        from types import SimpleNamespace
+        from app.main import warm_up
+        agent, ingestor, state = MagicMock(), MagicMock(), SimpleNamespace()
+        with patch("app.main.get_agent", return_value=agent), patch("app.main.get_ingestor", return_value=ingestor):
+            warm_up(state)
+        assert state.ready and state.agent is agent and state.ingestor is ingestor
+        agent.retriever.invoke.assert_called_once()
+
+    def test_transient_failure_retried(self):
+        from types import SimpleNamespace
+        from app.main import warm_up
+        ingestor, state = MagicMock(), SimpleNamespace()
+        with patch("app.main.get_ingestor", side_effect=[RuntimeError("no index"), ingestor]), \
+                patch("app.main.get_agent", return_value=MagicMock()), patch("app.main.time.sleep") as sleep:
+            warm_up(state)
+        assert state.ready and not state.degraded and state.ingestor is ingestor
+        sleep.assert_called_once()
+
+    def test_persistent_failure_stays_unready_and_fails_liveness(self, client):
+        from types import SimpleNamespace
+        from app.main import warm_up
+        state = SimpleNamespace()
+        with patch("app.main.get_ingestor", side_effect=RuntimeError("no index")), patch("app.main.time.sleep"):
+            warm_up(state)
+        assert not state.ready and state.degraded and "no index" in state.warmup_error
+        app.state.ready, app.state.degraded, app.state.warmup_error = False, True, "no index"
+        try:
+            r = client.get("/health/ready")
+            assert r.status_code == 503 and r.json() == {"ready": False, "warmup_error": "no index"}
+            r = client.get("/health")
+            assert r.status_code == 503 and r.json()["status"] == "warmup_failed"
+        finally:
+            app.state.ready, app.state.degraded = True, False
+
+    def test_degraded_ready_is_opt_in(self, client):
+        from types import SimpleNamespace
+        from app.main import warm_up
+        state = SimpleNamespace()
+        with patch("app.main.get_ingestor", side_effect=RuntimeError("no index")), patch("app.main.time.sleep"), \
+                patch("app.main.settings.warmup_degraded_ready", True):
+            warm_up(state)
+        assert state.ready and state.degraded
+        app.state.ready, app.state.degraded, app.state.warmup_error = True, True, "no index"
+        try:
+            assert client.get("/health/ready").json() == {"ready": True, "degraded": True, "warmup_error": "no index"}
+            assert client.get("/health").status_code == 200
+        finally:
+            app.state.degraded = False
+
+    def test_lazy_build_is_single(self):
+        from concurrent.futures import ThreadPoolExecutor
+        from app.api import routes
+        built = []
+        def slow_agent():
+            time.sleep(0.05)
+            built.append(1)
+            return MagicMock()
+        with patch.object(routes, "_agent", None), patch("app.agents.decisioning_agent.DecisioningAgent", slow_agent):
+            with ThreadPoolExecutor(4) as pool:
+                agents = list(pool.map(lambda _: routes.get_agent(), range(4)))
+        assert len(built) == 1 and all(a is agents[0] for a in agents)
+
+    def test_lifespan_runs_warm_up(self):
+        with patch("app.main.warm_up", side_effect=lambda state: setattr(state, "ready", True)) as warm, \
+                patch("app.main.settings.warmup_in_background", False), \
+                patch("app.main.BedrockHealthMonitor.start"), patch("app.main.get_ingest_queue"), TestClient(app) as c:
+            assert c.get("/health/ready").status_code == 200
+        warm.assert_called_once()
+
 class TestDecide:
     def test_success(self, client, mock_response):
         mock_agent = MagicMock(); mock_agent.run = AsyncMock(return_value=mock_response); mock_agent.tools = []
@@ -37,11 +138,163 @@ class TestDecide:
                 "applicant": {"applicant_id": "A2"}, "query": "fail"})
         assert r.status_code == 500
 
+class TestDecideStream:
+    def _agent(self, events):
+        from app.agents.decisioning_agent import DecisioningAgent
+        agent = DecisioningAgent.__new__(DecisioningAgent)
+        agent.retriever = MagicMock(); agent.retriever.invoke.return_value = []
+
+        async def astream_events(payload, config=None, version="v2"):
+            for event in events:
+                yield event
+        agent.executor = MagicMock(); agent.executor.astream_events = astream_events
+        return agent
+
+    def _events(self, client, agent, **applicant):
+        payload = {"session_id": "st1", "applicant": {"applicant_id": "A1", **applicant}, "query": "Approve?"}
+        with patch("app.api.routes.get_agent", return_value=agent):
+            r = client.post("/api/v1/decide/stream", json=payload)
+        assert r.status_code == 200 and r.headers["content-type"].startswith("text/event-stream")
+        return [(block.split("\n")[0].removeprefix("event: "), json.loads(block.split("\n")[1].removeprefix("data: ")))
+                for block in r.text.strip().split("\n\n")]
+
+    def test_streams_tool_calls_tokens_and_decision(self, client):
+        from langchain_core.messages import AIMessageChunk
+        answer = '{"decision":"REFER","confidence":0.6,"reasoning":"gray"}'
+        events = [{"event": "on_chain_start", "name": "AgentExecutor", "parent_ids": [], "data": {}},
+                  {"event": "on_tool_start", "name": "policy_retriever", "parent_ids": ["r"], "data": {"input": {"query": "DTI"}}},
+                  {"event": "on_tool_end", "name": "policy_retriever", "parent_ids": ["r"],
+                   "data": {"output": "[1] Credit Policy:\nMax DTI 43%\n\n[2] KYC Rules:\nOFAC"}},
+                  {"event": "on_chat_model_stream", "name": "ChatBedrock", "parent_ids": ["r"],
+                   "data": {"chunk": AIMessageChunk(content=[{"type": "text", "text": answer[:20]}])}},
+                  {"event": "on_chat_model_stream", "name": "ChatBedrock", "parent_ids": ["r"],
+                   "data": {"chunk": AIMessageChunk(content=answer[20:])}},
+                  {"event": "on_chain_end", "name": "AgentExecutor", "parent_ids": [], "data": {"output": {"output": answer}}}]
+        received = self._events(client, self._agent(events), credit_score=700)
+        assert [e for e, _ in received] == ["policies", "tool_call", "policies", "token", "token", "decision"]
+        assert received[1][1] == {"tool": "policy_retriever", "input": {"query": "DTI"}}
+        assert received[2][1] == {"source": "policy_retriever", "titles": ["Credit Policy", "KYC Rules"]}
+        assert "".join(d["text"] for e, d in received if e == "token") == answer
+        assert received[-1][1]["decision"] == "REFER" and received[-1][1]["session_id"] == "st1"
+
+    def test_fast_path_yields_only_decision(self, client):
+        received = self._events(client, self._agent([]), credit_score=560, annual_income=80000.0, loan_amount=20000.0)
+        assert [e for e, _ in received] == ["decision"] and received[0][1]["decision_path"] == "rules"
+
+    def test_failure_emits_error_event(self, client):
+        agent = self._agent([])
+        agent.executor.astream_events = MagicMock(side_effect=RuntimeError("throttled"))
+        received = self._events(client, agent, credit_score=700)
+        assert received[-1] == ("error", {"detail": "throttled"})
+
+class TestDecideBatch:
+    def _agent(self, ainvoke):
+        from app.agents.decisioning_agent import DecisioningAgent
+        agent = DecisioningAgent.__new__(DecisioningAgent)
+        agent.executor = MagicMock(); agent.executor.ainvoke = ainvoke
+        agent.retriever = MagicMock(); agent.retriever.invoke.return_value = []
+        return agent
+
+    def _payload(self, *scores):
+        return {"requests": [{"session_id": f"b{i}", "applicant": {"applicant_id": f"A{i}", "credit_score": s,
+                 "annual_income": 80000.0, "loan_amount": 20000.0}, "query": "Approve?"} for i, s in enumerate(scores)],
+                "concurrency": 2}
+
+    def test_streams_ndjson_with_per_item_errors(self, client):
+        ainvoke = AsyncMock(side_effect=[{"output": '{"decision":"REFER","confidence":0.6,"reasoning":"gray"}'},
+                                         RuntimeError("throttled")])
+        with patch("app.api.routes.get_agent", return_value=self._agent(ainvoke)):
+            r = client.post("/api/v1/decide/batch", json=self._payload(560, 700, 700))
+        assert r.status_code == 200 and r.headers["content-type"].startswith("application/x-ndjson")
+        items = {i["index"]: i for i in map(json.loads, r.text.splitlines())}
+        assert items[0]["result"]["decision_path"] == "rules"
+        assert sorted(bool(items[i].get("error")) for i in (1, 2)) == [False, True]
+        assert ainvoke.await_count == 2
+
+    def test_per_item_trace_honoured(self, client, tmp_path):
+        from app.utils import tracing
+        ainvoke = AsyncMock(return_value={"output": '{"decision":"REFER","confidence":0.6,"reasoning":"gray"}'})
+        payload = self._payload(560, 700)
+        payload["requests"][1]["trace"] = True
+        log = tmp_path / "decisions.jsonl"
+        with patch("app.api.routes.get_agent", return_value=self._agent(ainvoke)), \
+                patch("app.utils.tracing.settings.trace_log_path", str(log)), patch.object(tracing, "_profile_logger", None):
+            r = client.post("/api/v1/decide/batch", json=payload)
+        items = {i["index"]: i["result"] for i in map(json.loads, r.text.splitlines())}
+        assert items[0].get("trace") is None
+        assert [s["name"] for s in items[1]["trace"]["children"]] == ["rules", "prefetch", "agent", "parse"]
+        assert '"session_id": "b1"' in log.read_text()
+
+    def test_oversized_batch_413(self, client):
+        with patch("app.api.routes.settings.batch_max_size", 1), patch("app.api.routes.get_agent", return_value=MagicMock()):
+            assert client.post("/api/v1/decide/batch", json=self._payload(700, 700)).status_code == 413
+
+    def test_empty_batch_422(self, client):
+        assert client.post("/api/v1/decide/batch", json={"requests": []}).status_code == 422
+
 class TestIngest:
     def test_queued(self, client):
-        with patch("app.api.routes.get_ingestor", return_value=MagicMock()):
+        queue = MagicMock(); queue.submit.return_value = "job-1"
+        with patch("app.api.routes.get_ingest_queue", return_value=queue):
+            r = client.post("/api/v1/ingest", json={"documents": [{"doc_id": "D1", "title": "T", "content": "..."}]})
+        assert r.status_code == 200 and r.json()["document_count"] == 1 and r.json()["job_id"] == "job-1"
+
+    def test_queue_full_429(self, client):
+        from app.rag.jobs import QueueFullError
+        queue = MagicMock(); queue.submit.side_effect = QueueFullError("full")
+        with patch("app.api.routes.get_ingest_queue", return_value=queue):
             r = client.post("/api/v1/ingest", json={"documents": [{"doc_id": "D1", "title": "T", "content": "..."}]})
-        assert r.status_code == 200 and r.json()["document_count"] == 1
+        assert r.status_code == 429 and r.headers["retry-after"]
+
+    def test_status(self, client):
+        queue = MagicMock(); queue.get.return_value = {"id": "job-1", "status": "running", "document_count": 2,
+            "chunks_total": 10, "chunks_done": 4, "created_at": 1.7e9, "started_at": 1.7e9 + 1, "finished_at": None,
+            "duration_seconds": 3.0, "error": None}
+        with patch("app.api.routes.get_ingest_queue", return_value=queue):
+            data = client.get("/api/v1/ingest/job-1").json()
+        assert data["status"] == "running" and data["chunks_done"] == 4 and data["started_at"].startswith("2023")
+
+    def test_queue_calls_run_off_the_event_loop(self, client):
+        def off_loop(*args):
+            with pytest.raises(RuntimeError):
+                asyncio.get_running_loop()
+            return "job-1" if args and isinstance(args[0], list) else None
+        queue = MagicMock(); queue.submit.side_effect = queue.get.side_effect = off_loop
+        with patch("app.api.routes.get_ingest_queue", return_value=queue):
+            assert client.post("/api/v1/ingest", json={"documents": [{"doc_id": "D1", "title": "T", "content": "."}]}).status_code == 200
+            assert client.get("/api/v1/ingest/job-1").status_code == 404
+        assert queue.submit.call_count == queue.get.call_count == 1
+
+    def test_unknown_job_404(self, client):
+        queue = MagicMock(); queue.get.return_value = None
+        with patch("app.api.routes.get_ingest_queue", return_value=queue):
+            assert client.get("/api/v1/ingest/nope").status_code == 404
+
+class TestStressTest:
+    def test_runs_portfolio_from_configured_dir(self, client, tmp_path):
+        (tmp_path / "book.csv").write_text("credit_score,annual_income,loan_amount\n760,100000,20000\n700,50000,19000\n")
+        with patch("app.api.routes.settings.stress_portfolio_dir", str(tmp_path)):
+            r = client.post("/api/v1/stress-test", json={"path": "book.csv", "workers": 1})
+        body = r.json()
+        assert r.status_code == 200 and body["rows"] == 2 and body["base_distribution"] == [1, 1, 0, 0]
+        assert body["scenarios"]["severe"]["migration"][1] == [0, 0, 1, 0] and body["scenarios"]["stress"]["downgraded"] == 0
+
+    def test_rejects_paths_outside_dir(self, client, tmp_path):
+        with patch("app.api.routes.settings.stress_portfolio_dir", str(tmp_path)):
+            assert client.post("/api/v1/stress-test", json={"path": "../etc/passwd"}).status_code == 400
+            assert client.post("/api/v1/stress-test", json={"path": "missing.csv"}).status_code == 404
+
+    def test_workers_clamped_and_one_run_at_a_time(self, client, tmp_path):
+        from app.api import routes
+        (tmp_path / "book.csv").write_text("credit_score,annual_income,loan_amount\n760,100000,20000\n")
+        result = {"rows": 1, "tiers": [], "base_distribution": [], "scenarios": {}, "duration_seconds": 0.0}
+        with patch("app.api.routes.settings.stress_portfolio_dir", str(tmp_path)), \
+                patch("app.api.routes.run_stress_test", return_value=result) as run:
+            assert client.post("/api/v1/stress-test", json={"path": "book.csv", "workers": 64}).status_code == 200
+            assert run.call_args.args[3] == routes.settings.stress_max_workers
+            with routes._stress_lock:
+                r = client.post("/api/v1/stress-test", json={"path": "book.csv"})
+            assert r.status_code == 429 and "retry-after" in r.headers and run.call_count == 1
 
 class TestToolsList:
     def test_lists_tools(self, client):
@@ -50,3 +303,8 @@ class TestToolsList:
         with patch("app.api.routes.get_agent", return_value=mock_agent):
             r = client.get("/api/v1/agent/tools")
         assert "policy_retriever" in r.json()["tools"]
+
+class TestCacheStats:
+    def test_reports_both_tiers(self, client):
+        data = client.get("/api/v1/cache/stats").json()
+        assert {"hits", "misses", "size"} <= data["embeddings"].keys() and "hit_rate" in data["results"]
@@ -0,0 +1,53 @@
+"""Unit tests for the retrieval caches — no AWS credentials required."""
+from unittest.mock import MagicMock, patch
+from langchain_core.documents import Document
+from app.rag.cache import CachedEmbeddings, CachingRetriever, TTLCache, invalidate_results
+
+def _retriever(docs):
+    r = MagicMock(); r.search_kwargs = {"k": 4}; r.invoke.return_value = docs
+    return r
+
+class TestTTLCache:
+    def test_lru_eviction(self):
+        c = TTLCache("t", maxsize=2, ttl_seconds=60)
+        c.set("a", 1); c.set("b", 2); c.get("a"); c.set("c", 3)
+        assert c.get("b") is None and c.get("a") == 1 and c.get("c") == 3
+
+    def test_ttl_expiry(self):
+        c = TTLCache("t", maxsize=2, ttl_seconds=60)
+        c.set("a", 1)
+        with patch("app.rag.cache.time.time", return_value=10**12):
+            assert c.get("a") is None
+        assert c.stats()["misses"] == 1 and c.stats()["size"] == 0
+
+    def test_persistence_round_trip(self, tmp_path):
+        c = TTLCache("t", maxsize=4, ttl_seconds=60)
+        c.set(("model", "q"), [0.1, 0.2])
+        c.dump(tmp_path / "t.json")
+        restored = TTLCache("t", maxsize=4, ttl_seconds=60)
+        assert restored.load(tmp_path / "t.json") == 1 and restored.get(("model", "q")) == [0.1, 0.2]
+
+class TestCachedEmbeddings:
+    def test_query_embedding_memoized_by_normalized_text(self):
+        inner = MagicMock(); inner.embed_query.return_value = [1.0, 2.0]
+        e = CachedEmbeddings(inner, TTLCache("e", 8, 60), model_id="m")
+        assert e.embed_query("Credit policy") == e.embed_query("  credit   POLICY ") == [1.0, 2.0]
+        inner.embed_query.assert_called_once()
+
+class TestCachingRetriever:
+    def test_hit_and_miss_counters(self):
+        cache = TTLCache("r", 8, 60)
+        inner = _retriever([Document(page_content="Tier-1 rates", metadata={"title": "Credit Policy"})])
+        r = CachingRetriever(inner, cache)
+        first, second = r.invoke("credit policy"), r.invoke("Credit Policy")
+        assert first[0].page_content == second[0].page_content and second[0].metadata["title"] == "Credit Policy"
+        assert inner.invoke.call_count == 1 and cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+    def test_invalidated_on_ingest(self):
+        inner = _retriever([])
+        r = CachingRetriever(inner)
+        r.invoke("kyc requirements"); invalidate_results(); r.invoke("kyc requirements")
+        assert inner.invoke.call_count == 2
+
+    def test_delegates_attributes(self):
+        assert CachingRetriever(_retriever([])).search_kwargs == {"k": 4}
@@ -0,0 +1,33 @@
+"""Tests for the shared AWS client factory — no AWS credentials required."""
+import pytest
+from unittest.mock import patch
+from app.chains import clients
+from app.chains.limiter import bedrock_limiter
+
+@pytest.fixture(autouse=True)
+def fresh_clients():
+    clients.reset_clients()
+    yield
+    clients.reset_clients()
+
+class TestSharedClients:
+    def test_one_client_per_service_shared_by_consumers(self):
+        from app.chains.bedrock_llm import get_bedrock_client
+        from app.rag.store import build_embeddings
+        llm, embeddings = get_bedrock_client(), build_embeddings()
+        assert embeddings.inner.client is llm.client is clients.get_client("bedrock-runtime")
+        assert clients.get_client("bedrock") is not llm.client
+
+    def test_pool_keepalive_retries_and_timeouts_from_settings(self):
+        with patch.multiple(clients.settings, aws_max_pool_connections=33, aws_retry_mode="adaptive",
+                            aws_max_attempts=5, aws_read_timeout_seconds=90.0):
+            config = clients.get_client().meta.config
+        assert config.max_pool_connections == 33 and config.tcp_keepalive is True
+        assert config.retries == {"mode": "adaptive", "total_max_attempts": 5} and config.read_timeout == 90.0
+
+    def test_endpoint_override_and_limiter_only_on_runtime(self):
+        with patch.object(clients.settings, "bedrock_endpoint_url", "http://127.0.0.1:9"), \
+             patch.object(bedrock_limiter, "attach") as attach:
+            runtime, control = clients.get_client("bedrock-runtime"), clients.get_client("bedrock")
+        assert runtime.meta.endpoint_url == "http://127.0.0.1:9" and control.meta.endpoint_url != runtime.meta.endpoint_url
+        attach.assert_called_once_with(runtime)
@@ -0,0 +1,131 @@
+"""Unit tests for the idempotent decision cache and request coalescing — no AWS credentials or Redis server required."""
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from app.agents.decision_cache import DecisionCache, InProcessBackend, RedisBackend, decision_key
+from app.agents.decisioning_agent import DecisioningAgent
+from app.agents.singleflight import SingleFlight
+from app.models.schemas import DecisionRequest
+from app.utils import tracing
+
+class StandInRedis:
+    """Minimal Redis-compatible client: get/set with expiry, as shared by two replicas."""
+
+    def __init__(self):
+        self.data, self.expiry = {}, {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, ex=None):
+        self.data[key], self.expiry[key] = value.encode(), ex
+
+def _request(session_id="s1", query="Approve?", **applicant):
+    return DecisionRequest(session_id=session_id, query=query,
+                           applicant={"applicant_id": "A1", "credit_score": 700, "annual_income": 80000.0,
+                                      "loan_amount": 20000.0, **applicant})
+
+def _agent(cache):
+    agent = DecisioningAgent.__new__(DecisioningAgent)
+    agent.executor, agent.retriever, agent.decision_cache = MagicMock(), MagicMock(**{"invoke.return_value": []}), cache
+    agent.retriever.vectorstore.current_version.return_value = 3
+    agent.executor.ainvoke = AsyncMock(return_value={"output": '{"decision":"REFER","confidence":0.6,"reasoning":"gray"}'})
+    return agent
+
+class TestDecisionKey:
+    def test_canonical_input(self):
+        assert decision_key(_request("s1", "Approve?"), 1) == decision_key(_request("s2", "  Approve? "), 1)
+        assert decision_key(_request(), 1) != decision_key(_request(), 2)
+        assert decision_key(_request(), 1) != decision_key(_request(loan_amount=20001.0), 1)
+
+class TestDecisionCache:
+    @pytest.mark.asyncio
+    async def test_duplicate_submission_hits(self):
+        agent = _agent(DecisionCache(InProcessBackend(10, 60)))
+        first, second = await agent.run(_request("s1")), await agent.run(_request("retry-of-s1"))
+        assert agent.executor.ainvoke.await_count == 1
+        assert not first.cache_hit and second.cache_hit and second.session_id == "retry-of-s1"
+        assert second.decision == first.decision
+        assert agent.decision_cache.stats() | {"backend": None} == {"backend": None, "hits": 1, "misses": 1, "errors": 0,
+                                                                     "hit_rate": 0.5}
+
+    @pytest.mark.asyncio
+    async def test_unparseable_output_not_cached(self):
+        agent = _agent(DecisionCache(InProcessBackend(10, 60)))
+        agent.executor.ainvoke = AsyncMock(return_value={"output": "I think this should be approved"})
+        first, second = await agent.run(_request()), await agent.run(_request())
+        assert first.decision == "REFER" and not second.cache_hit and agent.executor.ainvoke.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_index_version_change_misses(self):
+        agent = _agent(DecisionCache(InProcessBackend(10, 60)))
+        await agent.run(_request())
+        agent.retriever.vectorstore.current_version.return_value = 4
+        assert not (await agent.run(_request())).cache_hit and agent.executor.ainvoke.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_redis_backend_shared_across_replicas(self):
+        shared = StandInRedis()
+        replica_a, replica_b = (_agent(DecisionCache(RedisBackend(ttl_seconds=120, client=shared))) for _ in range(2))
+        await replica_a.run(_request())
+        assert (await replica_b.run(_request("s9"))).cache_hit and replica_b.executor.ainvoke.await_count == 0
+        assert list(shared.expiry.values()) == [120] and next(iter(shared.data)).startswith("decision:")
+
+    @pytest.mark.asyncio
+    async def test_backend_outage_falls_through(self):
+        backend = MagicMock(**{"get.side_effect": ConnectionError("down"), "set.side_effect": ConnectionError("down")})
+        agent = _agent(DecisionCache(backend))
+        assert (await agent.run(_request())).decision == "REFER" and agent.decision_cache.errors == 2
+
+class TestCoalescing:
+    def _slow_agent(self, result):
+        agent = _agent(None)
+        agent.single_flight = SingleFlight()
+
+        async def ainvoke(_, config=None):
+            await asyncio.sleep(0.05)
+            if isinstance(result, Exception):
+                raise result
+            return result
+        agent.executor.ainvoke = AsyncMock(side_effect=ainvoke)
+        return agent
+
+    @pytest.mark.asyncio
+    async def test_concurrent_identical_requests_share_one_run(self):
+        agent = self._slow_agent({"output": '{"decision":"APPROVE","confidence":0.9,"reasoning":"ok"}'})
+        responses = await asyncio.gather(*(agent.run(_request(f"s{i}")) for i in range(5)), agent.run(_request(query="Other?")))
+        assert agent.executor.ainvoke.await_count == 2
+        assert [r.session_id for r in responses[:5]] == [f"s{i}" for i in range(5)]
+        assert agent.single_flight.stats() == {"in_flight": 0, "leaders": 2, "coalesced": 4}
+
+    @pytest.mark.asyncio
+    async def test_errors_reach_every_waiter(self):
+        agent = self._slow_agent(RuntimeError("throttled"))
+        results = await asyncio.gather(agent.run(_request("a")), agent.run(_request("b")), return_exceptions=True)
+        assert [str(r) for r in results] == ["throttled", "throttled"] and agent.executor.ainvoke.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_cancelled_caller_does_not_cancel_shared_run(self):
+        agent = self._slow_agent({"output": '{"decision":"REFER","confidence":0.6,"reasoning":"gray"}'})
+        first = asyncio.create_task(agent.run(_request("timed-out")))
+        await asyncio.sleep(0.01)
+        retry = asyncio.create_task(agent.run(_request("retry")))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        assert (await retry).session_id == "retry" and agent.executor.ainvoke.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_stream_coalesces_onto_in_flight_decide(self, tmp_path):
+        agent = self._slow_agent({"output": '{"decision":"APPROVE","confidence":0.9,"reasoning":"ok"}'})
+        agent.executor.astream_events = MagicMock()
+        leader = asyncio.create_task(agent.run(_request("decide")))
+        await asyncio.sleep(0.01)
+        log = tmp_path / "decisions.jsonl"
+        with patch("app.utils.tracing.settings.trace_log_path", str(log)), patch.object(tracing, "_profile_logger", None):
+            events = [event async for event in agent.stream(_request("stream").model_copy(update={"trace": True}))]
+        assert '"session_id": "stream"' in log.read_text()
+        assert [e for e, _ in events] == ["decision"] and events[0][1]["session_id"] == "stream"
+        assert [span["name"] for span in events[0][1]["trace"]["children"]] == ["rules"]
+        assert (await leader).decision == "APPROVE" and agent.executor.ainvoke.await_count == 1
+        agent.executor.astream_events.assert_not_called()
+
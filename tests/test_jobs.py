@@ -0,0 +1,90 @@
+"""Unit tests for the SQLite ingestion job queue — no AWS credentials required."""
+import threading
+import time
+import pytest
+from app.models.schemas import DocumentInput
+from app.rag.jobs import IngestJobQueue, QueueFullError
+
+DOCS = [DocumentInput(doc_id="D1", title="T", content="text")]
+
+def _wait(queue, job_id, status="succeeded", timeout=5.0):
+    deadline = time.time() + timeout
+    while (job := queue.get(job_id))["status"] != status and time.time() < deadline:
+        time.sleep(0.01)
+    return job
+
+class TestIngestJobQueue:
+    def test_runs_job_and_records_progress(self, tmp_path):
+        def ingest(docs, progress):
+            progress(3, 5)
+            return 5
+        queue = IngestJobQueue(tmp_path / "jobs.db", ingest, poll_seconds=0.05)
+        queue.start()
+        try:
+            job = _wait(queue, queue.submit(DOCS))
+        finally:
+            queue.stop()
+        assert job["chunks_done"] == job["chunks_total"] == 5 and job["duration_seconds"] >= 0 and job["document_count"] == 1
+
+    def test_failure_is_recorded(self, tmp_path):
+        queue = IngestJobQueue(tmp_path / "jobs.db", lambda docs, progress: 1 / 0, poll_seconds=0.05)
+        queue.start()
+        try:
+            job = _wait(queue, queue.submit(DOCS), "failed")
+        finally:
+            queue.stop()
+        assert "division by zero" in job["error"]
+
+    def test_back_pressure(self, tmp_path):
+        queue = IngestJobQueue(tmp_path / "jobs.db", lambda docs, progress: 0, max_pending=1)
+        queue.submit(DOCS)
+        with pytest.raises(QueueFullError):
+            queue.submit(DOCS)
+
+    def test_interrupted_jobs_resume_after_lease_expires(self, tmp_path):
+        release = threading.Event()
+        first = IngestJobQueue(tmp_path / "jobs.db", lambda docs, progress: release.wait(5) and 3, poll_seconds=0.05,
+                               lease_seconds=0.3)
+        first.start()
+        job_id = first.submit(DOCS)
+        _wait(first, job_id, "running")
+        first._stop.set()  # simulate a crash: the job is left in 'running' and its heartbeat stops
+        second = IngestJobQueue(tmp_path / "jobs.db", lambda docs, progress: 7, poll_seconds=0.05, lease_seconds=0.3)
+        second.start()
+        try:
+            assert _wait(second, job_id)["chunks_done"] == 7
+            release.set(); first.stop()  # the old owner finishing late must not overwrite the result
+            assert second.get(job_id)["chunks_done"] == 7
+        finally:
+            release.set(); second.stop(); first.stop()
+
+    def test_live_owner_keeps_its_job(self, tmp_path):
+        release = threading.Event()
+        first = IngestJobQueue(tmp_path / "jobs.db", lambda docs, progress: release.wait(5) and 3, poll_seconds=0.05,
+                               lease_seconds=0.3)
+        second = IngestJobQueue(tmp_path / "jobs.db", lambda docs, progress: 7, poll_seconds=0.05, lease_seconds=0.3)
+        first.start()
+        try:
+            job_id = first.submit(DOCS)
+            _wait(first, job_id, "running")
+            second.start()  # e.g. the other uvicorn worker restarting
+            time.sleep(1.0)
+            release.set()
+            assert _wait(first, job_id)["chunks_done"] == 3
+        finally:
+            release.set(); first.stop(); second.stop()
+
+    def test_finished_jobs_drop_payload(self, tmp_path):
+        import sqlite3
+        queue = IngestJobQueue(tmp_path / "jobs.db", lambda docs, progress: 1, poll_seconds=0.05)
+        queue.start()
+        try:
+            job_id = queue.submit(DOCS)
+            _wait(queue, job_id)
+        finally:
+            queue.stop()
+        with sqlite3.connect(tmp_path / "jobs.db") as db:
+            assert db.execute("SELECT payload FROM ingest_jobs WHERE id = ?", (job_id,)).fetchone()[0] == "[]"
+
+    def test_unknown_job(self, tmp_path):
+        assert IngestJobQueue(tmp_path / "jobs.db", lambda docs, progress: 0).get("missing") is None
@@ -0,0 +1,115 @@
+"""Tests for the adaptive Bedrock concurrency limiter — no AWS credentials required."""
+import threading
+import boto3
+import pytest
+from botocore.awsrequest import AWSResponse
+from botocore.config import Config
+from unittest.mock import AsyncMock, MagicMock, patch
+from fastapi.testclient import TestClient
+from app.chains.limiter import AdaptiveLimiter, Overloaded
+from app.main import app
+
+class _Raw:
+    def __init__(self, body: bytes):
+        self.body = body
+
+    def stream(self, **kwargs):
+        yield self.body
+
+def _client(limiter, *responses, attempts=1):
+    """bedrock-runtime client whose HTTP sends return `responses` ((status, error type or None) in order)."""
+    client = boto3.client("bedrock-runtime", region_name="us-east-1", aws_access_key_id="x", aws_secret_access_key="x",
+                          config=Config(retries={"mode": "standard", "total_max_attempts": attempts}))
+    limiter.attach(client)
+    queue = list(responses)
+
+    def send(request, **kwargs):
+        status, error = queue.pop(0)
+        headers = {"x-amzn-ErrorType": error} if error else {"Content-Type": "application/json"}
+        return AWSResponse(request.url, status, headers, _Raw(b'{"message": "Rate exceeded"}' if error else b"{}"))
+    client.meta.events.register("before-send.bedrock-runtime.*", send)
+    return client
+
+class TestAIMD:
+    def test_additive_increase_only_when_window_is_used(self):
+        limiter = AdaptiveLimiter(initial=2, latency_tolerance=0)
+        limiter.release(limiter.acquire())
+        assert limiter.limit == 2
+        started = [limiter.acquire(), limiter.acquire()]
+        for s in started:
+            limiter.release(s)
+        assert limiter.limit == pytest.approx(2.5)
+
+    def test_throttle_halves_once_per_window(self):
+        limiter = AdaptiveLimiter(initial=8)
+        started = [limiter.acquire() for _ in range(4)]
+        for s in started:
+            limiter.release(s, throttled=True)
+        assert limiter.limit == 4 and limiter.throttles == 4
+        limiter.release(limiter.acquire(), throttled=True)
+        assert limiter.limit == 2
+
+    def test_latency_rise_shrinks_window(self):
+        limiter = AdaptiveLimiter(initial=8, latency_tolerance=2.0)
+        for _ in range(5):
+            limiter.release(limiter.acquire(), key="/model/fast/invoke")
+        limiter.release(limiter.acquire() - 1.0, key="/model/fast/invoke")
+        assert limiter.limit == 4
+        limiter.release(limiter.acquire() - 1.0, key="/model/slow/invoke")  # a new model sets its own baseline
+        assert limiter.limit == 4
+
+    def test_queue_timeout_sheds_with_retry_after(self):
+        limiter = AdaptiveLimiter(initial=1)
+        limiter.acquire()
+        with pytest.raises(Overloaded) as exc:
+            limiter.acquire(timeout=0.05)
+        assert exc.value.retry_after >= 1 and limiter.shed == 1 and limiter.waiting == 0
+
+    def test_waiter_gets_released_slot(self):
+        limiter = AdaptiveLimiter(initial=1)
+        held = limiter.acquire()
+        threading.Timer(0.05, limiter.release, args=(held,)).start()
+        limiter.acquire(timeout=2)
+        assert limiter.in_flight == 1
+
+    def test_admit_sheds_when_queue_full(self):
+        limiter = AdaptiveLimiter(initial=1, max_queue=0)
+        with pytest.raises(Overloaded):
+            limiter.admit()
+
+class TestBotocoreHooks:
+    def test_successful_call_holds_and_frees_a_slot(self):
+        limiter = AdaptiveLimiter(initial=2)
+        client = _client(limiter, (200, None))
+        client.invoke_model(modelId="m", body=b"{}")
+        assert limiter.in_flight == 0 and limiter.throttles == 0
+        assert list(limiter.latency) == ["/model/m/invoke"]
+
+    def test_throttling_exception_shrinks_window(self):
+        limiter = AdaptiveLimiter(initial=8)
+        client = _client(limiter, (429, "ThrottlingException"))
+        with pytest.raises(client.exceptions.ThrottlingException):
+            client.invoke_model(modelId="m", body=b"{}")
+        assert limiter.limit == 4 and limiter.throttles == 1 and limiter.in_flight == 0
+
+    def test_throttled_attempt_shrinks_window_before_retry(self):
+        limiter = AdaptiveLimiter(initial=8)
+        client = _client(limiter, (429, "ThrottlingException"), (200, None), attempts=2)
+        with patch("time.sleep"):  # botocore's retry backoff
+            client.invoke_model(modelId="m", body=b"{}")
+        assert limiter.limit == 4 and limiter.throttles == 1 and limiter.in_flight == 0
+
+class TestLoadShedding:
+    def test_decide_returns_429_with_retry_after(self):
+        agent = MagicMock(); agent.run = AsyncMock(side_effect=Overloaded("Bedrock queue full", 7))
+        with patch("app.api.routes.get_agent", return_value=agent):
+            r = TestClient(app).post("/api/v1/decide", json={"session_id": "s1", "applicant": {"applicant_id": "A1"},
+                                                             "query": "Approve?"})
+        assert r.status_code == 429 and r.headers["retry-after"] == "7"
+
+    def test_stream_rejected_before_committing_to_200(self):
+        with patch("app.api.routes.get_agent", return_value=MagicMock()), \
+             patch("app.api.routes.bedrock_limiter", AdaptiveLimiter(max_queue=0)):
+            r = TestClient(app).post("/api/v1/decide/stream", json={"session_id": "s1", "applicant": {"applicant_id": "A1"},
+                                                                    "query": "Approve?"})
+        assert r.status_code == 429 and int(r.headers["retry-after"]) >= 1
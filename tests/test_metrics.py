@@ -0,0 +1,47 @@
+"""Tests for the Prometheus metrics surface — no AWS credentials required."""
+import uuid
+from fastapi.testclient import TestClient
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, LLMResult
+from langchain_core.tools import tool
+from prometheus_client import REGISTRY
+from app.main import app
+from app.utils.metrics import MetricsCallbackHandler
+
+def _sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+class TestMetricsEndpoint:
+    def test_exposes_request_latency_by_route_template(self):
+        client = TestClient(app)
+        client.get("/api/v1/ingest/job-123")
+        body = client.get("/metrics")
+        assert body.status_code == 200 and body.headers["content-type"].startswith("text/plain")
+        assert 'http_request_duration_seconds_count{method="GET",route="/api/v1/ingest/{job_id}"' in body.text
+        assert "job-123" not in body.text
+
+class TestMetricsCallbackHandler:
+    def test_records_llm_latency_and_tokens(self):
+        handler, run_id = MetricsCallbackHandler(), uuid.uuid4()
+        before = _sample("bedrock_llm_tokens_total", model="claude-test", direction="output")
+        handler.on_chat_model_start({}, [], run_id=run_id, metadata={"ls_model_name": "claude-test"})
+        message = AIMessage(content="{}", usage_metadata={"input_tokens": 120, "output_tokens": 30, "total_tokens": 150})
+        handler.on_llm_end(LLMResult(generations=[[ChatGeneration(message=message)]]), run_id=run_id)
+        assert _sample("bedrock_llm_tokens_total", model="claude-test", direction="output") - before == 30
+        assert _sample("bedrock_llm_call_duration_seconds_count", model="claude-test", status="ok") >= 1
+
+    def test_counts_throttles(self):
+        handler, run_id = MetricsCallbackHandler(), uuid.uuid4()
+        before = _sample("bedrock_llm_throttles_total", model="claude-test")
+        handler.on_chat_model_start({}, [], run_id=run_id, metadata={"ls_model_name": "claude-test"})
+        handler.on_llm_error(RuntimeError("ThrottlingException: Rate exceeded"), run_id=run_id)
+        assert _sample("bedrock_llm_throttles_total", model="claude-test") - before == 1
+
+    def test_times_tool_calls(self):
+        @tool
+        def echo_tool(text: str) -> str:
+            """Echo the text."""
+            return text
+
+        echo_tool.invoke({"text": "hi"}, config={"callbacks": [MetricsCallbackHandler()]})
+        assert _sample("agent_tool_duration_seconds_count", tool="echo_tool", status="ok") == 1
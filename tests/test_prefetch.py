@@ -0,0 +1,42 @@
+"""Tests for policy prefetch into the agent's first turn — no AWS credentials required."""
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from langchain_core.documents import Document
+from langchain_core.prompts import ChatPromptTemplate
+from app.agents.decisioning_agent import SYSTEM_PROMPT, DecisioningAgent
+from app.models.schemas import DecisionRequest
+
+def _agent(docs):
+    agent = DecisioningAgent.__new__(DecisioningAgent)
+    agent.executor, agent.retriever = MagicMock(), MagicMock(**{"invoke.return_value": docs})
+    agent.executor.ainvoke = AsyncMock(return_value={"output": '{"decision":"REFER","confidence":0.6,"reasoning":"gray"}',
+                                                     "intermediate_steps": []})
+    return agent
+
+def _request():
+    return DecisionRequest(session_id="s1", decision_type="loan", query="Approve the mortgage?",
+                           applicant={"applicant_id": "A1", "loan_purpose": "home purchase",
+                                      "metadata": {"product": "mortgage", "jurisdiction": "UK"}})
+
+class TestPolicyPrefetch:
+    @pytest.mark.asyncio
+    async def test_policies_injected_into_first_message(self):
+        agent = _agent([Document(page_content="Mortgage: max 4x annual income", metadata={"title": "Credit Policy"})])
+        await agent.run(_request())
+        agent_input = agent.executor.ainvoke.await_args.args[0]["input"]
+        assert "Relevant policies:\n[1] Credit Policy:\nMortgage: max 4x annual income" in agent_input
+        query, = agent.retriever.invoke.call_args.args
+        assert "home purchase" in query and "Approve the mortgage?" in query
+        assert agent.retriever.invoke.call_args.kwargs["filter"] == {"decision_type": "loan", "product": "mortgage",
+                                                                     "jurisdiction": "UK"}
+
+    @pytest.mark.asyncio
+    async def test_prefetch_can_be_disabled(self):
+        agent = _agent([])
+        with patch("app.agents.decisioning_agent.settings.agent_prefetch_policies", False):
+            await agent.run(_request())
+        agent.retriever.invoke.assert_not_called()
+        assert "Relevant policies" not in agent.executor.ainvoke.await_args.args[0]["input"]
+
+    def test_system_prompt_has_no_template_variables(self):
+        assert ChatPromptTemplate.from_messages([("system", SYSTEM_PROMPT)]).input_variables == []
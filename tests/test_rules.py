@@ -0,0 +1,61 @@
+"""Unit tests for the deterministic rules fast path — no AWS credentials required."""
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from app.agents.rules import credit_risk_tier, evaluate_fast_path
+from app.models.schemas import DecisionRequest
+
+def _request(decision_type="credit", **applicant):
+    return DecisionRequest(session_id="s1", decision_type=decision_type,
+                           applicant={"applicant_id": "A1", **applicant}, query="Approve?")
+
+class TestFastPath:
+    def test_auto_approve(self):
+        r = evaluate_fast_path(_request(credit_score=780, annual_income=120000.0, loan_amount=30000.0, existing_debt=5000.0))
+        assert r.decision == "APPROVE" and r.decision_path == "rules" and r.session_id == "s1"
+
+    def test_auto_decline_low_score(self):
+        r = evaluate_fast_path(_request(credit_score=560, annual_income=80000.0, loan_amount=10000.0))
+        assert r.decision == "DECLINE" and any("580" in f for f in r.risk_factors)
+
+    def test_high_principal_to_income_escalates(self):
+        # (debt + principal) / income is not debt service; it must not auto-decline without review.
+        assert evaluate_fast_path(_request(credit_score=700, annual_income=40000.0, loan_amount=20000.0, existing_debt=5000.0)) is None
+
+    def test_gray_zone_escalates(self):
+        assert evaluate_fast_path(_request(credit_score=700, annual_income=80000.0, loan_amount=20000.0)) is None
+
+    def test_fraud_signal_blocks_auto_approve(self):
+        assert evaluate_fast_path(_request(credit_score=800, annual_income=2_000_000.0, loan_amount=600000.0)) is None
+
+    def test_missing_fields_escalate(self):
+        assert evaluate_fast_path(_request(credit_score=800)) is None
+
+    def test_non_credit_types_escalate(self):
+        assert evaluate_fast_path(_request("kyc", credit_score=560, annual_income=80000.0, loan_amount=10000.0)) is None
+
+    def test_disabled(self):
+        with patch("app.agents.rules.settings.rules_fast_path_enabled", False):
+            assert evaluate_fast_path(_request(credit_score=560, annual_income=80000.0, loan_amount=10000.0)) is None
+
+    def test_tiers_match_credit_scorer(self):
+        assert [credit_risk_tier(s, d) for s, d in [(760, 0.3), (700, 0.4), (630, 0.5), (600, 0.1)]] == \
+            ["LOW_RISK", "MEDIUM_RISK", "HIGH_RISK", "VERY_HIGH_RISK"]
+
+class TestAgentFastPath:
+    @pytest.mark.asyncio
+    async def test_run_skips_executor(self):
+        from app.agents.decisioning_agent import DecisioningAgent
+        agent = DecisioningAgent.__new__(DecisioningAgent)
+        agent.executor = MagicMock(); agent.executor.ainvoke = AsyncMock()
+        r = await agent.run(_request(credit_score=560, annual_income=80000.0, loan_amount=10000.0))
+        assert r.decision == "DECLINE"
+        agent.executor.ainvoke.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_run_escalates_to_agent(self):
+        from app.agents.decisioning_agent import DecisioningAgent
+        agent = DecisioningAgent.__new__(DecisioningAgent)
+        agent.executor, agent.retriever = MagicMock(), MagicMock(**{"invoke.return_value": []})
+        agent.executor.ainvoke = AsyncMock(return_value={"output": '{"decision":"REFER","confidence":0.6,"reasoning":"gray"}'})
+        r = await agent.run(_request(credit_score=700, annual_income=80000.0, loan_amount=20000.0))
+        assert r.decision == "REFER" and r.decision_path == "agent"
@@ -0,0 +1,32 @@
+"""Unit tests for the vectorized scoring rules — no AWS credentials required."""
+import numpy as np
+from app.agents import scoring
+
+def _portfolio(n=2_000):
+    rng = np.random.default_rng(7)
+    return (rng.integers(300, 851, n), rng.choice([0.0, 9_000.0, 40_000.0, 120_000.0, 2_000_000.0], n),
+            rng.uniform(0, 800_000, n), rng.uniform(0, 50_000, n))
+
+class TestScoring:
+    def test_matches_single_applicant_rules(self):
+        score, income, loan, debt = _portfolio()
+        out = scoring.score_portfolio(score, income, loan, debt)
+        for i in range(len(score)):
+            dti = (debt[i] + loan[i]) / income[i] if income[i] > 0 else 1.0
+            tier = ("LOW_RISK" if score[i] >= 750 and dti < 0.36 else "MEDIUM_RISK" if score[i] >= 680 and dti < 0.43
+                    else "HIGH_RISK" if score[i] >= 620 else "VERY_HIGH_RISK")
+            assert out["dti"][i] == dti and scoring.TIERS[out["tier"][i]] == tier
+            assert bool(out["fraud_flags"][i] & scoring.FRAUD_HIGH_VALUE) == (loan[i] > 500_000)
+
+    def test_structured_output_and_names(self):
+        out = scoring.score_portfolio([760, 600], [100_000.0, 0.0], [20_000.0, 5_000.0])
+        assert out.dtype == scoring.SCORE_DTYPE and out["loan_to_income"].tolist() == [0.2, 1.0]
+        assert scoring.tier_names(out["tier"]).tolist() == ["LOW_RISK", "VERY_HIGH_RISK"]
+
+    def test_fraud_messages_decode_flags(self):
+        flags = scoring.fraud_flags([600_000.0, 1_000.0], [10_000.0, 90_000.0])
+        assert flags.tolist() == [7, 0] and len(scoring.fraud_messages(flags[0])) == 3 and scoring.fraud_messages(flags[1]) == []
+
+    def test_dti_ratios(self):
+        front, back, passed = scoring.dti_ratios([5_000.0, 5_000.0, 0.0], [500.0, 1_500.0, 0.0], [1_200.0, 1_200.0, 100.0])
+        assert front.tolist() == [0.24, 0.24, 1.0] and back.tolist() == [0.34, 0.54, 1.0] and passed.tolist() == [True, False, False]
@@ -0,0 +1,303 @@
+"""Unit tests for the append-only policy store and ingestion — no AWS credentials required."""
+import threading
+import numpy as np
+import pytest
+from unittest.mock import patch
+from langchain_core.embeddings import DeterministicFakeEmbedding
+from app.models.schemas import DocumentInput
+from app.rag.ingestion import EmbeddingPipeline, RagIngestionService
+from app.rag.lexical import tokenize
+from app.rag.store import PolicyStore, StoreRegistry
+
+@pytest.fixture
+def store(tmp_path):
+    return PolicyStore(tmp_path / "index", DeterministicFakeEmbedding(size=16))
+
+class TestPolicyStore:
+    def test_add_and_search(self, store):
+        store.add_texts(["credit policy", "fraud policy"], [{"title": "C"}, {"title": "F"}])
+        assert store.similarity_search("fraud policy", k=1)[0].metadata["title"] == "F"
+
+    def test_each_add_writes_a_delta_segment(self, store):
+        store.add_texts(["a"]); store.add_texts(["b"])
+        assert sorted(p.name for p in (store.path / "segments").iterdir()) == \
+            ["000001.jsonl", "000001.npy", "000002.jsonl", "000002.npy"]
+
+    def test_reload_replays_segments(self, store):
+        store.add_texts(["kyc rules"], [{"title": "K"}]); store.add_texts(["aml rules"], [{"title": "A"}])
+        reloaded = PolicyStore(store.path, store.embeddings)
+        assert len(reloaded) == 2 and reloaded.similarity_search("aml rules", k=1)[0].metadata["title"] == "A"
+
+    def test_compaction_folds_segments_into_base(self, store):
+        with patch("app.rag.store.settings.faiss_compact_after_segments", 3):
+            for text in ("a", "b", "c", "d"):
+                store.add_texts([text])
+        assert sorted(p.name for p in (store.path / "segments").iterdir()) == ["000004.jsonl", "000004.npy"]
+        reloaded = PolicyStore(store.path, store.embeddings)
+        assert len(reloaded) == 4 and reloaded.similarity_search("c", k=1)[0].page_content == "c"
+
+    def test_compacted_base_is_memory_mapped(self, store):
+        store.add_texts(["kyc rules", "aml rules"], [{"title": "K"}, {"title": "A"}]); store.compact()
+        reloaded = PolicyStore(store.path, store.embeddings)
+        assert isinstance(reloaded._base.vectors, np.memmap) and reloaded._delta is None
+        assert reloaded.similarity_search("aml rules", k=1)[0].metadata["title"] == "A"
+        assert not list(store.path.glob("*.faiss")) and not list(store.path.glob("*.pkl"))
+
+    def test_base_deletes_and_delta_adds_merge(self, store):
+        ids = store.add_texts(["alpha", "beta"]); store.compact()
+        store.delete([ids[0]]); store.add_texts(["gamma"])
+        assert [d.page_content for d in store.similarity_search("alpha", k=3)] == \
+            [d.page_content for d in PolicyStore(store.path, store.embeddings).similarity_search("alpha", k=3)]
+        assert sorted(d.page_content for d in store.docs.values()) == ["beta", "gamma"]
+        store.compact()
+        assert len(PolicyStore(store.path, store.embeddings)._base) == 2
+
+    def test_concurrent_adds_serialize(self, store):
+        threads = [threading.Thread(target=store.add_texts, args=([f"doc {i}"],)) for i in range(8)]
+        for t in threads: t.start()
+        for t in threads: t.join()
+        assert len(store) == 8 and len(PolicyStore(store.path, store.embeddings)) == 8
+
+class TestAnnIndex:
+    @pytest.mark.parametrize("index_type", ["ivf_flat", "hnsw", "ivf_pq"])
+    def test_compaction_trains_ann_index(self, store, index_type):
+        vectors = np.random.default_rng(1).random((400, 16), dtype=np.float32)
+        ids = store.add_embeddings([f"chunk {i}" for i in range(400)], vectors)
+        with patch.multiple("app.rag.ann.settings", faiss_index_type=index_type, faiss_ann_min_vectors=100,
+                            faiss_pq_m=4, faiss_pq_nbits=4, faiss_nprobe=64):
+            store.compact()
+        reloaded = PolicyStore(store.path, store.embeddings)
+        assert reloaded._base.ann is not None
+        doc, distance = reloaded.similarity_search_with_score_by_vector(vectors[7].tolist(), k=1)[0]
+        assert doc.id == ids[7] and distance == pytest.approx(0.0, abs=1e-5)
+
+    def test_small_bases_stay_exact(self, store):
+        store.add_texts(["a", "b"])
+        with patch("app.rag.ann.settings.faiss_index_type", "hnsw"):
+            store.compact()
+        assert store._base.ann is None and not list(store.path.glob("*.ann.faiss"))
+
+class TestMetadataFilter:
+    @pytest.fixture
+    def policies(self, store):
+        store.add_texts(["mortgage limits", "mortgage limits", "card limits", "global limits", "old limits"], [
+            {"decision_type": "loan", "product": "mortgage", "jurisdiction": "US"},
+            {"decision_type": "loan", "product": "mortgage", "jurisdiction": "UK"},
+            {"decision_type": "credit", "product": ["card", "overdraft"]},
+            {},
+            {"product": "mortgage", "effective_date": "2020-01-01", "expiry_date": "2023-01-01"}])
+        return store
+
+    def titles(self, store, **filter):
+        return sorted(d.page_content + "/" + str(d.metadata.get("jurisdiction", "*"))
+                      for d in store.similarity_search("mortgage limits", k=10, filter=filter))
+
+    def test_filters_restrict_candidates_and_keep_globals(self, policies):
+        assert self.titles(policies, product="Mortgage", jurisdiction="uk", as_of="2024-06-01") == \
+            ["global limits/*", "mortgage limits/UK"]
+        assert self.titles(policies, product="overdraft") == ["card limits/*", "global limits/*"]
+        assert "old limits/*" in self.titles(policies, product="mortgage", as_of="2021-06-01")
+
+    def test_filters_apply_to_compacted_base_and_deletes(self, policies):
+        policies.compact()
+        reloaded = PolicyStore(policies.path, policies.embeddings)
+        assert self.titles(reloaded, product="mortgage", jurisdiction="US", as_of="2024-06-01") == \
+            ["global limits/*", "mortgage limits/US"]
+        us = reloaded.similarity_search("mortgage limits", k=1, filter={"jurisdiction": "US", "product": "mortgage"})[0]
+        reloaded.delete([us.id]); reloaded.add_texts(["mortgage limits v2"], [{"product": "mortgage", "jurisdiction": "US"}])
+        assert self.titles(reloaded, product="mortgage", jurisdiction="US", as_of="2024-06-01") == \
+            ["global limits/*", "mortgage limits v2/US"]
+
+    def test_retriever_forwards_filter_and_caches_per_filter(self, policies):
+        from app.agents.tools import build_tools
+        from app.rag.cache import CachingRetriever, TTLCache
+        retriever = CachingRetriever(policies.as_retriever(search_kwargs={"k": 4}), TTLCache("t", 10, 60))
+        policy_retriever = build_tools(retriever)[0]
+        out = policy_retriever.invoke({"query": "limits", "product": "card"})
+        assert "card limits" in out and "mortgage" not in out
+        assert "mortgage limits" in policy_retriever.invoke({"query": "limits", "product": "mortgage"})
+
+    def test_large_filtered_flat_search_scans_without_gathering(self, store):
+        vectors = np.random.default_rng(2).random((300, 16), dtype=np.float32)
+        store.add_embeddings([f"chunk {i}" for i in range(300)], vectors); store.compact()
+        base, query = store._base, vectors[:1] + 0.01
+        allowed = {int(i) for i in base.ids[::3]}
+        with patch("app.rag.mmap_base.settings.faiss_prefilter_exact_max", 10_000):
+            exact = base.search(query, 5, set(), allowed)
+        with patch("app.rag.mmap_base.settings.faiss_prefilter_exact_max", 10), \
+                patch("app.rag.mmap_base.SCAN_BLOCK_ROWS", 64), patch.object(base, "_scan", wraps=base._scan) as scan:
+            scanned = base.search(query, 5, set(), allowed)
+        scan.assert_called_once()
+        assert [i for i, _ in scanned] == [i for i, _ in exact]
+        assert [d for _, d in scanned] == pytest.approx([d for _, d in exact], abs=1e-5)
+
+class TestLexicalRetrieval:
+    @pytest.fixture
+    def policies(self, store):
+        store.add_texts(["Loan amounts exceeding 5× annual income must be flagged.",
+                         "OFAC watchlist and PEP screening are mandatory.",
+                         "FICO 720+ with DTI below 36% qualifies for Tier-1 rates."], [{}, {"product": "kyc"}, {}])
+        return store
+
+    def test_tokenizer_keeps_exact_policy_tokens(self):
+        assert tokenize("FICO 720+ and DTI < 36%; 5× income, $10,000") == ["fico", "720+", "dti", "36%", "5x", "income", "$10,000"]
+
+    def test_lexical_mode_skips_the_embedding_call(self, policies):
+        with patch.object(DeterministicFakeEmbedding, "embed_query") as embed:
+            assert policies.similarity_search("OFAC PEP", k=1, mode="lexical")[0].metadata["product"] == "kyc"
+            assert policies.similarity_search("5x income", k=1, mode="lexical")[0].page_content.startswith("Loan")
+        embed.assert_not_called()
+
+    def test_hybrid_fuses_and_honours_filters(self, policies):
+        assert policies.similarity_search("FICO DTI", k=1, mode="hybrid")[0].page_content.startswith("FICO")
+        assert [d.metadata for d in policies.similarity_search("OFAC", k=3, mode="hybrid", filter={"product": "card"})] == [{}, {}]
+
+    def test_falls_back_to_lexical_when_embeddings_fail(self, policies):
+        with patch.object(DeterministicFakeEmbedding, "embed_query", side_effect=RuntimeError("Bedrock unavailable")):
+            assert policies.similarity_search("OFAC", k=1)[0].metadata["product"] == "kyc"
+
+    def test_index_tracks_ingest_updates(self, store):
+        svc = RagIngestionService(store)
+        with patch("app.rag.ingestion.settings.retrieval_mode", "hybrid"):
+            svc.ingest([DocumentInput(doc_id="D1", title="T", content="velocity checks within 30 days")])
+            assert store._lexical is not None
+            svc.ingest([DocumentInput(doc_id="D1", title="T", content="EDD for high-risk jurisdictions")])
+        assert store.similarity_search("velocity", k=2, mode="lexical") == []
+        assert store.similarity_search("EDD", k=2, mode="lexical")[0].metadata["doc_id"] == "D1"
+
+class TestIngestion:
+    def test_live_retriever_sees_new_chunks(self, store):
+        retriever = store.as_retriever(search_kwargs={"k": 1})
+        RagIngestionService(store).ingest([DocumentInput(doc_id="D1", title="Mortgage Policy", content="max 4x income")])
+        doc = retriever.invoke("max 4x income")[0]
+        assert doc.metadata["doc_id"] == "D1" and doc.metadata["title"] == "Mortgage Policy" and doc.metadata["content_hash"]
+
+    def test_reingest_embeds_only_the_diff(self, store):
+        svc = RagIngestionService(store)
+        svc.pipeline.batch_size = 1
+        svc.splitter._chunk_size, svc.splitter._chunk_overlap = 20, 0
+        v1 = "alpha clause here.\n\nbeta clause here.\n\ngamma clause here."
+        svc.ingest([DocumentInput(doc_id="D1", title="Policy", content=v1)])
+        with patch.object(DeterministicFakeEmbedding, "embed_documents", autospec=True,
+                          side_effect=DeterministicFakeEmbedding.embed_documents) as embed:
+            svc.ingest([DocumentInput(doc_id="D1", title="Policy", content="alpha clause here.\n\ndelta clause here.")])
+        assert [c.args[1] for c in embed.call_args_list] == [["delta clause here."]]
+        assert sorted(d.page_content for d in store.docs.values()) == ["alpha clause here.", "delta clause here."]
+
+    def test_reingest_unchanged_is_noop(self, store):
+        svc = RagIngestionService(store)
+        doc = DocumentInput(doc_id="D1", title="Policy", content="same text")
+        svc.ingest([doc]); svc.ingest([doc])
+        assert len(store) == 1 and len(list((store.path / "segments").glob("*.jsonl"))) == 1
+
+    def test_metadata_change_reuses_embedding(self, store):
+        svc = RagIngestionService(store)
+        svc.ingest([DocumentInput(doc_id="D1", title="Old", content="same text")])
+        with patch.object(DeterministicFakeEmbedding, "embed_documents") as embed:
+            svc.ingest([DocumentInput(doc_id="D1", title="New", content="same text")])
+        embed.assert_not_called()
+        assert [d.metadata["title"] for d in store.docs.values()] == ["New"]
+
+    def test_deletions_survive_reload_and_compaction(self, store):
+        svc = RagIngestionService(store)
+        svc.ingest([DocumentInput(doc_id="D1", title="T", content="one"), DocumentInput(doc_id="D2", title="T", content="two")])
+        svc.ingest([DocumentInput(doc_id="D1", title="T", content="uno")])
+        assert sorted(d.page_content for d in PolicyStore(store.path, store.embeddings).docs.values()) == ["two", "uno"]
+        store.compact()
+        reloaded = PolicyStore(store.path, store.embeddings)
+        assert len(reloaded) == 2 and reloaded.similarity_search("one", k=2)[0].page_content != "one"
+
+    def test_empty_documents(self, store):
+        assert RagIngestionService(store).ingest([DocumentInput(doc_id="D", title="T", content="")]) == 0
+
+class TestEmbeddingPipeline:
+    def test_batches_preserve_order(self):
+        emb = DeterministicFakeEmbedding(size=8)
+        texts = [f"chunk {i}" for i in range(10)]
+        vectors = EmbeddingPipeline(emb, batch_size=3, max_workers=4).embed(texts)
+        assert vectors.shape == (10, 8) and vectors[7].tolist() == pytest.approx(emb.embed_query("chunk 7"))
+
+    def test_per_call_worker_cap(self):
+        emb, active, peak, lock = DeterministicFakeEmbedding(size=8), [0], [0], threading.Lock()
+        def slow(texts):
+            with lock:
+                active[0] += 1; peak[0] = max(peak[0], active[0])
+            threading.Event().wait(0.02)
+            with lock:
+                active[0] -= 1
+            return [emb.embed_query(t) for t in texts]
+        with patch.object(DeterministicFakeEmbedding, "embed_documents", side_effect=slow):
+            EmbeddingPipeline(emb, batch_size=1, max_workers=8).embed([str(i) for i in range(16)], max_workers=2)
+        assert peak[0] == 2
+
+    def test_retries_throttled_batches(self):
+        emb = DeterministicFakeEmbedding(size=8)
+        calls = {"n": 0}
+        def flaky(texts):
+            calls["n"] += 1
+            if calls["n"] == 1:
+                raise ValueError("Error raised by inference endpoint: ThrottlingException: Rate exceeded")
+            return [emb.embed_query(t) for t in texts]
+        with patch.object(DeterministicFakeEmbedding, "embed_documents", side_effect=flaky):
+            assert EmbeddingPipeline(emb, batch_size=4, max_workers=1, backoff_seconds=0).embed(["a", "b"]).shape == (2, 8)
+        assert calls["n"] == 2
+
+    def test_non_throttle_errors_raise(self):
+        emb = DeterministicFakeEmbedding(size=8)
+        with patch.object(DeterministicFakeEmbedding, "embed_documents", side_effect=ValueError("AccessDenied")):
+            with pytest.raises(ValueError):
+                EmbeddingPipeline(emb, max_retries=3, backoff_seconds=0).embed(["a"])
+
+class TestStoreRegistry:
+    def test_one_store_per_path_shared_by_retrievers(self, tmp_path):
+        reg = StoreRegistry(lambda: DeterministicFakeEmbedding(size=8))
+        a, b = reg.retriever(k=1, path=tmp_path), reg.retriever(k=3, path=tmp_path)
+        assert a.vectorstore is b.vectorstore is reg.get(tmp_path)
+        assert reg.get(tmp_path / "other") is not reg.get(tmp_path)
+
+    def test_version_advances_with_writes(self, store):
+        v0 = store.version
+        store.add_texts(["a"])
+        assert store.version == v0 + 1
+
+    def test_refresh_picks_up_other_process_writes(self, store):
+        other = PolicyStore(store.path, store.embeddings)
+        store.add_texts(["written elsewhere"])
+        assert other.refresh() and other.version == store.version
+        assert other.similarity_search("written elsewhere", k=1)[0].page_content == "written elsewhere"
+        store.add_texts(["after compaction"]); store.compact()
+        assert other.refresh() and len(other) == 2 and not other.refresh()
+
+    def test_reads_do_not_wait_for_a_running_writer(self, store):
+        store.add_texts(["credit policy"])
+        held, release = threading.Event(), threading.Event()
+        def compaction():
+            with store.write_lock:
+                held.set(); release.wait(5)
+        worker = threading.Thread(target=compaction); worker.start(); held.wait(5)
+        try:
+            with patch("app.rag.store.settings.faiss_refresh_interval_seconds", 0):
+                done = threading.Event()
+                reader = threading.Thread(target=lambda: (store.current_version(), store.similarity_search("credit", k=1), done.set()))
+                reader.start()
+                assert done.wait(2)
+        finally:
+            release.set(); worker.join()
+
+    def test_writer_catches_up_before_committing(self, store):
+        other = PolicyStore(store.path, store.embeddings)
+        store.add_texts(["first"])
+        other.add_texts(["second"])
+        assert len(PolicyStore(store.path, store.embeddings)) == 2 and len(set(other.docs)) == 2
+
+    def test_agent_retriever_seeds_policy_docs_into_shared_store(self, tmp_path):
+        from app.rag import retriever
+        from app.retrieval import vector_store
+        reg = StoreRegistry(lambda: DeterministicFakeEmbedding(size=8))
+        with patch.object(vector_store, "DOCS_DIR", tmp_path / "docs"), \
+                patch("app.rag.store.settings.faiss_index_path", str(tmp_path / "index")), \
+                patch.object(retriever, "registry", reg), patch.object(vector_store, "get_policy_store", reg.get):
+            agent_retriever = retriever.build_retriever()
+            store = vector_store.build_vector_store()
+            assert agent_retriever.retriever.vectorstore is store
+            assert {d.metadata["doc_id"] for d in store.docs.values()} == {"credit_policy.txt", "regulatory_guidelines.txt", "risk_model_guide.txt"}
@@ -0,0 +1,55 @@
+"""Unit tests for the portfolio stress-testing engine — no AWS credentials required."""
+import numpy as np
+import pytest
+from app.agents import scoring
+from app.agents.stress import run_stress_test
+
+@pytest.fixture
+def portfolio(tmp_path):
+    rng = np.random.default_rng(3)
+    n = 1_000
+    cols = (rng.integers(550, 851, n), rng.uniform(20_000, 200_000, n), rng.uniform(1_000, 60_000, n), rng.uniform(0, 30_000, n))
+    path = tmp_path / "portfolio.csv"
+    with open(path, "w") as f:
+        f.write('applicant_id,credit_score,annual_income,loan_amount,existing_debt\n')
+        f.writelines(f'"A,{i}",{s},{inc:.2f},{loan:.2f},{debt:.2f}\n' for i, (s, inc, loan, debt) in enumerate(zip(*cols)))
+    return path, cols
+
+class TestStressTest:
+    def test_migration_matches_scoring_rules(self, portfolio):
+        path, (score, income, loan, debt) = portfolio
+        result = run_stress_test(path, chunk_rows=128, workers=1)
+        dti = scoring.debt_to_income(np.round(income, 2), np.round(loan, 2), np.round(debt, 2))
+        base, severe = scoring.risk_tiers(score, dti), scoring.risk_tiers(score, dti * 1.2)
+        assert result["rows"] == 1_000 and result["base_distribution"] == np.bincount(base, minlength=4).tolist()
+        matrix = np.array(result["scenarios"]["severe"]["migration"])
+        assert matrix[0, 1] == np.sum((base == 0) & (severe == 1)) and matrix.sum() == 1_000
+        assert result["scenarios"]["severe"]["downgraded"] == np.sum(severe > base) > 0
+        assert np.tril(matrix, k=-1).sum() == 0  # a DTI shock never upgrades
+
+    def test_process_pool_matches_inline(self, portfolio):
+        path, _ = portfolio
+        inline = run_stress_test(path, {"shock": 0.5}, chunk_rows=100, workers=1)
+        pooled = run_stress_test(path, {"shock": 0.5}, chunk_rows=100, workers=2)
+        assert inline["scenarios"] == pooled["scenarios"] and inline["base_distribution"] == pooled["base_distribution"]
+
+    def test_parquet_matches_csv(self, portfolio):
+        pa, pq = pytest.importorskip("pyarrow"), pytest.importorskip("pyarrow.parquet")
+        path, (score, income, loan, debt) = portfolio
+        parquet = path.with_suffix(".parquet")
+        pq.write_table(pa.table({"Credit_Score": score, "annual_income": np.round(income, 2),
+                                 "loan_amount": np.round(loan, 2), "existing_debt": np.round(debt, 2)}), parquet)
+        from_csv, from_parquet = run_stress_test(path, workers=1), run_stress_test(parquet, chunk_rows=128, workers=1)
+        assert from_parquet["rows"] == 1_000 and from_parquet["scenarios"] == from_csv["scenarios"]
+        assert from_parquet["base_distribution"] == from_csv["base_distribution"]
+
+    def test_quoted_header_with_commas(self, tmp_path):
+        path = tmp_path / "quoted.csv"
+        path.write_text('"name, full","Credit_Score",annual_income,loan_amount\n"Doe, J",760,100000,20000\n')
+        assert run_stress_test(path, workers=1)["base_distribution"] == [1, 0, 0, 0]
+
+    def test_missing_columns_rejected(self, tmp_path):
+        path = tmp_path / "bad.csv"
+        path.write_text("credit_score,loan_amount\n700,1000\n")
+        with pytest.raises(ValueError, match="annual_income"):
+            run_stress_test(path, workers=1)
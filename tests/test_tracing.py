@@ -0,0 +1,75 @@
+"""Tests for per-decision tracing and the profile log — no AWS credentials required."""
+import json
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+from langchain_core.tools import tool
+from app.agents.decisioning_agent import DecisioningAgent
+from app.models.schemas import DecisionRequest
+from app.utils import tracing
+
+def _agent():
+    agent = DecisioningAgent.__new__(DecisioningAgent)
+    agent.retriever = MagicMock(**{"invoke.return_value": [Document(page_content="Max DTI 43%", metadata={"title": "Credit Policy"})]})
+    agent.executor = MagicMock()
+    agent.executor.ainvoke = AsyncMock(return_value={"output": '{"decision":"REFER","confidence":0.6,"reasoning":"gray"}',
+                                                     "intermediate_steps": []})
+    return agent
+
+def _request(trace=True):
+    return DecisionRequest(session_id="t1", applicant={"applicant_id": "A1", "credit_score": 700}, query="Approve?",
+                           trace=trace)
+
+class _Retriever(BaseRetriever):
+    def _get_relevant_documents(self, query, *, run_manager):
+        return [Document(page_content="Max DTI 43%", metadata={"title": "Credit Policy"})]
+
+class TestDecisionTrace:
+    @pytest.mark.asyncio
+    async def test_trace_returned_and_logged(self, tmp_path):
+        log = tmp_path / "decisions.jsonl"
+        with patch("app.utils.tracing.settings.trace_log_path", str(log)), patch.object(tracing, "_profile_logger", None):
+            response = await _agent().run(_request())
+        assert [s["name"] for s in response.trace["children"]] == ["rules", "prefetch", "agent", "parse"]
+        assert response.trace["children"][1]["attributes"]["titles"] == ["Credit Policy"]
+        assert response.trace["attributes"]["decision"] == "REFER" and response.trace["duration_ms"] >= 0
+        assert json.loads(log.read_text())["trace"] == response.trace
+
+    @pytest.mark.asyncio
+    async def test_off_by_default(self):
+        with patch("app.utils.tracing.record") as record:
+            response = await _agent().run(_request(trace=False))
+        assert response.trace is None
+        record.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_trace_enabled_logs_without_returning(self):
+        with patch("app.agents.decisioning_agent.settings.trace_enabled", True), patch("app.utils.tracing.record") as record:
+            response = await _agent().run(_request(trace=False))
+        assert response.trace is None and record.call_args.args[0]["session_id"] == "t1"
+
+class TestTraceCallbackHandler:
+    def test_tool_spans_nest_retrieval_under_tool(self):
+        @tool
+        def policy_retriever(query: str) -> str:
+            """Search policies."""
+            return str(_Retriever().invoke(query))
+
+        with tracing.start("decision") as trace, tracing.span("agent"):
+            policy_retriever.invoke({"query": "DTI"}, config={"callbacks": tracing.callbacks()})
+        tool_span, = trace.finish()["children"][0]["children"]
+        assert tool_span["name"] == "tool:policy_retriever" and tool_span["attributes"]["args"] == {"query": "DTI"}
+        retrieval, = tool_span["children"]
+        assert retrieval["attributes"]["hits"] == 1 and retrieval["attributes"]["titles"] == ["Credit Policy"]
+
+class TestProfileReport:
+    def test_percentiles_per_stage_across_rotated_files(self, tmp_path):
+        def entry(ms):
+            return json.dumps({"trace": {"name": "decision", "duration_ms": ms, "children": [
+                {"name": "llm", "duration_ms": ms / 2, "children": []}]}}) + "\n"
+        (tmp_path / "decisions.jsonl").write_text("".join(entry(ms) for ms in range(1, 51)))
+        (tmp_path / "decisions.jsonl.1").write_text("".join(entry(ms) for ms in range(51, 101)))
+        stages = tracing.report([str(p) for p in sorted(tmp_path.iterdir())])
+        assert stages["decision"]["count"] == 100 and stages["decision"]["p50_ms"] == pytest.approx(50.5)
+        assert stages["llm"]["p99_ms"] == pytest.approx(49.505)